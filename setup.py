@@ -8,6 +8,9 @@ setuptools.setup(
     entry_points = {
         'console_scripts':[
             'vision6D = vision6D.entry.main:main',
+            'vision6d-benchmark = vision6D.entry.benchmark:main',
+            'vision6d-convert = vision6D.entry.convert:main',
+            'vision6d-evaluate = vision6D.entry.evaluate:main',
         ]
     },
     url='https://github.com/ykzzyk/vision6D',
@@ -0,0 +1,39 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: test_latlon.py
+@time: 2026-10-18 22:20
+@desc: the batched LatLonIndex lookup gives the same points as utils.latLon2xyz
+'''
+
+import numpy as np
+import trimesh
+
+from vision6D.tools import utils
+from vision6D.tools.latlon import LatLonIndex
+
+def test_query_matches_latlon2xyz():
+    mesh = trimesh.creation.icosphere(subdivisions=3)
+    rng = np.random.default_rng(0)
+    x, y, z = np.asarray(mesh.vertices).T
+    lat = np.arccos(np.clip(z, -1, 1)) / np.pi
+    lon = (np.arctan2(y, x) + np.pi) / (2 * np.pi)
+    # vertices outside the map, the faces around them are left out of the lookup
+    invalid = rng.choice(len(lat), size=len(lat) // 20, replace=False)
+    lat[invalid[::2]] = -1
+    lon[invalid[1::2]] = -1
+
+    # pixels inside the map and a few off it, which fall back to the nearest face
+    gx = np.concatenate((rng.uniform(0, 1, 300), rng.uniform(-0.2, 1.2, 20)))
+    gy = np.concatenate((rng.uniform(0, 1, 300), rng.uniform(-0.2, 1.2, 20)))
+
+    lonf = lon[mesh.faces]
+    msk = (np.sum(lonf >= 0, axis=1) == 3) & (np.sum(lat[mesh.faces] >= 0, axis=1) == 3)
+    expected = np.array([utils.latLon2xyz(mesh, lat, lonf, msk, gx[i], gy[i]) for i in range(len(gx))]).reshape((-1, 3))
+    # small chunks, so that the pixels are resolved over several batches
+    xyz = LatLonIndex(mesh.vertices, mesh.faces, lat, lon, chunk_size=64).query(gx, gy)
+
+    assert xyz.shape == expected.shape
+    np.testing.assert_allclose(xyz, expected, rtol=0, atol=1e-9)
@@ -0,0 +1,53 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: test_mesh_cache.py
+@time: 2026-10-19 00:20
+@desc: the shared mesh cache can be pointed elsewhere, and its index forgets what was evicted
+'''
+
+import os
+
+import pytest
+import pyvista as pv
+
+from vision6D.components import MeshCache
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = MeshCache()
+    previous = cache.cache_dir, cache.max_size
+    cache.configure(tmp_path / "cache")
+    yield cache
+    cache.configure(*previous)
+
+def test_configure_switches_the_shared_cache(cache, tmp_path):
+    assert MeshCache() is cache
+    assert cache.cache_dir == tmp_path / "cache"
+    assert cache.index == {} and cache.stats()["entries"] == 0
+
+def test_evicted_meshes_leave_the_index(cache, tmp_path):
+    sources = []
+    for i in range(3):
+        source = tmp_path / f"sphere{i}.vtp"
+        pv.Sphere(theta_resolution=20 + i, phi_resolution=20 + i).save(source)
+        sources.append(source)
+    spacing = [1, 1, 1]
+    cache.put(sources[0], spacing, pv.read(sources[0]))
+    size = cache.stats()["size"]
+    # room for about two meshes
+    cache.max_size = int(size * 2.5)
+    for source in sources[1:]: cache.put(source, spacing, pv.read(source))
+
+    assert cache.stats()["entries"] == 2
+    assert os.path.abspath(sources[0]) not in cache.index
+    assert cache.get(sources[0], spacing) is None
+    for source in sources[1:]:
+        entry = cache.index[os.path.abspath(source)]
+        assert all((cache.cache_dir / name).is_file() for name in entry["files"])
+        assert cache.get(source, spacing) is not None
+
+    cache.clear()
+    assert cache.index == {}
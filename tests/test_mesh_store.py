@@ -0,0 +1,36 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: test_mesh_store.py
+@time: 2026-10-18 23:40
+@desc: the colors MeshStore attaches to the shared meshes
+'''
+
+import numpy as np
+import pyvista as pv
+
+from vision6D.tools import utils
+from vision6D.components import MeshStore
+
+def test_latlon_colors_are_writeable():
+    latlon = utils.load_latitude_longitude()
+    expected = np.array(latlon)
+    mesh = pv.PolyData(np.random.default_rng(0).uniform(-1, 1, (len(latlon), 3)))
+    plotter = pv.Plotter(off_screen=True)
+    mesh_store = MeshStore((640, 480))
+    mesh_store.meshes['test_mesh'] = mesh
+    mesh_store.mesh_actors['test_mesh'] = plotter.add_mesh(mesh)
+    mesh_store.mesh_colors['test_mesh'] = 'cyan'
+    try:
+        assert mesh_store.set_scalar(False, 'test_mesh')
+        colors = mesh.point_data['colors']
+        np.testing.assert_array_equal(colors, expected)
+        # writing to the colors of one mesh must neither crash nor reach the shared map
+        colors[:] = 0
+        assert not np.any(mesh.point_data['colors'])
+        np.testing.assert_array_equal(utils.load_latitude_longitude(), expected)
+    finally:
+        mesh_store.reset()
+        plotter.close()
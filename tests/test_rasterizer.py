@@ -0,0 +1,71 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: test_rasterizer.py
+@time: 2026-10-18 22:10
+@desc: the NumPy rasterizer draws the same pixels as the VTK offscreen render
+'''
+
+import pytest
+import numpy as np
+import pyvista as pv
+from scipy.spatial.transform import Rotation
+
+from vision6D.tools import utils
+from vision6D.tools import rasterizer
+from vision6D.components import RenderPool
+
+SIZE = (640, 480)
+
+@pytest.fixture(scope="module")
+def scene():
+    mesh = pv.Sphere(radius=10, theta_resolution=60, phi_resolution=60)
+    # stretched so that the poses differ, a sphere looks the same from everywhere
+    mesh.points = np.asarray(mesh.points) * (1.0, 0.6, 0.3)
+    camera = pv.Camera()
+    camera.position = (0, 0, 0)
+    camera.focal_point = (0, 0, 1)
+    camera.up = (0, -1, 0)
+    camera.view_angle = 30
+    poses = []
+    for rotation in Rotation.random(3, random_state=0).as_matrix():
+        pose = np.eye(4)
+        pose[:3, :3] = rotation
+        pose[:3, 3] = (0, 0, 50)
+        poses.append(pose)
+    render_pool = RenderPool()
+    # the pool windows multisample, which blends the edge pixels the rasterizer leaves hard
+    render_pool.get(*SIZE).render_window.SetMultiSamples(0)
+    plotter = pv.Plotter(off_screen=True, window_size=SIZE)
+    yield mesh, camera, poses, render_pool, plotter
+    plotter.close()
+    render_pool.clear()
+
+@pytest.mark.parametrize("mode", ['flat', 'nocs', 'silhouette'])
+def test_render_actor_matches_vtk(scene, mode):
+    mesh, camera, poses, render_pool, plotter = scene
+    data = pv.PolyData(mesh.points, mesh.faces)
+    if mode == 'nocs': data.point_data['colors'] = utils.color_mesh(np.asarray(mesh.points))
+    actor = plotter.add_mesh(data, color='white' if mode == 'silhouette' else 'cyan', name=mode)
+    if mode == 'nocs':
+        mapper = actor.GetMapper()
+        mapper.SetScalarModeToUsePointFieldData()
+        mapper.SelectColorArray('colors')
+        mapper.SetColorModeToDirectScalars()
+        mapper.ScalarVisibilityOn()
+    for pose in poses:
+        actor.user_matrix = pose
+        vtk_image = render_pool.render(actor, camera, *SIZE)
+        numpy_image = rasterizer.render_actor(actor, camera, *SIZE)
+        assert vtk_image.shape == numpy_image.shape == (SIZE[1], SIZE[0], 3)
+        # agreement over the pixels either backend draws
+        difference = np.abs(vtk_image.astype(int) - numpy_image).max(axis=-1)
+        vtk_mask, numpy_mask = vtk_image.any(axis=-1), numpy_image.any(axis=-1)
+        drawn = vtk_mask | numpy_mask
+        assert drawn.sum() > 0.02 * drawn.size, "the mesh should be in view"
+        assert np.mean(difference[drawn] == 0) >= 0.9996
+        assert np.mean(difference[drawn] <= 1) >= 0.9999
+        assert np.sum(vtk_mask & numpy_mask) / np.sum(drawn) >= 0.9999
+    plotter.remove_actor(actor)
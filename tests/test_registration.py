@@ -0,0 +1,57 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: test_registration.py
+@time: 2026-10-18 23:55
+@desc: ICP recovers perturbed poses, and stops on a settled RMSE rather than an absolute one
+'''
+
+import pytest
+import numpy as np
+import pyvista as pv
+from scipy.spatial.transform import Rotation
+
+from vision6D.tools import utils
+from vision6D.tools import registration
+
+def ellipsoid(resolution, bend=0.0):
+    points = np.asarray(pv.Sphere(radius=10, theta_resolution=resolution, phi_resolution=resolution).points, dtype=np.float64) * (1.0, 0.6, 0.3)
+    # bent out of its mirror symmetries, so that only one pose fits
+    return points + bend * np.c_[points[:, 0] ** 2 / 10, np.zeros(len(points)), points[:, 1]]
+
+def perturbed_poses(count, seed, low, high):
+    rng = np.random.default_rng(seed)
+    for degrees in np.linspace(low, high, count):
+        gt_pose = np.eye(4)
+        gt_pose[:3, :3] = Rotation.random(random_state=rng).as_matrix()
+        gt_pose[:3, 3] = rng.uniform(-5, 5, 3)
+        axis = rng.normal(size=3)
+        perturbation = np.eye(4)
+        perturbation[:3, :3] = Rotation.from_rotvec(axis / np.linalg.norm(axis) * np.radians(degrees)).as_matrix()
+        yield gt_pose, perturbation @ gt_pose
+
+# point_to_point only settles on the pose while the points start less than about half the sample spacing off
+@pytest.mark.parametrize("method, low, high", [('point_to_point', 1, 3), ('point_to_plane', 3, 20)])
+def test_icp_recovers_asymmetric_mesh(method, low, high):
+    source = ellipsoid(40, bend=0.2)
+    for gt_pose, init_pose in perturbed_poses(12, 0, low, high):
+        target = source @ gt_pose[:3, :3].T + gt_pose[:3, 3]
+        pose, stats = registration.icp(source, target, init_pose, method=method)
+        assert stats["converged"]
+        assert utils.angler_distance(pose[:3, :3], gt_pose[:3, :3]) < 0.02
+        np.testing.assert_allclose(pose[:3, 3], gt_pose[:3, 3], atol=1e-3)
+
+def test_point_to_plane_slides_on_smooth_surface():
+    # a smooth surface sampled on rings, where point_to_point settles a few degrees off
+    source = ellipsoid(80)
+    for gt_pose, init_pose in perturbed_poses(6, 1, 3, 20):
+        target = source @ gt_pose[:3, :3].T + gt_pose[:3, 3]
+        pose, stats = registration.icp(source, target, init_pose, method='point_to_plane')
+        assert stats["converged"]
+        assert utils.angler_distance(pose[:3, :3], gt_pose[:3, :3]) < 0.02
+
+def test_icp_needs_an_iteration():
+    points = ellipsoid(20)
+    with pytest.raises(AssertionError): registration.icp(points, points, max_iterations=0)
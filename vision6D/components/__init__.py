@@ -1,19 +1,25 @@
 from .singleton import Singleton
+from .render_pool import RenderPool
 from .image_store import ImageStore
 from .mask_store import MaskStore
 from .camera_store import CameraStore
 from .point_store import PointStore
+from .mesh_cache import MeshCache
 from .mesh_store import MeshStore
 from .video_store import VideoStore
 from .folder_store import FolderStore
+from .pose_store import PoseStore
 
 __all__ = [
     'Singleton',
+    'RenderPool',
     'ImageStore',
     'MaskStore',
     'CameraStore',
     'PointStore',
+    'MeshCache',
     'MeshStore',
     'VideoStore',
-    'FolderStore'
+    'FolderStore',
+    'PoseStore'
 ]
\ No newline at end of file
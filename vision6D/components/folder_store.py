@@ -9,12 +9,12 @@
 '''
 
 import os
-import re
 import pathlib
 
 import numpy as np
 
 from . import Singleton
+from ..tools import utils
 
 
 # contains mesh objects
@@ -28,14 +28,8 @@ class FolderStore(metaclass=Singleton):
         self.current_frame = 0
 
     def get_files_from_folder(self, category):
-        dir = pathlib.Path(self.folder_path) / category
-        folders = [d for d in os.listdir(dir) if os.path.isdir(os.path.join(dir, d))]
-        if len(folders) == 1: dir = pathlib.Path(self.folder_path) / category / folders[0]
-        # Retrieve files
-        files = [f for f in os.listdir(dir) if os.path.isfile(os.path.join(dir, f))]
+        files, dir = utils.list_files(self.folder_path, category)
         self.total_frame = len(files)
-        # Sort files
-        files.sort(key=lambda f: int(re.sub('\D', '', f)))
         return files, dir
 
     def add_folder(self, folder_path):
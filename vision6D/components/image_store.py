@@ -15,12 +15,15 @@ import PIL.Image
 
 
 from . import Singleton
+from . import RenderPool
 from ..tools import utils
 
 # contains mesh objects
 
 class ImageStore(metaclass=Singleton):
     def __init__(self):
+        self.render_pool = RenderPool()
+        self.render_size = None
         self.reset()
         self.mirror_x = False
         self.mirror_y = False
@@ -30,7 +33,7 @@ class ImageStore(metaclass=Singleton):
         self.image_actor = None
         self.image_opacity = 0.8
 
-    def add_image(self, image_source):
+    def load_image(self, image_source):
         if isinstance(image_source, pathlib.WindowsPath) or isinstance(image_source, str):
             self.image_path = str(image_source)
             image_source = np.array(PIL.Image.open(image_source), dtype='uint8')
@@ -38,17 +41,35 @@ class ImageStore(metaclass=Singleton):
 
         if self.mirror_x: image_source = image_source[:, ::-1, :]
         if self.mirror_y: image_source = image_source[::-1, :, :]
+        return image_source
+
+    def add_image(self, image_source):
+        return self.create_image(self.load_image(image_source))
 
+    def create_image(self, image_source):
+        """The image grid of an image from load_image, with the image and its channel count"""
         dim = image_source.shape
         h, w, channel = dim[0], dim[1], dim[2]
 
-        self.render = utils.create_render(w, h)
+        self.render_size = (w, h)
 
         image = pv.UniformGrid(dimensions=(w, h, 1), spacing=[0.01, 0.01, 1], origin=(0.0, 0.0, 0.0))
         image.point_data["values"] = image_source.reshape((w * h, channel)) # order = 'C
         image = image.translate(-1 * np.array(image.center), inplace=False)
 
         return image, image_source, channel
+
+    def update_image(self, image_source):
+        """Write an image from load_image into the scalars of the image actor in place, False if the actor does not fit its size, channels or dtype"""
+        if self.image_actor is None: return False
+        # a view of the vtk array the mapper draws from
+        scalars = utils.get_image_actor_scalars(self.image_actor)
+        if scalars.shape != image_source.shape or scalars.dtype != image_source.dtype: return False
+        scalars[...] = image_source
+        self.image_actor.GetMapper().GetInput().Modified()
+        # a gray image is color mapped on its own range, as add_mesh sets it for a new image
+        if image_source.shape[2] == 1: self.image_actor.GetMapper().SetScalarRange(image_source.min(), image_source.max())
+        return True
         
     def update_opacity(self, delta):
         self.image_opacity += delta
@@ -56,12 +77,5 @@ class ImageStore(metaclass=Singleton):
         self.image_actor.GetProperty().opacity = self.image_opacity
         
     def render_image(self, camera):
-        self.render.clear()
-        render_actor = self.image_actor.copy(deep=True)
-        render_actor.GetProperty().opacity = 1
-        self.render.add_actor(render_actor, pickable=False)
-        self.render.camera = camera
-        self.render.disable()
-        self.render.show(auto_close=False)
-        image = self.render.last_image
+        image = self.render_pool.render(self.image_actor, camera, *self.render_size)
         return image
\ No newline at end of file
@@ -16,12 +16,17 @@ import numpy as np
 import pyvista as pv
 
 from . import Singleton
+from . import RenderPool
 from ..tools import utils
+from ..tools import rasterizer
 
 # contains mesh objects
 
 class MaskStore(metaclass=Singleton):
     def __init__(self):
+        self.render_pool = RenderPool()
+        self.render_size = None
+        self.render_backend = 'vtk' # or 'numpy' for the CPU rasterizer, no offscreen window needed
         self.reset()
         self.mirror_x = False
         self.mirror_y = False
@@ -46,7 +51,7 @@ class MaskStore(metaclass=Singleton):
         # Mirror points
         h, w = mask_source.shape[0], mask_source.shape[1]
         
-        self.render = utils.create_render(w, h)
+        self.render_size = (w, h)
         
         if self.mirror_x: points2d[:, 0] = w - points2d[:, 0]
         if self.mirror_y: points2d[:, 1] = h - points2d[:, 1]
@@ -81,12 +86,6 @@ class MaskStore(metaclass=Singleton):
         return mask_surface
 
     def render_mask(self, camera):
-        self.render.clear()
-        render_actor = self.mask_actor.copy(deep=True)
-        render_actor.GetProperty().opacity = 1
-        self.render.add_actor(render_actor, pickable=False)
-        self.render.camera = camera
-        self.render.disable()
-        self.render.show(auto_close=False)
-        image = self.render.last_image
+        if self.render_backend == 'numpy': image = rasterizer.render_actor(self.mask_actor, camera, *self.render_size)
+        else: image = self.render_pool.render(self.mask_actor, camera, *self.render_size)
         return image
\ No newline at end of file
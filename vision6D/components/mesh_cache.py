@@ -0,0 +1,133 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: mesh_cache.py
+@time: 2026-10-18 10:41
+@desc: create the on-disk cache for meshes that are already converted to PolyData
+'''
+
+import os
+import json
+import hashlib
+import logging
+import pathlib
+
+import vtk
+import pyvista as pv
+
+from . import Singleton
+
+logger = logging.getLogger("vision6D")
+
+class MeshCache(metaclass=Singleton):
+    def __init__(self, cache_dir=None, max_size=1024 ** 3):
+        self.configure(cache_dir, max_size)
+
+    def configure(self, cache_dir=None, max_size=1024 ** 3):
+        """Point the cache at cache_dir, ~/.vision6D/cache/meshes by default.
+
+        The cache is a singleton, so the arguments of MeshCache() only count the first time; this switches the one
+        instance to another folder or size cap (e.g. an isolated folder for the benchmark).
+        """
+        self.cache_dir = pathlib.Path(cache_dir) if cache_dir else pathlib.Path.home() / ".vision6D" / "cache" / "meshes"
+        self.max_size = max_size # in bytes
+        self.index_path = self.cache_dir / "index.json"
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # maps a source file to its size, mtime, content hash and the cache files made from it, so unchanged files are hashed only once
+        self.index = {}
+        if os.path.isfile(self.index_path):
+            try:
+                with open(self.index_path, "r") as f: self.index = json.load(f)
+            except (OSError, ValueError): self.index = {}
+        self.hits = 0
+        self.misses = 0
+
+    def save_index(self):
+        with open(self.index_path, "w") as f: json.dump(self.index, f)
+
+    def file_hash(self, path):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        entry = self.index.get(path)
+        if entry is None or entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime_ns:
+            sha = hashlib.sha1()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""): sha.update(chunk)
+            entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": sha.hexdigest()}
+            self.index[path] = entry
+            self.save_index()
+        return entry
+
+    def cache_path(self, path, spacing, tag=""):
+        entry = self.file_hash(path)
+        key = hashlib.sha1(f"{entry['hash']}|{entry['mtime']}|{[float(s) for s in spacing]}|{tag}".encode()).hexdigest()
+        return self.cache_dir / f"{key}.vtp"
+
+    def get(self, path, spacing, tag=""):
+        cache_path = self.cache_path(path, spacing, tag)
+        if os.path.isfile(cache_path):
+            try: mesh = pv.read(cache_path)
+            except Exception: mesh = None
+            if mesh is not None and mesh.n_points > 0:
+                os.utime(cache_path) # mark as recently used
+                self.hits += 1
+                logger.debug(f"mesh cache hit for {path} ({self.hits} hits, {self.misses} misses)")
+                return mesh
+        self.misses += 1
+        logger.debug(f"mesh cache miss for {path} ({self.hits} hits, {self.misses} misses)")
+        return None
+
+    def put(self, path, spacing, mesh, tag=""):
+        cache_path = self.cache_path(path, spacing, tag)
+        tmp_path = cache_path.with_suffix(".tmp")
+        # raw appended binary without compression is the fastest layout to read back
+        writer = vtk.vtkXMLPolyDataWriter()
+        writer.SetFileName(str(tmp_path))
+        writer.SetInputData(mesh)
+        writer.SetDataModeToAppended()
+        writer.EncodeAppendedDataOff()
+        writer.SetCompressorTypeToNone()
+        if writer.Write():
+            os.replace(tmp_path, cache_path)
+            files = self.index[os.path.abspath(path)].setdefault("files", [])
+            if cache_path.name not in files:
+                files.append(cache_path.name)
+                self.save_index()
+        elif os.path.isfile(tmp_path): os.remove(tmp_path)
+        self.evict()
+
+    def entries(self):
+        return [(f, f.stat()) for f in self.cache_dir.glob("*.vtp")]
+
+    def evict(self):
+        entries = sorted(self.entries(), key=lambda entry: entry[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        # drop the least recently used meshes until the cache fits under the size cap
+        evicted = set()
+        while entries and total > self.max_size:
+            path, stat = entries.pop(0)
+            os.remove(path)
+            total -= stat.st_size
+            evicted.add(path.name)
+        if evicted: self.prune_index(evicted)
+
+    def prune_index(self, evicted):
+        """Forget the evicted cache files, and the sources left without any"""
+        for source, entry in list(self.index.items()):
+            files = [name for name in entry.get("files", []) if name not in evicted]
+            if files: entry["files"] = files
+            else: del self.index[source]
+        self.save_index()
+
+    def clear(self):
+        for path, _ in self.entries(): os.remove(path)
+        self.index = {}
+        self.save_index()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        entries = self.entries()
+        return {"hits": self.hits, "misses": self.misses, "entries": len(entries), "size": sum(stat.st_size for _, stat in entries), "max_size": self.max_size}
@@ -15,7 +15,11 @@ import pyvista as pv
 import numpy as np
 
 from . import Singleton
+from . import MeshCache
+from . import RenderPool
 from ..tools import utils
+from ..tools import rasterizer
+from ..tools.latlon import LatLonIndex
 
 # contains mesh objects
 
@@ -29,7 +33,16 @@ class MeshStore(metaclass=Singleton):
         self.mirror_y = False
         self.mesh_actors = {}
         self.meshdict = {}
-        self.latlon = utils.load_latitude_longitude()
+        self.meshes = {} # one PolyData per mesh name, shared by the plotter and the offscreen render
+        self.mesh_cache = MeshCache()
+
+        # Level of detail shown while the mouse is down
+        self.lod_budget = 200000 # triangles per mesh
+        self.mesh_lods = {}
+        self.lod_restore = {}
+
+        # (lat, lon) face grids for LATLON EPnP, built on first use
+        self.latlon_indices = {}
         
         self.colors = ["cyan", "magenta", "yellow", "lime", "dodgerblue", "darkviolet", "darkorange", "darkgrey"]
         self.used_colors = []
@@ -48,7 +61,9 @@ class MeshStore(metaclass=Singleton):
         self.initial_pose = None
         self.undo_poses = {}
 
-        self.render = utils.create_render(window_size[0], window_size[1])
+        self.window_size = window_size
+        self.render_pool = RenderPool()
+        self.render_backend = 'vtk' # or 'numpy' for the CPU rasterizer, no offscreen window needed
 
     def reset(self):
         self.reference = None
@@ -59,7 +74,10 @@ class MeshStore(metaclass=Singleton):
         self.mirror_y = False
         self.mesh_actors.clear()
         self.meshdict.clear()
-        self.latlon = utils.load_latitude_longitude()
+        self.meshes.clear()
+        self.mesh_lods.clear()
+        self.lod_restore.clear()
+        self.latlon_indices.clear()
         
         self.colors = ["cyan", "magenta", "yellow", "lime", "dodgerblue", "darkviolet", "darkorange", "darkgrey"]
         self.used_colors.clear()
@@ -78,12 +96,59 @@ class MeshStore(metaclass=Singleton):
         self.initial_pose = None
         self.undo_poses.clear()
 
+    @property
+    def latlon(self):
+        return utils.load_latitude_longitude()
+
     #^ Mesh related
-    def add_mesh(self, mesh_source):                        
+    def load_mesh(self, mesh_path):
+        # the cached PolyData already has the spacing applied
+        mesh = self.mesh_cache.get(mesh_path, self.mesh_spacing)
+        if mesh is None:
+            if pathlib.Path(mesh_path).suffix == '.mesh': mesh = utils.load_polydata(mesh_path)
+            else: mesh = pv.read(mesh_path)
+            if isinstance(mesh, pv.PolyData):
+                if np.any(np.array(self.mesh_spacing) != 1): mesh.points = mesh.points * self.mesh_spacing
+                self.mesh_cache.put(mesh_path, self.mesh_spacing, mesh)
+        return mesh
+
+    def load_lods(self, mesh_path, mesh):
+        lods = []
+        level = 1
+        while True:
+            lod = self.mesh_cache.get(mesh_path, self.mesh_spacing, tag=f"lod{level}")
+            if lod is None: break
+            lods.append(lod)
+            level += 1
+        if len(lods) == 0:
+            lods = utils.decimate_lods(mesh)
+            for level, lod in enumerate(lods): self.mesh_cache.put(mesh_path, self.mesh_spacing, lod, tag=f"lod{level + 1}")
+        return lods
+
+    def use_lod(self, coarse):
+        """Swap the mesh actors to their coarse level while interacting, or back to full resolution"""
+        for name, actor in self.mesh_actors.items():
+            if not coarse:
+                if name in self.lod_restore: actor.mapper.dataset = self.lod_restore.pop(name)[0]
+            elif name not in self.lod_restore and len(self.mesh_lods.get(name, [])) > 0:
+                # the finest level within the budget, otherwise the coarsest one
+                lods = self.mesh_lods[name]
+                lod = next((lod for lod in lods if lod.n_cells <= self.lod_budget), lods[-1]).copy(deep=False)
+                full = actor.mapper.dataset
+                # carry the colors over to the subset of points kept by the coarse level
+                ids = lod.point_data['vtkOriginalPointIds']
+                for array_name in full.point_data.keys(): lod.point_data[array_name] = full.point_data[array_name][ids]
+                if full.point_data.active_scalars_name: lod.point_data.active_scalars_name = full.point_data.active_scalars_name
+                # hold on to the coarse level as well, the mapper does not keep its python wrapper alive
+                self.lod_restore[name] = (full, lod)
+                actor.mapper.dataset = lod
+
+    def add_mesh(self, mesh_source):
+        spacing_applied = False
         if isinstance(mesh_source, pathlib.WindowsPath) or isinstance(mesh_source, str):
             self.mesh_path = str(mesh_source)
-            if pathlib.Path(mesh_source).suffix == '.mesh': mesh_source = utils.load_trimesh(mesh_source)
-            else: mesh_source = pv.read(mesh_source)
+            mesh_source = self.load_mesh(self.mesh_path)
+            spacing_applied = True
 
         if isinstance(mesh_source, trimesh.Trimesh):
             assert (mesh_source.vertices.shape[1] == 3 and mesh_source.faces.shape[1] == 3), "it should be N by 3 matrix"
@@ -93,15 +158,19 @@ class MeshStore(metaclass=Singleton):
 
         if isinstance(mesh_source, pv.PolyData):
             self.mesh_info = mesh_source
-            source_verts = mesh_source.points * self.mesh_spacing
+            source_verts = None # the points are only copied if the spacing changes them
             source_faces = mesh_source.faces.reshape((-1, 4))[:, 1:]
 
         if self.mesh_info is not None:
             # set mesh attributes
             self.mesh_name = pathlib.Path(self.mesh_path).stem + "_mesh"
             self.meshdict[self.mesh_name] = self.mesh_path
+            self.meshes[self.mesh_name] = self.mesh_info
+            self.latlon_indices.pop(self.mesh_name, None)
             self.mesh_opacity[self.mesh_name] = self.surface_opacity
-            self.mesh_info.points = self.mesh_info.points * self.mesh_spacing
+            if not spacing_applied and np.any(np.array(self.mesh_spacing) != 1): self.mesh_info.points = self.mesh_info.points * self.mesh_spacing
+            if source_verts is None: source_verts = self.mesh_info.points
+            self.mesh_lods[self.mesh_name] = self.load_lods(self.mesh_path, self.mesh_info) if self.mesh_info.n_cells > self.lod_budget else []
             if self.initial_pose is None: self.initial_pose = self.transformation_matrix
 
             # assign a color to every mesh
@@ -125,38 +194,68 @@ class MeshStore(metaclass=Singleton):
         del self.mesh_colors[name]
         del self.mesh_opacity[name]
         del self.meshdict[name]
+        del self.meshes[name]
+        self.mesh_lods.pop(name, None)
+        self.lod_restore.pop(name, None)
+        self.latlon_indices.pop(name, None)
         self.reference = None
 
-    def render_mesh(self, camera):
-        self.render.clear()
-        vertices, faces = utils.get_mesh_actor_vertices_faces(self.mesh_actors[self.reference])
-        mesh_data = pv.wrap(trimesh.Trimesh(vertices, faces, process=False))
-        colors = utils.get_mesh_actor_scalars(self.mesh_actors[self.reference])
-        if colors is not None: 
-            assert colors.shape == vertices.shape, "colors shape should be the same as vertices shape"
-            mesh = self.render.add_mesh(mesh_data, scalars=colors, rgb=True, style='surface', opacity=1, name=self.reference)
+    def get_mesh_vertices(self, name):
+        # a view into the shared PolyData, nothing is copied
+        return self.meshes[name].points
+
+    def get_mesh_vertices_faces(self, name):
+        # pyvista rebuilds the padded face array on every read of faces, only ask for them where they are needed
+        mesh = self.meshes[name]
+        return mesh.points, mesh.faces.reshape((-1, 4))[:, 1:]
+
+    def get_mesh_scalars(self, name):
+        mesh = self.meshes[name]
+        return mesh.point_data['colors'] if 'colors' in mesh.point_data.keys() else None
+
+    def get_latlon_index(self, name):
+        if name not in self.latlon_indices:
+            vertices, faces = self.get_mesh_vertices_faces(name)
+            self.latlon_indices[name] = LatLonIndex(vertices, faces, self.latlon[..., 0], self.latlon[..., 1])
+        return self.latlon_indices[name]
+
+    def color_actor(self, actor, name):
+        """Point the actor's mapper at the colors array of its mesh, or fall back to the solid mesh color"""
+        mapper = actor.GetMapper()
+        if self.get_mesh_scalars(name) is not None:
+            mapper.SetScalarModeToUsePointFieldData()
+            mapper.SelectColorArray('colors')
+            mapper.SetColorModeToDirectScalars()
+            mapper.ScalarVisibilityOn()
         else:
-            mesh = self.render.add_mesh(mesh_data, color=self.mesh_colors[self.reference], style='surface', opacity=1, name=self.reference)
-        mesh.user_matrix = self.mesh_actors[self.reference].user_matrix
-        
-        self.render.camera = camera
-        self.render.disable()
-        self.render.show(auto_close=False)
-        image = self.render.last_image
+            mapper.ScalarVisibilityOff()
+            actor.GetProperty().SetColor(pv.Color(self.mesh_colors[name]).float_rgb)
+
+    def render_mesh(self, camera):
+        # exports always use the full resolution meshes
+        self.use_lod(False)
+        if self.render_backend == 'numpy': image = rasterizer.render_actor(self.mesh_actors[self.reference], camera, *self.window_size)
+        else: image = self.render_pool.render(self.mesh_actors[self.reference], camera, *self.window_size)
         return image
     
     def set_scalar(self, nocs, actor_name):
-        vertices, faces = utils.get_mesh_actor_vertices_faces(self.mesh_actors[actor_name])
+        vertices = self.get_mesh_vertices(actor_name)
         vertices_color = vertices
         if self.mirror_x: vertices_color = utils.transform_vertices(vertices_color, np.array([[-1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]))
         if self.mirror_y: vertices_color = utils.transform_vertices(vertices_color, np.array([[1, 0, 0, 0], [0, -1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]))
         # get the corresponding color
         colors = utils.color_mesh(vertices_color, nocs=nocs)
         if colors.shape == vertices.shape: 
-            mesh_data = pv.wrap(trimesh.Trimesh(vertices, faces, process=False))
-            return mesh_data, colors
+            self.meshes[actor_name].point_data['colors'] = colors
+            self.color_actor(self.mesh_actors[actor_name], actor_name)
+            return True
         else:
-            return None, None
+            return False
+
+    def set_color(self, color, actor_name):
+        self.mesh_colors[actor_name] = color
+        self.meshes[actor_name].point_data.pop('colors', None)
+        self.color_actor(self.mesh_actors[actor_name], actor_name)
         
     #^ Pose related 
     def current_pose(self):
@@ -3,6 +3,7 @@ import pathlib
 import numpy as np
 import pyvista as pv
 import trimesh
+from scipy.spatial import cKDTree
 
 from . import Singleton
 from ..tools import utils
@@ -12,27 +13,34 @@ class PointStore(metaclass=Singleton):
         self.point_path = None
         self.point_data = None
         self.point_name = None
+        self.point_tree = None # KD-tree over point_data for ICP, built on first use
         self.point_actors = {}
 
     def reset(self):
         self.point_path = None
         self.point_data = None
         self.point_name = None
+        self.point_tree = None
         self.point_actors.clear()
 
     def remove_point(self, name):
         del self.point_actors[name]
 
+    def get_point_tree(self):
+        if self.point_tree is None or self.point_tree.n != len(self.point_data): self.point_tree = cKDTree(self.point_data)
+        return self.point_tree
+
     def load_points(self, point_source):
+        self.point_tree = None
         if isinstance(point_source, pathlib.WindowsPath) or isinstance(point_source, str):
             self.point_path = str(point_source)
             self.point_name = pathlib.Path(self.point_path).stem + "_point"
             if pathlib.Path(point_source).suffix == '.npy': point_source = np.load(point_source)
-            elif pathlib.Path(point_source).suffix == '.mesh': point_source = utils.load_trimesh(point_source)
+            elif pathlib.Path(point_source).suffix == '.mesh': point_source = utils.load_polydata(point_source)
             else: point_source = pv.read(point_source)
 
         if isinstance(point_source, np.ndarray):
-            if point_source.shape[-1] == 2: 
+            if point_source.shape[-1] == 2 or point_source.shape[-1] == 3: 
                 self.point_data = point_source
                 
         if isinstance(point_source, trimesh.Trimesh):
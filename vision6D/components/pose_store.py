@@ -0,0 +1,110 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: pose_store.py
+@time: 2026-10-18 21:10
+@desc: create store for the annotated poses of a video or folder, one append-only record file instead of a file per frame
+'''
+
+import os
+import re
+import atexit
+import pathlib
+
+import numpy as np
+
+from . import Singleton
+
+# one record per saved pose, the key is the frame number of a video or the file stem of a folder frame
+RECORD = np.dtype([('key', '<U64'), ('pose', '<f8', (4, 4))])
+
+class PoseStore(metaclass=Singleton):
+    def __init__(self, batch_size=16):
+        self.batch_size = batch_size # poses put before they are appended, flush() appends them earlier
+        self.path = None
+        self.poses = {}
+        self.pending = []
+        atexit.register(self.flush)
+
+    def reset(self):
+        self.flush()
+        self.path = None
+        self.poses = {}
+        self.pending = []
+
+    @staticmethod
+    def read_records(path):
+        # a record cut short by a crash is ignored, flush() cuts it off before appending
+        count = os.path.getsize(path) // RECORD.itemsize
+        if count == 0: return np.empty(0, dtype=RECORD)
+        return np.memmap(path, dtype=RECORD, mode='r', shape=(count,))
+
+    def open(self, path):
+        """Load the poses of the record file at path, a no-op if it is already the open one"""
+        path = pathlib.Path(path)
+        if path == self.path: return
+        self.reset()
+        self.path = path
+        if os.path.isfile(path):
+            records = self.read_records(path)
+            # later records of a key overwrite the earlier ones
+            self.poses = {str(key): np.array(pose) for key, pose in zip(records['key'], records['pose'])}
+
+    def get(self, key):
+        pose = self.poses.get(str(key))
+        return pose.copy() if pose is not None else None
+
+    def put(self, key, pose):
+        key = str(key)
+        assert len(key) <= 64, f"pose keys are at most 64 characters, {key} is {len(key)}"
+        pose = np.array(pose, dtype=np.float64).reshape((4, 4))
+        self.poses[key] = pose
+        self.pending.append((key, pose))
+        if len(self.pending) >= self.batch_size: self.flush()
+
+    def flush(self):
+        """Append the poses put since the last flush to the record file"""
+        if not self.pending or self.path is None: return
+        os.makedirs(self.path.parent, exist_ok=True)
+        with open(self.path, "ab") as f:
+            # drop the torn tail of a crashed append, so the new records stay aligned
+            size = f.seek(0, os.SEEK_END)
+            if size % RECORD.itemsize: f.truncate(size - size % RECORD.itemsize)
+            np.array(self.pending, dtype=RECORD).tofile(f)
+        self.pending = []
+
+    def compact(self):
+        """Rewrite the record file with a single record per key"""
+        if self.path is None: return
+        tmp_path = self.path.with_suffix(".tmp")
+        os.makedirs(self.path.parent, exist_ok=True)
+        np.array([(key, self.poses[key]) for key in self.keys()], dtype=RECORD).tofile(tmp_path)
+        os.replace(tmp_path, self.path)
+        self.pending = []
+
+    def keys(self):
+        return sorted(self.poses, key=lambda key: (int(re.sub(r'\D', '', key) or -1), key))
+
+    def stack(self):
+        """The keys in frame order and their (N, 4, 4) poses"""
+        keys = self.keys()
+        return keys, np.array([self.poses[key] for key in keys]).reshape((-1, 4, 4))
+
+    def import_files(self, poses_dir, prefix=''):
+        """Put the poses of the per-file layout, poses_dir/{prefix}{key}.npy, that are not in the store yet"""
+        count = 0
+        for path in pathlib.Path(poses_dir).glob(f"{prefix}*.npy"):
+            key = path.stem[len(prefix):]
+            if key in self.poses: continue
+            self.put(key, np.load(path))
+            count += 1
+        self.flush()
+        return count
+
+    def export_files(self, poses_dir, prefix=''):
+        """Write every pose to the per-file layout, poses_dir/{prefix}{key}.npy"""
+        os.makedirs(poses_dir, exist_ok=True)
+        for key in self.keys(): np.save(pathlib.Path(poses_dir) / f"{prefix}{key}.npy", self.poses[key])
+        return len(self.poses)
@@ -0,0 +1,75 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: render_pool.py
+@time: 2026-10-18 12:02
+@desc: create the pool of offscreen renders shared by the image, mask and mesh exports
+'''
+
+import collections
+
+import vtk
+
+from . import Singleton
+from ..tools import utils
+
+class RenderPool(metaclass=Singleton):
+    def __init__(self, max_size=4):
+        self.max_size = max_size # number of distinct resolutions kept alive
+        self.renders = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+        self.evicted = 0
+
+    def get(self, w, h):
+        key = (int(w), int(h))
+        if key in self.renders:
+            self.hits += 1
+            self.renders.move_to_end(key)
+        else:
+            self.misses += 1
+            self.created += 1
+            self.renders[key] = utils.create_render(*key)
+            # close the least recently used render window instead of leaking it
+            while len(self.renders) > self.max_size:
+                _, render = self.renders.popitem(last=False)
+                render.close()
+                self.evicted += 1
+        return self.renders[key]
+
+    @staticmethod
+    def share_actor(actor, opacity=1):
+        """A new actor drawing the same input as actor, the mapper settings are copied but the data is not"""
+        source = actor.GetMapper()
+        mapper = source.NewInstance()
+        mapper.ShallowCopy(source)
+        if source.GetNumberOfInputConnections(0) > 0: mapper.SetInputConnection(source.GetInputConnection(0, 0))
+        else: mapper.SetInputData(source.GetInput())
+        render_actor = vtk.vtkActor()
+        render_actor.ShallowCopy(actor)
+        render_actor.SetMapper(mapper)
+        prop = vtk.vtkProperty()
+        prop.DeepCopy(actor.GetProperty())
+        prop.SetOpacity(opacity)
+        render_actor.SetProperty(prop)
+        return render_actor
+
+    def render(self, actor, camera, w, h):
+        render = self.get(w, h)
+        render.clear()
+        render.add_actor(self.share_actor(actor), pickable=False, render=False)
+        render.camera = camera
+        render.disable()
+        render.show(auto_close=False)
+        image = render.last_image
+        return image
+
+    def clear(self):
+        for render in self.renders.values(): render.close()
+        self.renders.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "created": self.created, "evicted": self.evicted, "renders": list(self.renders.keys()), "max_size": self.max_size}
@@ -8,7 +8,6 @@
 @desc: create store for video related functions
 '''
 
-import cv2
 import numpy as np
 
 from . import Singleton
@@ -21,9 +20,14 @@ from PyQt5 import QtWidgets
 
 class VideoStore(metaclass=Singleton):
     def __init__(self):
+        self.video_player = None
         self.reset()
 
     def reset(self):
+        # stop the read-ahead and proxy threads of the previous video
+        if self.video_player is not None:
+            self.video_player.frame_cache.close()
+            if self.video_player.proxy is not None: self.video_player.proxy.close()
         self.video_path = None
         self.current_frame = 0
         self.video_player = None
@@ -49,13 +53,10 @@ class VideoStore(metaclass=Singleton):
         if res == QtWidgets.QDialog.Accepted: self.fps = round(self.video_sampler.fps)
 
     def load_per_frame_info(self):
-        self.video_player.cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame)
-        ret, frame = self.video_player.cap.read()
-        if ret: 
-            video_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            return video_frame
-        else:
-            return None
+        self.total_frame = self.video_player.frame_cache.frame_count
+        video_frame = self.video_player.frame_cache.get(self.current_frame)
+        if video_frame is not None: return video_frame.copy()
+        else: return None
         
     def prev_frame(self):
         self.current_frame = self.current_frame - self.fps
@@ -12,7 +12,6 @@ import pathlib
 import PIL.Image
 from PyQt5 import QtWidgets
 
-from ..tools import utils
 from ..components import CameraStore
 from ..components import ImageStore
 
@@ -48,8 +47,14 @@ class ImageContainer:
         self.add_image(self.image_store.image_path)
 
     def add_image(self, image_source):
+        # decoded and mirrored once, whichever way it is shown
+        image_source = self.image_store.load_image(image_source)
+        # a frame of the size of the shown image is written into its actor, one render instead of a new actor
+        if 'image' in self.plotter.actors and self.image_store.update_image(image_source):
+            self.plotter.render()
+            return
 
-        image, original_image, channel = self.image_store.add_image(image_source)
+        image, _, channel = self.image_store.create_image(image_source)
 
         # Then add it to the plotter
         if channel == 1: 
@@ -62,10 +67,6 @@ class ImageContainer:
         # Save actor for later
         self.image_store.image_actor = actor
 
-        # get the image scalar
-        image_data = utils.get_image_actor_scalars(self.image_store.image_actor)
-        assert (image_data == original_image).all() or (image_data*255 == original_image).all(), "image_data and image_source should be equal"
-        
         # add remove current image to removeMenu
         if 'image' not in self.track_actors_names:
             self.track_actors_names.append('image')
@@ -12,17 +12,17 @@ import ast
 import copy
 import pathlib
 
-import trimesh
 import PIL.Image
 import numpy as np
-import pyvista as pv
 
 from PyQt5 import QtWidgets
 
 from ..tools import utils
+from ..tools import registration
 from ..components import CameraStore
 from ..components import MaskStore
 from ..components import MeshStore
+from ..components import PointStore
 from ..widgets import GetTextDialog
 
 class MeshContainer:
@@ -61,6 +61,7 @@ class MeshContainer:
         self.camera_store = CameraStore()
         self.mask_store = MaskStore()
         self.mesh_store = MeshStore()
+        self.point_store = PointStore()
 
     def add_mesh_file(self, mesh_path='', prompt=False):
         if prompt: 
@@ -121,34 +122,17 @@ class MeshContainer:
             QtWidgets.QMessageBox.warning(QtWidgets.QMainWindow(), 'vision6D', "Need to select a mesh actor first", QtWidgets.QMessageBox.Ok, QtWidgets.QMessageBox.Ok)
 
     def set_scalar(self, nocs, actor_name):
-        mesh_data, colors = self.mesh_store.set_scalar(nocs, actor_name)
-        if mesh_data:
-            mesh = self.plotter.add_mesh(mesh_data, scalars=colors, rgb=True, opacity=self.mesh_store.mesh_opacity[actor_name], name=actor_name)
-            transformation_matrix = pv.array_from_vtkmatrix(self.mesh_store.mesh_actors[actor_name].GetMatrix())
-            mesh.user_matrix = transformation_matrix
-            actor, _ = self.plotter.add_actor(mesh, pickable=True, name=actor_name)
-            actor_colors = utils.get_mesh_actor_scalars(actor)
-            assert (actor_colors == colors).all(), "actor_colors should be the same as colors"
-            assert actor.name == actor_name, "actor's name should equal to actor_name"
-            self.mesh_store.mesh_actors[actor_name] = actor
-        else:
-            QtWidgets.QMessageBox.warning(QtWidgets.QMainWindow(), 'vision6D', "Cannot set the selected color", QtWidgets.QMessageBox.Ok, QtWidgets.QMessageBox.Ok)
+        if self.mesh_store.set_scalar(nocs, actor_name): self.plotter.render()
+        else: QtWidgets.QMessageBox.warning(QtWidgets.QMainWindow(), 'vision6D', "Cannot set the selected color", QtWidgets.QMessageBox.Ok, QtWidgets.QMessageBox.Ok)
 
     def set_color(self, color, actor_name):
-        vertices, faces = utils.get_mesh_actor_vertices_faces(self.mesh_store.mesh_actors[actor_name])
-        mesh_data = pv.wrap(trimesh.Trimesh(vertices, faces, process=False))
-        mesh = self.plotter.add_mesh(mesh_data, color=color, opacity=self.mesh_store.mesh_opacity[actor_name], name=actor_name)
-        transformation_matrix = pv.array_from_vtkmatrix(self.mesh_store.mesh_actors[actor_name].GetMatrix())
-        mesh.user_matrix = transformation_matrix
-        actor, _ = self.plotter.add_actor(mesh, pickable=True, name=actor_name)
-        assert actor.name == actor_name, "actor's name should equal to actor_name"
-        self.mesh_store.mesh_actors[actor_name] = actor
+        self.mesh_store.set_color(color, actor_name)
+        self.plotter.render()
 
     def set_mesh_opacity(self, name: str, surface_opacity: float):
         self.mesh_store.mesh_opacity[name] = surface_opacity
-        self.mesh_store.mesh_actors[name].user_matrix = pv.array_from_vtkmatrix(self.mesh_store.mesh_actors[name].GetMatrix())
         self.mesh_store.mesh_actors[name].GetProperty().opacity = surface_opacity
-        self.plotter.add_actor(self.mesh_store.mesh_actors[name], pickable=True, name=name)
+        self.plotter.render()
 
     def toggle_surface_opacity(self, up):
         checked_button = self.button_group_actors_names.checkedButton()
@@ -253,6 +237,19 @@ class MeshContainer:
         else:
             QtWidgets.QMessageBox.warning(QtWidgets.QMainWindow(), 'vision6D', "Choose a mesh actor first", QtWidgets.QMessageBox.Ok, QtWidgets.QMessageBox.Ok)
 
+    def icp_register(self, method):
+        if len(self.mesh_store.mesh_actors) == 1: self.mesh_store.reference = list(self.mesh_store.mesh_actors.keys())[0]
+        if self.mesh_store.reference and self.point_store.point_data is not None and self.point_store.point_data.shape[-1] == 3:
+            vertices = self.mesh_store.get_mesh_vertices(self.mesh_store.reference)
+            init_pose = self.mesh_store.mesh_actors[self.mesh_store.reference].user_matrix
+            pose, stats = registration.icp(vertices, self.point_store.point_data, init_pose, method=method, tree=self.point_store.get_point_tree())
+            self.register_pose(pose)
+            self.output_text.append(f"-> ICP ({method}) {'converged' if stats['converged'] else 'stopped'} after {stats['iterations']} iterations in {stats['time']:.3f} s")
+            self.output_text.append(f"-> RMSE: {stats['initial_rmse']:.4f} -> {stats['rmse']:.4f}, fitness: {stats['fitness']:.3f}")
+            self.current_pose(text="ICP")
+        else:
+            QtWidgets.QMessageBox.warning(QtWidgets.QMainWindow(), 'vision6D', "Need to load a mesh and a 3D point cloud first", QtWidgets.QMessageBox.Ok, QtWidgets.QMessageBox.Ok)
+
     def export_pose(self):
         if self.mesh_store.reference: 
             self.update_gt_pose()
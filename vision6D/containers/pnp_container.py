@@ -17,9 +17,14 @@ import matplotlib.pyplot as plt
 from PyQt5 import QtWidgets
 
 from ..tools import utils
+from ..tools import pnp
+from ..tools import projection
+from ..tools.correspondences import CorrespondenceSampler
 from ..components import CameraStore
 from ..components import MaskStore
 from ..components import MeshStore
+from ..components import VideoStore
+from ..components import FolderStore
 
 class PnPContainer:
     def __init__(self, plotter, export_mesh_render, output_text):
@@ -30,69 +35,95 @@ class PnPContainer:
         self.camera_store = CameraStore()
         self.mask_store = MaskStore()
         self.mesh_store = MeshStore()
+        self.video_store = VideoStore()
+        self.folder_store = FolderStore()
 
-    def nocs_epnp(self, color_mask, mesh):
-        vertices = mesh.vertices
-        pts3d, pts2d = utils.create_2d_3d_pairs(color_mask, vertices)
-        pts2d = pts2d.astype('float32')
-        pts3d = pts3d.astype('float32')
+        # which foreground pixels are handed to RANSAC, every pixel by default
+        self.sampler = CorrespondenceSampler()
+
+        # the default PnP backend and its RANSAC settings, see pnp.SOLVERS for the backends
+        self.pnp_solver = 'epnp_ransac'
+        self.pnp_options = {'iterations': 100, 'reprojection_error': 8.0, 'confidence': 0.999}
+
+        # frames of a video/folder are solved starting from the pose of the previous solve
+        self.sequence_pnp = pnp.SequencePnP(self.pnp_solver, **self.pnp_options)
+        self.sequence_source = None
+
+        # NOCS correspondences from projecting the mesh vertices instead of rendering the colored mesh
+        self.render_free = False
+
+    def set_render_free(self, render_free):
+        self.render_free = render_free
+
+    def get_camera_intrinsics(self):
         camera_intrinsics = self.camera_store.camera_intrinsics.astype('float32')
         focal_length = (1080 / 2.0) / math.tan(math.radians(self.plotter.camera.view_angle / 2))
         camera_intrinsics[0, 0] = focal_length
         camera_intrinsics[1, 1] = focal_length
-        predicted_pose = utils.solve_epnp_cv2(pts2d, pts3d, camera_intrinsics, self.plotter.camera.position)
-        self.output_text.append(f"-> Focal length is {focal_length}: ")
+        return camera_intrinsics
+
+    def solve_pnp(self, pts2d, pts3d, solver=None):
+        camera_intrinsics = self.get_camera_intrinsics()
+        solver = self.pnp_solver if solver is None else solver
+        source = self.video_store.video_path or self.folder_store.folder_path
+        if source:
+            # a new video/folder starts a new sequence
+            if source != self.sequence_source: self.sequence_pnp.reset()
+            self.sequence_source = source
+            self.sequence_pnp.solver = solver
+            self.sequence_pnp.options = self.pnp_options
+            predicted_pose, inliers = self.sequence_pnp(pts2d, pts3d, camera_intrinsics, self.plotter.camera.position)
+        else:
+            predicted_pose, inliers = pnp.solve_pnp(pts2d, pts3d, camera_intrinsics, self.plotter.camera.position, solver=solver, **self.pnp_options)
+        self.output_text.append(f"-> Focal length is {camera_intrinsics[0, 0]}: ")
+        self.output_text.append(f"-> {solver} inliers: {np.sum(inliers)}/{len(inliers)}")
+        if source: self.output_text.append(f"-> Warm start fallbacks: {self.sequence_pnp.fallbacks}/{self.sequence_pnp.attempts} ({self.sequence_pnp.fallback_rate * 100:.1f}%)")
         return predicted_pose
 
-    def latlon_epnp(self, color_mask, mesh):
-        binary_mask = utils.color2binary_mask(color_mask)
-        idx = np.where(binary_mask == 1)
-        # swap the points for opencv, maybe because they handle RGB image differently (RGB -> BGR in opencv)
-        idx = idx[:2][::-1]
-        pts2d = np.stack((idx[0], idx[1]), axis=1)
-        pts3d = []
-        
-        # Obtain the rg color
-        color = color_mask[pts2d[:,1], pts2d[:,0]][..., :2]
-        if np.max(color) > 1: color = color / 255
-        gx = color[:, 0]
-        gy = color[:, 1]
-
-        lat = np.array(self.mesh_store.latlon[..., 0])
-        lon = np.array(self.mesh_store.latlon[..., 1])
-        lonf = lon[mesh.faces]
-        msk = (np.sum(lonf>=0, axis=1)==3) & (np.sum(lat[mesh.faces]>=0, axis=1)==3)
-        for i in range(len(pts2d)):
-            pt = utils.latLon2xyz(mesh, lat, lonf, msk, gx[i], gy[i])
-            pts3d.append(pt)
-       
-        pts3d = np.array(pts3d).reshape((len(pts3d), 3))
-
-        pts2d = pts2d.astype('float32')
-        pts3d = pts3d.astype('float32')
-        camera_intrinsics = self.camera_store.camera_intrinsics.astype('float32')
-        focal_length = (1080 / 2.0) / math.tan(math.radians(self.plotter.camera.view_angle / 2))
-        camera_intrinsics[0, 0] = focal_length
-        camera_intrinsics[1, 1] = focal_length
-        predicted_pose = utils.solve_epnp_cv2(pts2d, pts3d, camera_intrinsics, self.plotter.camera.position)
-        self.output_text.append(f"-> Focal length is {focal_length}: ")
+    def mirror_vertices(self, vertices):
+        # the vertices as MeshStore.set_scalar mirrors them to compute the NOCS colors, the mirror is undone on the predicted pose
+        if self.mesh_store.mirror_x: vertices = utils.transform_vertices(vertices, np.array([[-1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]))
+        if self.mesh_store.mirror_y: vertices = utils.transform_vertices(vertices, np.array([[1, 0, 0, 0], [0, -1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]))
+        return vertices
+
+    def nocs_epnp(self, color_mask, mesh, solver=None):
+        vertices = mesh.vertices
+        pts3d, pts2d = utils.create_2d_3d_pairs(color_mask, vertices, sampler=self.sampler)
+        predicted_pose = self.solve_pnp(pts2d, pts3d, solver)
+        return predicted_pose
+
+    def latlon_epnp(self, color_mask, solver=None):
+        pts3d, pts2d = utils.create_latlon_pairs(color_mask, self.mesh_store.get_latlon_index(self.mesh_store.reference), sampler=self.sampler)
+        predicted_pose = self.solve_pnp(pts2d, pts3d, solver)
+        return predicted_pose
+
+    def projection_epnp(self, name, binary_mask=None, solver=None):
+        vertices, faces = self.mesh_store.get_mesh_vertices_faces(name)
+        pose = self.mesh_store.mesh_actors[name].user_matrix
+        pts3d, pts2d = projection.create_projection_pairs(vertices, faces, pose, self.get_camera_intrinsics(), self.plotter.camera.position, self.camera_store.window_size, binary_mask)
+        pts3d = self.mirror_vertices(pts3d)
+        predicted_pose = self.solve_pnp(pts2d, pts3d, solver)
         return predicted_pose
 
     def epnp_mesh(self):
         if len(self.mesh_store.mesh_actors) == 1: self.mesh_store.reference = list(self.mesh_store.mesh_actors.keys())[0]
         if self.mesh_store.reference:
-            colors = utils.get_mesh_actor_scalars(self.mesh_store.mesh_actors[self.mesh_store.reference])
+            colors = self.mesh_store.get_mesh_scalars(self.mesh_store.reference)
             if colors is not None and (not np.all(colors == colors[0])):
-                color_mask = self.export_mesh_render(save_render=False)
+                nocs_color = (self.mesh_store.mesh_colors[self.mesh_store.reference] == 'nocs')
+                render_free = self.render_free and nocs_color
+                color_mask = None if render_free else self.export_mesh_render(save_render=False)
                 gt_pose = self.mesh_store.mesh_actors[self.mesh_store.reference].user_matrix
                 if self.mesh_store.mirror_x: gt_pose = np.array([[-1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]) @ gt_pose
                 if self.mesh_store.mirror_y: gt_pose = np.array([[1, 0, 0, 0], [0, -1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]) @ gt_pose
 
-                if color_mask is not None and np.sum(color_mask):
-                    if self.mesh_store.mesh_colors[self.mesh_store.reference] == 'nocs':
-                        vertices, faces = utils.get_mesh_actor_vertices_faces(self.mesh_store.mesh_actors[self.mesh_store.reference])
-                        mesh = trimesh.Trimesh(vertices, faces, process=False)
-                        predicted_pose = self.nocs_epnp(color_mask, mesh)
+                if render_free or (color_mask is not None and np.sum(color_mask)):
+                    if nocs_color:
+                        if render_free: predicted_pose = self.projection_epnp(self.mesh_store.reference)
+                        else:
+                            vertices, faces = self.mesh_store.get_mesh_vertices_faces(self.mesh_store.reference)
+                            mesh = trimesh.Trimesh(self.mirror_vertices(vertices), faces, process=False)
+                            predicted_pose = self.nocs_epnp(color_mask, mesh)
                         if self.mesh_store.mirror_x: predicted_pose = np.array([[-1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]) @ predicted_pose @ np.array([[-1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
                         if self.mesh_store.mirror_y: predicted_pose = np.array([[1, 0, 0, 0], [0, -1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]) @ predicted_pose @ np.array([[1, 0, 0, 0], [0, -1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
                         angular_distance = utils.angler_distance(predicted_pose[:3, :3], gt_pose[:3, :3])
@@ -123,15 +154,16 @@ class PnPContainer:
                 if len(self.mesh_store.mesh_actors) == 1: 
                     self.mesh_store.reference = list(self.mesh_store.mesh_actors.keys())[0]
                 if self.mesh_store.reference:
-                    colors = utils.get_mesh_actor_scalars(self.mesh_store.mesh_actors[self.mesh_store.reference])
+                    colors = self.mesh_store.get_mesh_scalars(self.mesh_store.reference)
                     if colors is not None and (not np.all(colors == colors[0])):
-                        color_mask = self.export_mesh_render(save_render=False)
                         nocs_color = (self.mesh_store.mesh_colors[self.mesh_store.reference] == 'nocs')
+                        render_free = self.render_free and nocs_color and nocs_method
+                        color_mask = None if render_free else self.export_mesh_render(save_render=False)
                         gt_pose = self.mesh_store.mesh_actors[self.mesh_store.reference].user_matrix
                         if self.mesh_store.mirror_x: gt_pose = np.array([[-1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]) @ gt_pose
                         if self.mesh_store.mirror_y: gt_pose = np.array([[1, 0, 0, 0], [0, -1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]) @ gt_pose
-                        vertices, faces = utils.get_mesh_actor_vertices_faces(self.mesh_store.mesh_actors[self.mesh_store.reference])
-                        mesh = trimesh.Trimesh(vertices, faces, process=False)
+                        vertices, faces = self.mesh_store.get_mesh_vertices_faces(self.mesh_store.reference)
+                        mesh = trimesh.Trimesh(self.mirror_vertices(vertices), faces, process=False)
                     else:
                         QtWidgets.QMessageBox.warning(QtWidgets.QMainWindow(), 'vision6D', "The mesh need to be colored, with gradient color", QtWidgets.QMessageBox.Ok, QtWidgets.QMessageBox.Ok)
                         return 0
@@ -139,23 +171,25 @@ class PnPContainer:
                     QtWidgets.QMessageBox.warning(QtWidgets.QMainWindow(), 'vision6D', "A mesh need to be loaded/mesh reference need to be set", QtWidgets.QMessageBox.Ok, QtWidgets.QMessageBox.Ok)
                     return 0
                 
-                if color_mask is not None: color_mask = (color_mask * mask_data).astype(np.uint8)
+                if render_free: pass
+                elif color_mask is not None: color_mask = (color_mask * mask_data).astype(np.uint8)
                 else: 
                     QtWidgets.QMessageBox.warning(QtWidgets.QMainWindow(), 'vision6D', "Color mask is None", QtWidgets.QMessageBox.Ok, QtWidgets.QMessageBox.Ok)
                     return 0
             
-            if np.sum(color_mask):
+            if render_free or np.sum(color_mask):
                 if nocs_method == nocs_color:
                     if nocs_method: 
                         color_theme = 'NOCS'
-                        predicted_pose = self.nocs_epnp(color_mask, mesh)
+                        if render_free: predicted_pose = self.projection_epnp(self.mesh_store.reference, binary_mask=mask_data)
+                        else: predicted_pose = self.nocs_epnp(color_mask, mesh)
                         if self.mesh_store.mirror_x: predicted_pose = np.array([[-1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]) @ predicted_pose @ np.array([[-1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
                         if self.mesh_store.mirror_y: predicted_pose = np.array([[1, 0, 0, 0], [0, -1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]) @ predicted_pose @ np.array([[1, 0, 0, 0], [0, -1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
                     else: 
                         color_theme = 'LATLON'
                         if self.mesh_store.mirror_x: color_mask = color_mask[:, ::-1, :]
                         if self.mesh_store.mirror_y: color_mask = color_mask[::-1, :, :]
-                        predicted_pose = self.latlon_epnp(color_mask, mesh)
+                        predicted_pose = self.latlon_epnp(color_mask)
                     angular_distance = utils.angler_distance(predicted_pose[:3, :3], gt_pose[:3, :3])
                     translation_error = np.linalg.norm(predicted_pose[:3, 3] - gt_pose[:3, 3])
                     self.output_text.append(f"Predicted pose with <span style='background-color:yellow; color:black;'>{color_theme} color (masked)</span>: ")
@@ -11,15 +11,16 @@
 import os
 import pathlib
 
-import numpy as np
 import PIL.Image
 
-from PyQt5 import QtWidgets
+from PyQt5 import QtWidgets, QtCore
 
 from ..components import ImageStore
 from ..components import MeshStore
 from ..components import VideoStore
 from ..components import FolderStore
+from ..components import PoseStore
+from ..tools import frame_export
 
 class VideoFolderContainer:
     def __init__(self,
@@ -47,6 +48,7 @@ class VideoFolderContainer:
         self.mesh_store = MeshStore()
         self.video_store = VideoStore()
         self.folder_store = FolderStore()
+        self.pose_store = PoseStore()
   
     def add_video_file(self, video_path='', prompt=False):
         if prompt:
@@ -60,9 +62,26 @@ class VideoFolderContainer:
             self.play_video_button.setText(f"Play ({self.video_store.current_frame}/{self.video_store.total_frame})")
             self.output_text.append(f"-> Load video {self.video_store.video_path} into vision6D")
             self.output_text.append(f"\n************************************************************\n")
+            self.open_pose_store()
             self.load_per_frame_info()
             self.sample_video()
 
+    def output_dir(self):
+        if self.video_store.video_path: return pathlib.Path(self.video_store.video_path).parent / f"{pathlib.Path(self.video_store.video_path).stem}_vision6D"
+        if self.folder_store.folder_path: return pathlib.Path(self.folder_store.folder_path) / "vision6D"
+        return None
+
+    def open_pose_store(self):
+        # the poses of a video or folder live in one record file, the per-file poses of earlier versions are imported once
+        output_dir = self.output_dir()
+        store_path = output_dir / "poses.bin"
+        if store_path == self.pose_store.path: return
+        migrate = not os.path.isfile(store_path)
+        self.pose_store.open(store_path)
+        if migrate and os.path.isdir(output_dir / "poses"):
+            count = self.pose_store.import_files(output_dir / "poses", prefix='pose_' if self.video_store.video_path else '')
+            if count: self.output_text.append(f"-> Import {count} saved poses from {str(output_dir / 'poses')} into <span style='background-color:yellow; color:black;'>{str(store_path)}</span>")
+
     def load_per_frame_info(self):
         video_frame = self.video_store.load_per_frame_info()
         if video_frame is not None: 
@@ -87,21 +106,21 @@ class VideoFolderContainer:
                 self.image_store.image_path = str(output_frame_path)
 
                 # save gt_pose for each frame
-                os.makedirs(pathlib.Path(self.video_store.video_path).parent / f"{pathlib.Path(self.video_store.video_path).stem}_vision6D" / "poses", exist_ok=True)
-                output_pose_path = pathlib.Path(self.video_store.video_path).parent / f"{pathlib.Path(self.video_store.video_path).stem}_vision6D" / "poses" / f"pose_{self.video_store.current_frame}.npy"
+                self.open_pose_store()
                 self.current_pose()
-                np.save(output_pose_path, self.mesh_store.transformation_matrix)
-                self.output_text.append(f"-> Save frame {self.video_store.current_frame} pose to <span style='background-color:yellow; color:black;'>{str(output_pose_path)}</span>:")
+                self.pose_store.put(self.video_store.current_frame, self.mesh_store.transformation_matrix)
+                # a manual annotation reaches the disk right away, only imports are batched
+                self.pose_store.flush()
+                self.output_text.append(f"-> Save frame {self.video_store.current_frame} pose to <span style='background-color:yellow; color:black;'>{str(self.pose_store.path)}</span>:")
                 self.output_text.append(f"{self.mesh_store.transformation_matrix}")
                 self.output_text.append(f"\n************************************************************\n")
         elif self.folder_store.folder_path:
             # save gt_pose for specific frame
-            os.makedirs(pathlib.Path(self.folder_store.folder_path) / "vision6D", exist_ok=True)
-            os.makedirs(pathlib.Path(self.folder_store.folder_path) / "vision6D" / "poses", exist_ok=True)
-            output_pose_path = pathlib.Path(self.folder_store.folder_path) / "vision6D" / "poses" / f"{pathlib.Path(self.mesh_store.pose_path).stem}.npy"
+            self.open_pose_store()
             self.current_pose()
-            np.save(output_pose_path, self.mesh_store.transformation_matrix)
-            self.output_text.append(f"-> Save frame {pathlib.Path(self.mesh_store.pose_path).stem} pose to <span style='background-color:yellow; color:black;'>{str(output_pose_path)}</span>:")
+            self.pose_store.put(pathlib.Path(self.mesh_store.pose_path).stem, self.mesh_store.transformation_matrix)
+            self.pose_store.flush()
+            self.output_text.append(f"-> Save frame {pathlib.Path(self.mesh_store.pose_path).stem} pose to <span style='background-color:yellow; color:black;'>{str(self.pose_store.path)}</span>:")
             self.output_text.append(f"{self.mesh_store.transformation_matrix}")
             self.output_text.append(f"\n************************************************************\n")
         else: 
@@ -113,6 +132,38 @@ class VideoFolderContainer:
         else: 
             QtWidgets.QMessageBox.warning(QtWidgets.QMainWindow(), 'vision6D', "Need to load a video!", QtWidgets.QMessageBox.Ok, QtWidgets.QMessageBox.Ok)
 
+    def export_sampled_frames(self):
+        if self.video_store.video_path:
+            # every frame next_frame would visit, named the way save_frame names them
+            frames = frame_export.sampled_frames(self.video_store.total_frame, self.video_store.fps)
+            dialog = QtWidgets.QProgressDialog("Exporting sampled frames...", "Cancel", 0, len(frames))
+            dialog.setWindowTitle("vision6D")
+            dialog.setWindowModality(QtCore.Qt.WindowModal)
+            dialog.setMinimumDuration(0)
+            def progress(written, total, fps):
+                dialog.setValue(written)
+                dialog.setLabelText(f"Exporting sampled frames ({written}/{total}, {fps:.1f} frames/s)")
+                QtWidgets.QApplication.processEvents()
+                return not dialog.wasCanceled()
+            result = frame_export.export_frames(self.video_store.video_path, frames, progress=progress)
+            dialog.close()
+            output_dir = frame_export.frames_dir(self.video_store.video_path)
+            self.output_text.append(f"-> {'Cancelled after exporting' if result['cancelled'] else 'Exported'} {result['written']}/{result['total']} sampled frames (every {self.video_store.fps} frames) in {result['elapsed']:.1f} s ({result['fps']:.1f} frames/s) to <span style='background-color:yellow; color:black;'>{str(output_dir)}</span>")
+            self.output_text.append(f"\n************************************************************\n")
+        else:
+            QtWidgets.QMessageBox.warning(QtWidgets.QMainWindow(), 'vision6D', "Need to load a video!", QtWidgets.QMessageBox.Ok, QtWidgets.QMessageBox.Ok)
+
+    def export_pose_files(self):
+        if self.video_store.video_path or self.folder_store.folder_path:
+            # the per-file layout of earlier versions, poses/pose_N.npy for a video and poses/<stem>.npy for a folder
+            self.open_pose_store()
+            poses_dir = self.output_dir() / "poses"
+            count = self.pose_store.export_files(poses_dir, prefix='pose_' if self.video_store.video_path else '')
+            self.output_text.append(f"-> Export {count} saved poses to <span style='background-color:yellow; color:black;'>{str(poses_dir)}</span>")
+            self.output_text.append(f"\n************************************************************\n")
+        else:
+            QtWidgets.QMessageBox.warning(QtWidgets.QMainWindow(), 'vision6D', "Need to load a video or a folder!", QtWidgets.QMessageBox.Ok, QtWidgets.QMessageBox.Ok)
+
     def play_video(self):
         if self.video_store.video_path:
             self.video_store.play_video()
@@ -123,9 +174,10 @@ class VideoFolderContainer:
     def prev_frame(self):
         if self.video_store.video_path:
             self.video_store.prev_frame()
-            pose_path = pathlib.Path(self.video_store.video_path).parent / f"{pathlib.Path(self.video_store.video_path).stem}_vision6D" / "poses" / f"pose_{self.video_store.current_frame}.npy"
-            if os.path.isfile(pose_path): 
-                self.mesh_store.transformation_matrix = np.load(pose_path)
+            self.open_pose_store()
+            pose = self.pose_store.get(self.video_store.current_frame)
+            if pose is not None: 
+                self.mesh_store.transformation_matrix = pose
                 self.register_pose(self.mesh_store.transformation_matrix)
                 self.output_text.append(f"-> Load saved frame {self.video_store.current_frame} pose: \n{self.mesh_store.transformation_matrix}")
                 self.output_text.append(f"\n************************************************************\n")
@@ -146,10 +198,11 @@ class VideoFolderContainer:
         if self.video_store.video_path:
             self.save_frame()
             self.video_store.next_frame()
+            self.open_pose_store()
             # load pose for the current frame if the pose exist
-            pose_path = pathlib.Path(self.video_store.video_path).parent / f"{pathlib.Path(self.video_store.video_path).stem}_vision6D" / "poses" / f"pose_{self.video_store.current_frame}.npy"
-            if os.path.isfile(pose_path): 
-                self.mesh_store.transformation_matrix = np.load(pose_path)
+            pose = self.pose_store.get(self.video_store.current_frame)
+            if pose is not None: 
+                self.mesh_store.transformation_matrix = pose
                 self.register_pose(self.mesh_store.transformation_matrix)
                 self.output_text.append(f"-> Load saved frame {self.video_store.current_frame} pose: \n{self.mesh_store.transformation_matrix}")
                 self.output_text.append(f"\n************************************************************\n")
@@ -0,0 +1,673 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: benchmark.py
+@time: 2026-10-18 10:12
+@desc: the entry to benchmark the performance critical paths of vision6D
+'''
+
+import os
+import sys
+import time
+import shutil
+import hashlib
+import pathlib
+import argparse
+import tempfile
+import multiprocessing
+
+import cv2
+import PIL.Image
+import numpy as np
+import pyvista as pv
+from scipy.spatial.transform import Rotation
+import vtk.util.numpy_support as vtknp
+
+try: import resource
+except ImportError: resource = None # not available on windows
+
+from ..tools import utils
+from ..tools import pnp
+from ..tools import synthesis
+from ..tools import rasterizer
+from ..tools import frame_export
+from ..tools.proxy import ProxyFrames
+from ..tools.frame_cache import FrameCache
+from ..tools.playback import PlaybackEngine
+from ..tools.video_index import VideoIndex, SEEK_BACKOFF
+from ..tools.correspondences import CorrespondenceSampler
+from ..components import MeshCache
+from ..components import RenderPool
+from ..components import PoseStore
+from ..components import ImageStore
+
+def peak_rss():
+    """Peak resident set size of the current process in MB, None if it cannot be measured"""
+    if resource is None: return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes while macos reports bytes
+    return rss / 1024 ** 2 if sys.platform == 'darwin' else rss / 1024
+
+def print_table(header, rows):
+    widths = [max(len(str(item)) for item in column) for column in zip(header, *rows)]
+    for row in [header, *rows]: print("  ".join(str(item).rjust(width) for item, width in zip(row, widths)))
+
+def run_isolated(target, *args):
+    """Run target(*args) in a fresh interpreter so that its peak RSS is not polluted by earlier runs"""
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=target, args=(*args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+#^ Mesh loading
+def load_mesh_trimesh(meshpath):
+    # the original path: fread -> reshape -> trimesh -> pv.wrap -> spacing
+    mesh = pv.wrap(utils.load_trimesh(meshpath))
+    mesh.points = mesh.points * [1, 1, 1]
+    return mesh
+
+def load_mesh_mmap(meshpath):
+    return utils.load_polydata(meshpath)
+
+LOAD_MESH = {'trimesh': load_mesh_trimesh, 'mmap': load_mesh_mmap}
+
+def measure_load_mesh(name, meshpath, queue):
+    start_rss = peak_rss()
+    start = time.perf_counter()
+    mesh = LOAD_MESH[name](meshpath)
+    # touch every point and index so that lazily mapped pages are accounted for as well
+    np.asarray(mesh.points).sum()
+    vtknp.vtk_to_numpy(mesh.GetPolys().GetConnectivityArray()).max()
+    elapsed = time.perf_counter() - start
+    rss = None if start_rss is None else peak_rss() - start_rss
+    queue.put((elapsed, rss, mesh.n_points, mesh.n_cells))
+
+def bench_load_mesh(args):
+    rows = []
+    for name in LOAD_MESH:
+        runs = [run_isolated(measure_load_mesh, name, str(args.mesh_path)) for _ in range(args.repeat)]
+        elapsed = np.median([run[0] for run in runs])
+        rss = None if runs[0][1] is None else np.median([run[1] for run in runs])
+        rows.append((name, runs[0][2], runs[0][3], f"{elapsed * 1000:.1f}", "n/a" if rss is None else f"{rss:.1f}"))
+    print_table(("loader", "points", "triangles", "time (ms)", "peak rss (MB)"), rows)
+
+#^ Mesh cache
+def bench_mesh_cache(args):
+    cache_dir = tempfile.mkdtemp()
+    # the cache is shared, point it at an empty folder so the user's cache is neither read nor evicted
+    cache = MeshCache()
+    previous = cache.cache_dir, cache.max_size
+    cache.configure(cache_dir)
+    try:
+        spacing = [1, 1, 1]
+        start = time.perf_counter()
+        if cache.get(args.mesh_path, spacing) is None:
+            mesh = utils.load_polydata(args.mesh_path) if pathlib.Path(args.mesh_path).suffix == '.mesh' else pv.read(args.mesh_path)
+            cache.put(args.mesh_path, spacing, mesh)
+        cold = time.perf_counter() - start
+        warm = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            cache.get(args.mesh_path, spacing)
+            warm.append(time.perf_counter() - start)
+        print_table(("run", "time (ms)"), [("cold (parse + store)", f"{cold * 1000:.1f}"), ("warm (cache hit)", f"{np.median(warm) * 1000:.1f}")])
+        print(cache.stats())
+    finally:
+        cache.configure(*previous)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+#^ Latitude/longitude map
+def measure_latlon(name, queue):
+    start = time.perf_counter()
+    if name == 'json': utils.parse_latitude_longitude()
+    else: np.asarray(utils.load_latitude_longitude()).sum()
+    queue.put(time.perf_counter() - start)
+
+def bench_latlon(args):
+    rows = []
+    for name, label in (('json', "json.load (before)"), ('npy', "memory mapped .npy (after)")):
+        elapsed = np.median([run_isolated(measure_latlon, name) for _ in range(args.repeat)])
+        rows.append((label, f"{elapsed * 1000:.2f}"))
+    # every Clear/workspace switch used to parse the json again, now it hits the memoized array
+    utils.load_latitude_longitude()
+    start = time.perf_counter()
+    for _ in range(100): utils.load_latitude_longitude()
+    rows.append(("memoized (reset)", f"{(time.perf_counter() - start) * 10:.4f}"))
+    print_table(("latlon map", "time (ms)"), rows)
+
+#^ Correspondence sampling
+def setup_scene(mesh, num_poses, size, seed, view_angle=30):
+    """A camera at the origin looking down +z and random poses that keep the mesh in view, with the matching intrinsics"""
+    w, h = size
+    camera = pv.Camera()
+    camera.position = (0, 0, 0)
+    camera.focal_point = (0, 0, 1)
+    camera.up = (0, -1, 0)
+    camera.view_angle = view_angle
+    focal_length = (h / 2) / np.tan(np.radians(view_angle / 2))
+    camera_intrinsics = np.array([[focal_length, 0, w / 2], [0, focal_length, h / 2], [0, 0, 1]])
+    center = np.array(mesh.center)
+    distance = 2 * mesh.length / np.tan(np.radians(view_angle / 2))
+    poses = []
+    for rotation in Rotation.random(num_poses, random_state=seed).as_matrix():
+        pose = np.eye(4)
+        pose[:3, :3] = rotation
+        pose[:3, 3] = rotation @ -center + (0, 0, distance)
+        poses.append(pose)
+    return camera, camera_intrinsics, poses
+
+def render_nocs(args):
+    """NOCS renders of the mesh under random poses, with everything needed to solve and score PnP on them"""
+    mesh = utils.load_polydata(args.mesh_path) if pathlib.Path(args.mesh_path).suffix == '.mesh' else pv.read(args.mesh_path)
+    size = tuple(int(v) for v in args.size.split('x'))
+    camera, camera_intrinsics, poses = setup_scene(mesh, args.poses, size, args.seed)
+    renders = [(nocs, pose) for (_, _, nocs, _), pose in zip(synthesis.render_poses(mesh, poses, camera, window_size=size), poses)]
+    return np.asarray(mesh.points), camera, camera_intrinsics, renders
+
+def bench_sampling(args):
+    vertices, camera, camera_intrinsics, renders = render_nocs(args)
+
+    rows = []
+    for text in args.samplers.split(','):
+        sampler = None if text == 'all' else CorrespondenceSampler.parse(text, args.seed)
+        times, angular, translation, counts = [], [], [], []
+        for nocs, pose in renders:
+            cv2.setRNGSeed(args.seed)
+            start = time.perf_counter()
+            pts3d, pts2d = utils.create_2d_3d_pairs(nocs, vertices, sampler=sampler)
+            predicted_pose = utils.solve_epnp_cv2(pts2d, pts3d, camera_intrinsics, camera.position)
+            times.append(time.perf_counter() - start)
+            counts.append(len(pts2d))
+            angular.append(utils.angler_distance(predicted_pose[:3, :3], pose[:3, :3]))
+            translation.append(np.linalg.norm(predicted_pose[:3, 3] - pose[:3, 3]))
+        rows.append((text, int(np.median(counts)), f"{np.median(times) * 1000:.1f}", f"{np.median(angular):.3f}", f"{np.median(translation):.3f}"))
+    print_table(("sampler", "pairs", "time (ms)", "angular error (deg)", "translation error"), rows)
+
+#^ PnP solvers
+def bench_pnp(args):
+    vertices, camera, camera_intrinsics, renders = render_nocs(args)
+    sampler = None if args.sampler == 'all' else CorrespondenceSampler.parse(args.sampler, args.seed)
+    pairs = [(utils.create_2d_3d_pairs(nocs, vertices, sampler=sampler), pose) for nocs, pose in renders]
+    options = {'iterations': args.iterations, 'reprojection_error': args.reprojection_error}
+
+    rows = []
+    for solver in (args.solvers.split(',') if args.solvers else pnp.SOLVERS):
+        times, ratios, angular, translation = [], [], [], []
+        for (pts3d, pts2d), pose in pairs:
+            cv2.setRNGSeed(args.seed)
+            start = time.perf_counter()
+            predicted_pose, inliers = pnp.solve_pnp(pts2d, pts3d, camera_intrinsics, camera.position, solver=solver, **options)
+            times.append(time.perf_counter() - start)
+            ratios.append(np.mean(inliers))
+            angular.append(utils.angler_distance(predicted_pose[:3, :3], pose[:3, :3]))
+            translation.append(np.linalg.norm(predicted_pose[:3, 3] - pose[:3, 3]))
+        rows.append((solver, f"{np.median(times) * 1000:.1f}", f"{np.median(ratios):.3f}", f"{np.median(angular):.3f}", f"{np.median(translation):.3f}"))
+    print(f"{len(pairs)} poses, median {int(np.median([len(pts2d) for (_, pts2d), _ in pairs]))} correspondences ({args.sampler})")
+    print_table(("solver", "time (ms)", "inlier ratio", "angular error (deg)", "translation error"), rows)
+
+#^ Warm-start PnP
+def bench_sequence(args):
+    mesh = utils.load_polydata(args.mesh_path) if pathlib.Path(args.mesh_path).suffix == '.mesh' else pv.read(args.mesh_path)
+    size = tuple(int(v) for v in args.size.split('x'))
+    camera, camera_intrinsics, (start_pose,) = setup_scene(mesh, 1, size, args.seed)
+    # a smooth trajectory, a fixed small rotation about the mesh center between consecutive frames
+    step = Rotation.from_rotvec(np.radians(args.step) * Rotation.random(random_state=args.seed + 1).apply((1, 0, 0)))
+    center = start_pose[:3, :3] @ np.array(mesh.center) + start_pose[:3, 3]
+    poses = [start_pose]
+    for _ in range(args.frames - 1):
+        pose = np.eye(4)
+        pose[:3, :3] = step.as_matrix() @ poses[-1][:3, :3]
+        pose[:3, 3] = step.apply(poses[-1][:3, 3] - center) + center
+        poses.append(pose)
+    vertices = np.asarray(mesh.points)
+    sampler = None if args.sampler == 'all' else CorrespondenceSampler.parse(args.sampler, args.seed)
+    pairs = [utils.create_2d_3d_pairs(nocs, vertices, sampler=sampler) for _, _, nocs, _ in synthesis.render_poses(mesh, poses, camera, window_size=size)]
+    options = {'iterations': args.iterations, 'reprojection_error': args.reprojection_error}
+
+    sequence = pnp.SequencePnP(args.solver, max_error=args.max_error, **options)
+    cold = lambda pts2d, pts3d, camera_intrinsics, camera_position: pnp.solve_pnp(pts2d, pts3d, camera_intrinsics, camera_position, solver=args.solver, **options)
+    rows = []
+    for name, solve in (("cold", cold), ("warm start", sequence)):
+        cv2.setRNGSeed(args.seed)
+        times, angular, translation = [], [], []
+        for (pts3d, pts2d), pose in zip(pairs, poses):
+            start = time.perf_counter()
+            predicted_pose, _ = solve(pts2d, pts3d, camera_intrinsics, camera.position)
+            times.append(time.perf_counter() - start)
+            angular.append(utils.angler_distance(predicted_pose[:3, :3], pose[:3, :3]))
+            translation.append(np.linalg.norm(predicted_pose[:3, 3] - pose[:3, 3]))
+        rows.append((name, f"{np.mean(times) * 1000:.2f}", f"{np.median(times) * 1000:.2f}", f"{np.median(angular):.3f}", f"{np.median(translation):.3f}"))
+    print(f"{len(poses)} frames {args.step} deg apart, median {int(np.median([len(pts2d) for _, pts2d in pairs]))} correspondences ({args.sampler}), {args.solver}")
+    print_table(("solve", "mean time (ms)", "median time (ms)", "angular error (deg)", "translation error"), rows)
+    print(f"Warm start fallback rate: {sequence.fallbacks}/{sequence.attempts} ({sequence.fallback_rate * 100:.1f}%)")
+
+#^ Rasterizer
+def bench_rasterizer(args):
+    mesh = utils.load_polydata(args.mesh_path) if pathlib.Path(args.mesh_path).suffix == '.mesh' else pv.read(args.mesh_path)
+    size = tuple(int(v) for v in args.size.split('x'))
+    camera, _, poses = setup_scene(mesh, args.poses, size, args.seed)
+    render_pool = RenderPool()
+    # the pool windows multisample, which blends the edge pixels the rasterizer leaves hard
+    if not args.msaa: render_pool.get(*size).render_window.SetMultiSamples(0)
+    plotter = pv.Plotter(off_screen=True, window_size=size)
+
+    rows = []
+    for mode in ('flat', 'nocs', 'silhouette'):
+        data = pv.PolyData(mesh.points, mesh.faces)
+        if mode == 'nocs': data.point_data['colors'] = utils.color_mesh(np.asarray(mesh.points))
+        actor = plotter.add_mesh(data, color='white' if mode == 'silhouette' else 'cyan', opacity=0.3, name=mode)
+        if mode == 'nocs':
+            mapper = actor.GetMapper()
+            mapper.SetScalarModeToUsePointFieldData()
+            mapper.SelectColorArray('colors')
+            mapper.SetColorModeToDirectScalars()
+            mapper.ScalarVisibilityOn()
+        vtk_times, numpy_times, exact, close, iou = [], [], [], [], []
+        for pose in poses:
+            actor.user_matrix = pose
+            start = time.perf_counter()
+            vtk_image = render_pool.render(actor, camera, *size)
+            vtk_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            numpy_image = rasterizer.render_actor(actor, camera, *size, workers=args.workers)
+            numpy_times.append(time.perf_counter() - start)
+            # agreement over the pixels either backend draws
+            difference = np.abs(vtk_image.astype(int) - numpy_image).max(axis=-1)
+            vtk_mask, numpy_mask = vtk_image.any(axis=-1), numpy_image.any(axis=-1)
+            drawn = vtk_mask | numpy_mask
+            exact.append(np.mean(difference[drawn] == 0))
+            close.append(np.mean(difference[drawn] <= args.tolerance))
+            iou.append(np.sum(vtk_mask & numpy_mask) / np.sum(drawn))
+        plotter.remove_actor(actor)
+        rows.append((mode, f"{np.median(vtk_times) * 1000:.1f}", f"{np.median(numpy_times) * 1000:.1f}", f"{np.min(exact) * 100:.2f}", f"{np.min(close) * 100:.2f}", f"{np.min(iou):.4f}"))
+    plotter.close()
+    print(f"{len(poses)} poses at {size[0]}x{size[1]}, {mesh.n_cells} faces, worst pose per column, msaa {'on' if args.msaa else 'off'}")
+    print_table(("mode", "vtk (ms)", "numpy (ms)", "exact (%)", f"within {args.tolerance} (%)", "mask iou"), rows)
+
+#^ Video frames
+def read_frame_seek(cap, n):
+    # the original path: seek before every read
+    cap.set(cv2.CAP_PROP_POS_FRAMES, n)
+    ret, frame = cap.read()
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) if ret else None
+
+def bench_frame_cache(args):
+    cap = cv2.VideoCapture(str(args.video_path))
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    start_frame = min(args.start, frame_count - args.frames - 1)
+    rng = np.random.default_rng(args.seed)
+    # playback and stepping visit consecutive frames, scrubbing jumps around
+    patterns = {"playback": np.arange(start_frame, start_frame + args.frames),
+                "step back": np.arange(start_frame + args.frames - 1, start_frame - 1, -1),
+                "scrub": rng.integers(0, frame_count, args.frames)}
+    rows = []
+    for name, frames in patterns.items():
+        frame_cache = FrameCache(args.video_path, max_bytes=args.max_mb * 1024 ** 2, read_ahead=args.read_ahead)
+        seek_times, cache_times, mismatches = [], [], 0
+        for n in frames:
+            start = time.perf_counter()
+            expected = read_frame_seek(cap, n)
+            seek_times.append(time.perf_counter() - start)
+            # leave the read-ahead thread the display interval of a frame, as the player timer does
+            time.sleep(1 / fps)
+            start = time.perf_counter()
+            frame = frame_cache.get(n)
+            cache_times.append(time.perf_counter() - start)
+            mismatches += expected is None or frame is None or not np.array_equal(expected, frame)
+        stats = frame_cache.stats()
+        frame_cache.close()
+        rows.append((name, f"{np.mean(seek_times) * 1000:.1f}", f"{np.mean(cache_times) * 1000:.1f}", f"{np.percentile(cache_times, 95) * 1000:.1f}", stats['hits'], stats['seeks'], mismatches))
+    cap.release()
+    print(f"{args.frames} frames of {args.video_path} ({frame_count} frames at {fps:.1f} fps), read ahead {args.read_ahead}, cache {args.max_mb} MB")
+    print_table(("pattern", "seek+read (ms)", "cache (ms)", "cache p95 (ms)", "hits", "seeks", "wrong frames"), rows)
+
+def bench_video_index(args):
+    start = time.perf_counter()
+    index = VideoIndex.build(args.video_path)
+    build_time = time.perf_counter() - start
+    index.save(args.video_path)
+    start = time.perf_counter()
+    VideoIndex.load(args.video_path)
+    load_time = time.perf_counter() - start
+    cap = cv2.VideoCapture(str(args.video_path))
+    print(f"{args.video_path}: index built in {build_time * 1000:.1f} ms, loaded in {load_time * 1000:.1f} ms from {VideoIndex.index_path(args.video_path)}")
+    print(f"Frames: {index.frame_count} (container {int(cap.get(cv2.CAP_PROP_FRAME_COUNT))}), fps: {index.fps:.3f} (container {cap.get(cv2.CAP_PROP_FPS):.3f}), "
+          f"{np.sum(index.keyframes)} keyframes, mean GOP {index.frame_count / np.sum(index.keyframes):.1f}")
+
+    # the reference content of every frame, from one sequential decode
+    reference = []
+    while True:
+        ret, frame = cap.read()
+        if not ret: break
+        reference.append(hashlib.sha1(frame.tobytes()).hexdigest())
+    cap.release()
+    # forward jumps from a few frames to a few GOPs, the pattern where the seek decision matters
+    rng = np.random.default_rng(args.seed)
+    gop = max(1, int(round(index.frame_count / np.sum(index.keyframes))))
+    targets = np.minimum(np.cumsum(rng.integers(1, 3 * gop + SEEK_BACKOFF, args.jumps)) % index.frame_count, len(reference) - 1)
+
+    rows = []
+    for name, use_index in (("blind", False), ("indexed", True)):
+        frame_cache = FrameCache(args.video_path, read_ahead=0, index=use_index)
+        while use_index and frame_cache.index is None: time.sleep(0.01)
+        times, wrong = [], 0
+        for n in targets:
+            frame_cache.clear()
+            start = time.perf_counter()
+            frame = frame_cache.get(int(n))
+            times.append(time.perf_counter() - start)
+            wrong += frame is None or hashlib.sha1(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR).tobytes()).hexdigest() != reference[n]
+        stats = frame_cache.stats()
+        frame_cache.close()
+        rows.append((name, f"{np.mean(times) * 1000:.1f}", f"{stats['decoded'] / len(targets):.1f}", stats['seeks'], wrong))
+    print_table(("seek", "mean jump (ms)", "frames read per jump", "seeks", "wrong frames"), rows)
+
+def bench_proxy(args):
+    proxy = ProxyFrames(args.video_path, scale=args.scale)
+    # always time a full pass
+    if os.path.isfile(proxy.marker_path): os.remove(proxy.marker_path)
+    start = time.perf_counter()
+    proxy.start()
+    proxy.wait()
+    generate_time = time.perf_counter() - start
+    size = os.path.getsize(proxy.data_path) + os.path.getsize(proxy.offsets_path)
+    print(f"{proxy.frame_count} proxy frames (1/{args.scale}) written in {generate_time:.2f} s ({proxy.frame_count / generate_time:.1f} frames/s), {size / 1024 ** 2:.1f} MB in {proxy.data_path}")
+
+    frame_cache = FrameCache(args.video_path, read_ahead=0)
+    display_size = (frame_cache.width // 2, frame_cache.height // 2) # what VideoPlayer draws large videos at
+    targets = np.random.default_rng(args.seed).integers(0, proxy.frame_count, args.frames)
+    rows = []
+    for name, read in (("full resolution", frame_cache.get), ("proxy", proxy.get)):
+        times = []
+        for n in targets:
+            frame_cache.clear()
+            start = time.perf_counter()
+            cv2.resize(read(int(n)), display_size)
+            times.append(time.perf_counter() - start)
+        rows.append((name, f"{np.mean(times) * 1000:.1f}", f"{np.percentile(times, 95) * 1000:.1f}"))
+    frame_cache.close()
+    proxy.close()
+    print(f"Scrubbing {args.frames} random frames drawn at {display_size[0]}x{display_size[1]}")
+    print_table(("frames", "mean (ms)", "p95 (ms)"), rows)
+
+def bench_frame_export(args):
+    cap = cv2.VideoCapture(str(args.video_path))
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    frames = frame_export.sampled_frames(frame_count, args.step)[:args.frames]
+    rows = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # the original path: seek, decode and save one frame at a time as save_frame does
+        start = time.perf_counter()
+        for n in frames: PIL.Image.fromarray(read_frame_seek(cap, n)).save(pathlib.Path(tmpdir) / frame_export.frame_name(n))
+        elapsed = time.perf_counter() - start
+        rows.append(("seek + PIL save", "-", f"{elapsed:.2f}", f"{len(frames) / elapsed:.1f}"))
+        for compression in args.compression.split(','):
+            for workers in (1, None):
+                result = frame_export.export_frames(args.video_path, frames, tmpdir, args.ext, int(compression), workers)
+                rows.append((f"pipeline, {workers or multiprocessing.cpu_count()} writer threads", compression, f"{result['elapsed']:.2f}", f"{result['fps']:.1f}"))
+    cap.release()
+    print(f"{len(frames)} frames, every {args.step} of {args.video_path}, as {args.ext}")
+    print_table(("export", "compression", "time (s)", "frames/s"), rows)
+
+def bench_playback(args):
+    cap = cv2.VideoCapture(str(args.video_path))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) // 2, int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) // 2)
+    proxy = ProxyFrames(args.video_path) if args.proxy else None
+    if proxy is not None:
+        proxy.start()
+        proxy.wait()
+    rows = []
+    for speed in (float(v) for v in args.speeds.split(',')):
+        # the original path: a timer of int(fps / speed) ms, one seek, decode and resize per tick on the GUI thread
+        start, shown, n = time.perf_counter(), 0, args.start
+        while time.perf_counter() - start < args.duration and n < frame_count:
+            tick = time.perf_counter()
+            cv2.resize(read_frame_seek(cap, n), size)
+            n += 1
+            shown += 1
+            time.sleep(max(0, int(fps / speed) / 1000 - (time.perf_counter() - tick)))
+        elapsed = time.perf_counter() - start
+        rows.append((f"{speed}x", "seek per tick", f"{shown / elapsed:.1f}", f"{(n - args.start) / elapsed / fps:.2f}x", "-"))
+
+        engine = PlaybackEngine(args.video_path, fps, frame_count, args.start, speed, proxy, size)
+        interval = 1 / min(fps * speed, 60)
+        start, last = time.perf_counter(), args.start
+        while time.perf_counter() - start < args.duration and not engine.done():
+            item = engine.poll()
+            if item is not None: last = item[0]
+            time.sleep(interval)
+        elapsed = time.perf_counter() - start
+        stats = engine.stats()
+        engine.stop()
+        rows.append((f"{speed}x", "engine" + (" + proxy" if proxy else ""), f"{stats['fps']:.1f}", f"{(last - args.start) / elapsed / fps:.2f}x", stats['dropped'] + stats['skipped']))
+    cap.release()
+    print(f"{args.duration} s of playback per run from frame {args.start} of {args.video_path} ({frame_count} frames at {fps:.1f} fps), drawn at {size[0]}x{size[1]}")
+    print_table(("speed", "playback", "shown fps", "achieved speed", "dropped"), rows)
+
+#^ Presentation
+def bench_present(args):
+    # only needed for this benchmark, the others stay headless
+    from PyQt5 import QtGui, QtCore, QtWidgets
+    from ..widgets.image_presenter import ImagePresenter
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    w, h = (int(v) for v in args.size.split('x'))
+    display = tuple(int(v) for v in args.display.split('x'))
+    frames = [(np.random.default_rng(i).random((h, w, 3)) * 255).astype(np.uint8) for i in range(4)]
+
+    def original(frame):
+        # tobytes copies the frame, then QImage.scaled resamples it at full resolution
+        image = QtGui.QImage(frame.tobytes(), w, h, 3 * w, QtGui.QImage.Format_RGB888)
+        return QtGui.QPixmap.fromImage(image.scaled(*display, QtCore.Qt.KeepAspectRatio))
+    presenter = ImagePresenter(display)
+    rows = []
+    for name, present in (("tobytes + QImage.scaled", original), ("ImagePresenter", presenter.pixmap)):
+        present(frames[0])
+        times = []
+        for i in range(args.repeat):
+            start = time.perf_counter()
+            pixmap = present(frames[i % len(frames)])
+            times.append(time.perf_counter() - start)
+        rows.append((name, f"{pixmap.width()}x{pixmap.height()}", f"{np.mean(times) * 1000:.2f}", f"{np.percentile(times, 95) * 1000:.2f}"))
+    print(f"{w}x{h} frames presented at {display[0]}x{display[1]}, {args.repeat} frames")
+    print_table(("path", "pixmap", "mean (ms)", "p95 (ms)"), rows)
+
+#^ Pose store
+def bench_pose_store(args):
+    poses = np.tile(np.eye(4), (args.poses, 1, 1))
+    poses[:, :3, 3] = np.random.default_rng(0).normal(size=(args.poses, 3))
+    rows = []
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmpdir:
+        poses_dir = pathlib.Path(tmpdir) / "poses"
+        os.makedirs(poses_dir)
+        # the original layout: one npy per frame, prev_frame/next_frame check and load the next path
+        start = time.perf_counter()
+        for n, pose in enumerate(poses): np.save(poses_dir / f"pose_{n}.npy", pose)
+        save_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for n in range(args.poses + args.missing):
+            pose_path = poses_dir / f"pose_{n}.npy"
+            if os.path.isfile(pose_path): np.load(pose_path)
+        rows.append(("npy per frame", f"{save_time:.3f}", "-", f"{time.perf_counter() - start:.3f}", len(os.listdir(poses_dir))))
+
+        pose_store = PoseStore()
+        pose_store.reset()
+        store_path = pathlib.Path(tmpdir) / "poses.bin"
+        pose_store.open(store_path)
+        start = time.perf_counter()
+        for n, pose in enumerate(poses): pose_store.put(n, pose)
+        pose_store.flush()
+        save_time = time.perf_counter() - start
+        pose_store.reset()
+        start = time.perf_counter()
+        pose_store.open(store_path)
+        open_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for n in range(args.poses + args.missing): pose_store.get(n)
+        get_time = time.perf_counter() - start
+        keys, stacked = pose_store.stack()
+        assert np.array_equal(stacked, poses), "the pose store does not round trip the poses"
+        rows.append((f"pose store, batches of {pose_store.batch_size}", f"{save_time:.3f}", f"{open_time:.3f}", f"{get_time:.3f}", 1))
+        pose_store.reset()
+    print(f"{args.poses} poses, {args.missing} frames without a pose, in {args.dir or tempfile.gettempdir()}")
+    print_table(("layout", "save (s)", "open (s)", "load all (s)", "files"), rows)
+
+#^ Image actor update
+def bench_image_update(args):
+    w, h = (int(v) for v in args.size.split('x'))
+    frames = [np.random.default_rng(i).integers(0, 256, (h, w, 3), dtype=np.uint8) for i in range(4)]
+    plotter = pv.Plotter(off_screen=True, window_size=(640, 480))
+    # render() is a no-op until the plotter has been shown once
+    plotter.show(auto_close=False)
+    image_store = ImageStore()
+
+    def new_actor(frame):
+        # the original frame step: a new grid, mesh and actor for every frame
+        image, _, _ = image_store.add_image(frame)
+        mesh = plotter.add_mesh(image, rgb=True, opacity=image_store.image_opacity, name='image')
+        image_store.image_actor, _ = plotter.add_actor(mesh, pickable=False, name='image')
+        plotter.render()
+    def in_place(frame):
+        assert image_store.update_image(image_store.load_image(frame)), "the frame does not fit the image actor"
+        plotter.render()
+    rows = []
+    for name, step in (("new actor per frame", new_actor), ("in-place scalars update", in_place)):
+        new_actor(frames[0])
+        times = []
+        for i in range(args.repeat):
+            start = time.perf_counter()
+            step(frames[(i + 1) % len(frames)])
+            times.append(time.perf_counter() - start)
+        rows.append((name, f"{np.mean(times) * 1000:.1f}", f"{np.percentile(times, 95) * 1000:.1f}"))
+    plotter.close()
+    image_store.reset()
+    print(f"{w}x{h} frames stepped on an offscreen plotter, {args.repeat} frames")
+    print_table(("path", "mean (ms)", "p95 (ms)"), rows)
+
+def main():
+    parser = argparse.ArgumentParser(prog="vision6d-benchmark", description="Benchmark the performance critical paths of vision6D")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    load_mesh_parser = subparsers.add_parser("load-mesh", help="compare the .mesh loaders on load time and peak RSS")
+    load_mesh_parser.add_argument("mesh_path", help="path to a .mesh file")
+    load_mesh_parser.add_argument("--repeat", type=int, default=3, help="number of runs per loader (default: 3)")
+    load_mesh_parser.set_defaults(func=bench_load_mesh)
+
+    mesh_cache_parser = subparsers.add_parser("mesh-cache", help="compare a cold mesh load against a mesh cache hit")
+    mesh_cache_parser.add_argument("mesh_path", help="path to a mesh file")
+    mesh_cache_parser.add_argument("--repeat", type=int, default=5, help="number of cache hits to time (default: 5)")
+    mesh_cache_parser.set_defaults(func=bench_mesh_cache)
+
+    latlon_parser = subparsers.add_parser("latlon", help="compare parsing the latlon json against the compiled .npy")
+    latlon_parser.add_argument("--repeat", type=int, default=5, help="number of fresh processes per loader (default: 5)")
+    latlon_parser.set_defaults(func=bench_latlon)
+
+    sampling_parser = subparsers.add_parser("sampling", help="compare the correspondence samplers on EPnP time and pose error")
+    sampling_parser.add_argument("mesh_path", help="path to a mesh file")
+    sampling_parser.add_argument("--samplers", default="all,budget=500,budget=2000,stride=2,stride=4,grid=500,grid=2000,boundary=2000", help="comma separated strategy[=budget or stride] list")
+    sampling_parser.add_argument("--poses", type=int, default=5, help="number of random poses (default: 5)")
+    sampling_parser.add_argument("--size", default="1920x1080", help="render size as WIDTHxHEIGHT (default: 1920x1080)")
+    sampling_parser.add_argument("--seed", type=int, default=0, help="seed of the poses, the samplers and RANSAC (default: 0)")
+    sampling_parser.set_defaults(func=bench_sampling)
+
+    pnp_parser = subparsers.add_parser("pnp", help="compare the PnP solver backends on time, inlier ratio and pose error")
+    pnp_parser.add_argument("mesh_path", help="path to a mesh file")
+    pnp_parser.add_argument("--solvers", default=None, help=f"comma separated solvers (default: all of {','.join(pnp.SOLVERS)})")
+    pnp_parser.add_argument("--sampler", default="all", help="correspondence sampler as strategy[=budget or stride] (default: all)")
+    pnp_parser.add_argument("--iterations", type=int, default=100, help="RANSAC iterations (default: 100)")
+    pnp_parser.add_argument("--reprojection-error", type=float, default=8.0, help="RANSAC inlier threshold in pixels (default: 8.0)")
+    pnp_parser.add_argument("--poses", type=int, default=5, help="number of random poses (default: 5)")
+    pnp_parser.add_argument("--size", default="1920x1080", help="render size as WIDTHxHEIGHT (default: 1920x1080)")
+    pnp_parser.add_argument("--seed", type=int, default=0, help="seed of the poses, the sampler and RANSAC (default: 0)")
+    pnp_parser.set_defaults(func=bench_pnp)
+
+    sequence_parser = subparsers.add_parser("sequence", help="compare cold PnP against PnP warm-started from the previous frame over a smooth trajectory")
+    sequence_parser.add_argument("mesh_path", help="path to a mesh file")
+    sequence_parser.add_argument("--frames", type=int, default=50, help="number of frames (default: 50)")
+    sequence_parser.add_argument("--step", type=float, default=1.0, help="rotation between consecutive frames in degrees (default: 1.0)")
+    sequence_parser.add_argument("--solver", choices=list(pnp.SOLVERS), default='epnp_ransac', help="cold and fallback PnP backend (default: epnp_ransac)")
+    sequence_parser.add_argument("--max-error", type=float, default=2.0, help="median reprojection error in pixels above which the warm start falls back (default: 2.0)")
+    sequence_parser.add_argument("--sampler", default="all", help="correspondence sampler as strategy[=budget or stride] (default: all)")
+    sequence_parser.add_argument("--iterations", type=int, default=100, help="RANSAC iterations (default: 100)")
+    sequence_parser.add_argument("--reprojection-error", type=float, default=8.0, help="RANSAC inlier threshold in pixels (default: 8.0)")
+    sequence_parser.add_argument("--size", default="1920x1080", help="render size as WIDTHxHEIGHT (default: 1920x1080)")
+    sequence_parser.add_argument("--seed", type=int, default=0, help="seed of the trajectory, the sampler and RANSAC (default: 0)")
+    sequence_parser.set_defaults(func=bench_sequence)
+
+    rasterizer_parser = subparsers.add_parser("rasterizer", help="compare the NumPy rasterizer against the VTK offscreen render on time and pixel agreement")
+    rasterizer_parser.add_argument("mesh_path", help="path to a mesh file")
+    rasterizer_parser.add_argument("--poses", type=int, default=5, help="number of random poses (default: 5)")
+    rasterizer_parser.add_argument("--size", default="1920x1080", help="render size as WIDTHxHEIGHT (default: 1920x1080)")
+    rasterizer_parser.add_argument("--workers", type=int, default=None, help="rasterizer threads (default: number of cpus)")
+    rasterizer_parser.add_argument("--tolerance", type=int, default=1, help="largest channel difference counted as agreeing (default: 1)")
+    rasterizer_parser.add_argument("--msaa", action="store_true", help="keep the multisampling of the VTK render on")
+    rasterizer_parser.add_argument("--seed", type=int, default=0, help="seed of the poses (default: 0)")
+    rasterizer_parser.set_defaults(func=bench_rasterizer)
+
+    frame_cache_parser = subparsers.add_parser("frame-cache", help="compare seeking before every frame read against the read-ahead frame cache")
+    frame_cache_parser.add_argument("video_path", help="path to a video file")
+    frame_cache_parser.add_argument("--frames", type=int, default=60, help="number of frames per access pattern (default: 60)")
+    frame_cache_parser.add_argument("--start", type=int, default=100, help="first frame of the playback pattern (default: 100)")
+    frame_cache_parser.add_argument("--read-ahead", type=int, default=16, help="frames decoded ahead of the playhead (default: 16)")
+    frame_cache_parser.add_argument("--max-mb", type=int, default=1024, help="cache size in MB (default: 1024)")
+    frame_cache_parser.add_argument("--seed", type=int, default=0, help="seed of the scrubbing pattern (default: 0)")
+    frame_cache_parser.set_defaults(func=bench_frame_cache)
+
+    video_index_parser = subparsers.add_parser("video-index", help="build the keyframe index of a video and compare blind against indexed seeking")
+    video_index_parser.add_argument("video_path", help="path to a video file")
+    video_index_parser.add_argument("--jumps", type=int, default=40, help="number of forward jumps (default: 40)")
+    video_index_parser.add_argument("--seed", type=int, default=0, help="seed of the jumps (default: 0)")
+    video_index_parser.set_defaults(func=bench_video_index)
+
+    proxy_parser = subparsers.add_parser("proxy", help="generate the proxy frames of a video and compare scrubbing on them against full resolution decoding")
+    proxy_parser.add_argument("video_path", help="path to a video file")
+    proxy_parser.add_argument("--scale", type=int, default=4, help="downscale factor of the proxy (default: 4)")
+    proxy_parser.add_argument("--frames", type=int, default=40, help="number of random frames to scrub to (default: 40)")
+    proxy_parser.add_argument("--seed", type=int, default=0, help="seed of the scrubbing pattern (default: 0)")
+    proxy_parser.set_defaults(func=bench_proxy)
+
+    frame_export_parser = subparsers.add_parser("frame-export", help="compare saving sampled frames one at a time against the decoder and writer pool pipeline")
+    frame_export_parser.add_argument("video_path", help="path to a video file")
+    frame_export_parser.add_argument("--step", type=int, default=10, help="frames between two sampled frames (default: 10)")
+    frame_export_parser.add_argument("--frames", type=int, default=30, help="number of sampled frames to export (default: 30)")
+    frame_export_parser.add_argument("--ext", choices=['png', 'jpg'], default='png', help="image format (default: png)")
+    frame_export_parser.add_argument("--compression", default="1,3,6", help="comma separated png levels or jpeg qualities (default: 1,3,6)")
+    frame_export_parser.set_defaults(func=bench_frame_export)
+
+    playback_parser = subparsers.add_parser("playback", help="compare the seek per timer tick playback against the playback engine at several speeds")
+    playback_parser.add_argument("video_path", help="path to a video file")
+    playback_parser.add_argument("--speeds", default="1,4,16", help="comma separated playback speeds (default: 1,4,16)")
+    playback_parser.add_argument("--duration", type=float, default=3.0, help="seconds of playback per run (default: 3.0)")
+    playback_parser.add_argument("--start", type=int, default=0, help="first frame (default: 0)")
+    playback_parser.add_argument("--proxy", action="store_true", help="play from the proxy frames, generated first if needed")
+    playback_parser.set_defaults(func=bench_playback)
+
+    present_parser = subparsers.add_parser("present", help="compare the tobytes + QImage.scaled presentation against the shared ImagePresenter")
+    present_parser.add_argument("--size", default="3840x2160", help="frame size as WIDTHxHEIGHT (default: 3840x2160)")
+    present_parser.add_argument("--display", default="1920x1080", help="display size as WIDTHxHEIGHT (default: 1920x1080)")
+    present_parser.add_argument("--repeat", type=int, default=50, help="number of frames presented per path (default: 50)")
+    present_parser.set_defaults(func=bench_present)
+
+    pose_store_parser = subparsers.add_parser("pose-store", help="compare the npy per frame pose layout against the single file pose store")
+    pose_store_parser.add_argument("--poses", type=int, default=10000, help="number of saved poses (default: 10000)")
+    pose_store_parser.add_argument("--missing", type=int, default=1000, help="number of frames looked up without a saved pose (default: 1000)")
+    pose_store_parser.add_argument("--dir", default=None, help="directory to benchmark in, e.g. on a network share (default: the temp directory)")
+    pose_store_parser.set_defaults(func=bench_pose_store)
+
+    image_update_parser = subparsers.add_parser("image-update", help="compare a new image actor per frame step against updating its scalars in place")
+    image_update_parser.add_argument("--size", default="1920x1080", help="frame size as WIDTHxHEIGHT (default: 1920x1080)")
+    image_update_parser.add_argument("--repeat", type=int, default=20, help="number of frame steps per path (default: 20)")
+    image_update_parser.set_defaults(func=bench_image_update)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
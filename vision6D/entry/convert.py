@@ -0,0 +1,123 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: convert.py
+@time: 2026-10-18 11:05
+@desc: the entry to convert folders of meshes between .mesh and PLY/OBJ in parallel
+'''
+
+import os
+import time
+import pathlib
+import argparse
+import concurrent.futures
+
+import numpy as np
+import trimesh
+from easydict import EasyDict
+
+from ..tools import utils
+
+SUFFIXES = ('.mesh', '.ply', '.obj')
+
+def read_header(meshpath):
+    """Read only the header of a .mesh file, so it can be shipped to the workers instead of re-read"""
+    meshobj = utils.load_meshobj_mmap(meshpath)
+    return EasyDict({key: np.array(meshobj[key]) for key in ('id', 'orient', 'dim', 'sz', 'color') if key in meshobj})
+
+def default_header(vertices):
+    # meshes that never were a .mesh file are stored with a unit voxel size
+    header = EasyDict()
+    header.id = np.zeros(1, dtype=np.int32)
+    header.orient = np.array((1, 2, 3), dtype=np.int32)
+    header.dim = np.ceil(vertices.max(axis=0)).astype(np.int32) + 1 if len(vertices) else np.ones(3, dtype=np.int32)
+    header.sz = np.ones(3, dtype=np.float32)
+    header.color = np.array((255, 255, 255), dtype=np.int32)
+    return header
+
+def convert_file(input_path, output_path, pose=None, header=None):
+    start = time.perf_counter()
+    if input_path.suffix == '.mesh':
+        meshobj = utils.load_meshobj_mmap(input_path)
+        vertices = np.asarray(utils.meshobj2polydata(meshobj).points)
+        faces = meshobj.triangles.T
+        # keep the header of the source in memory for a .mesh -> .mesh conversion
+        if header is None: header = meshobj
+    else:
+        mesh = trimesh.load(input_path, force='mesh', process=False)
+        vertices, faces = mesh.vertices, mesh.faces
+
+    if pose is not None: vertices = utils.transform_vertices(vertices, pose)
+
+    if output_path.suffix == '.mesh':
+        if header is None: header = default_header(vertices)
+        meshobj = EasyDict({key: header[key] for key in ('id', 'dim', 'sz', 'color')})
+        meshobj.orient = np.array((1, 2, 3), dtype=np.int32)
+        meshobj.vertices = vertices.T / meshobj.sz.reshape((-1, 1))
+        meshobj.triangles = faces.T
+        utils.save_meshobj(meshobj, output_path)
+    else:
+        trimesh.Trimesh(vertices=vertices, faces=faces, process=False).export(str(output_path))
+
+    return time.perf_counter() - start, len(vertices), len(faces)
+
+def main():
+    parser = argparse.ArgumentParser(prog="vision6d-convert", description="Convert a folder of meshes between .mesh and PLY/OBJ in parallel")
+    parser.add_argument("input_dir", help="folder with the .mesh/.ply/.obj files to convert")
+    parser.add_argument("output_dir", help="folder to write the converted meshes to")
+    parser.add_argument("--to", choices=[suffix[1:] for suffix in SUFFIXES], default="ply", help="output format (default: ply)")
+    parser.add_argument("--pose", help="4x4 pose .npy to bake into the vertices")
+    parser.add_argument("--header", help="reference .mesh whose header (dim, sz, color) is used when writing .mesh files")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: number of cpus)")
+    args = parser.parse_args()
+
+    input_dir = pathlib.Path(args.input_dir)
+    output_dir = pathlib.Path(args.output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    pose = np.load(args.pose) if args.pose else None
+    if pose is not None and pose.shape != (4, 4): parser.error("the pose needs to be a 4 by 4 matrix")
+    header = read_header(args.header) if args.header else None
+
+    jobs = []
+    input_paths = [input_path for input_path in sorted(input_dir.iterdir()) if input_path.suffix.lower() in SUFFIXES]
+    for input_path in input_paths:
+        output_path = output_dir / f"{input_path.stem}.{args.to}"
+        # the source .mesh is memory mapped while it is converted, so it must not be overwritten
+        if output_path.resolve() == input_path.resolve(): continue
+        jobs.append((input_path, output_path))
+
+    # meshes sharing a stem (x.ply and x.obj) would write the same file, and one must not replace another source
+    targets = {}
+    for input_path, output_path in jobs: targets.setdefault(output_path.resolve(), []).append(input_path.name)
+    sources = {input_path.resolve() for input_path in input_paths}
+    collisions = [f"{', '.join(names)} -> {path}" for path, names in targets.items() if len(names) > 1 or path in sources]
+    if len(collisions) > 0: parser.error("some meshes would overwrite each other, rename them first: " + "; ".join(collisions))
+
+    if len(jobs) == 0:
+        print(f"No meshes to convert in {input_dir}")
+        return
+
+    failed = 0
+    total_faces = 0
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(convert_file, input_path, output_path, pose, header): (input_path, output_path) for input_path, output_path in jobs}
+        for future in concurrent.futures.as_completed(futures):
+            input_path, output_path = futures[future]
+            try:
+                elapsed, num_vertices, num_faces = future.result()
+                total_faces += num_faces
+                print(f"{input_path.name} -> {output_path.name}: {elapsed * 1000:.1f} ms ({num_vertices} vertices, {num_faces} triangles)")
+            except Exception as e:
+                failed += 1
+                print(f"{input_path.name}: failed ({e})")
+    elapsed = time.perf_counter() - start
+
+    converted = len(jobs) - failed
+    print(f"Converted {converted}/{len(jobs)} meshes in {elapsed:.2f} s ({converted / elapsed:.1f} meshes/s, {total_faces / elapsed / 1e6:.2f} M triangles/s)")
+
+if __name__ == "__main__":
+    main()
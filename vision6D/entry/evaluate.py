@@ -0,0 +1,239 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: evaluate.py
+@time: 2026-10-18 14:55
+@desc: the entry to evaluate NOCS/LATLON EPnP headlessly over a folder or a video
+'''
+
+import os
+import csv
+import time
+import pathlib
+import argparse
+import itertools
+import concurrent.futures
+
+import cv2
+import PIL.Image
+import numpy as np
+import pyvista as pv
+
+from ..tools import pnp
+from ..tools import utils
+from ..tools.metrics import PoseMetrics
+from ..tools.latlon import LatLonIndex
+from ..tools.video_index import VideoIndex
+from ..tools.correspondences import CorrespondenceSampler
+
+# state of every worker process, set once by init_worker
+WORKER = {}
+
+def load_mesh(mesh_path):
+    mesh = utils.load_polydata(mesh_path) if pathlib.Path(mesh_path).suffix == '.mesh' else pv.read(mesh_path)
+    return np.asarray(mesh.points), mesh.faces.reshape((-1, 4))[:, 1:]
+
+def init_worker(mesh_path, method, camera_intrinsics, camera_position, solver, options, sampler, warm_start=False):
+    vertices, faces = load_mesh(mesh_path)
+    WORKER.update(vertices=vertices, method=method, camera_intrinsics=camera_intrinsics, camera_position=camera_position, solver=solver, options=options, sampler=sampler)
+    if warm_start: WORKER['sequence'] = pnp.SequencePnP(solver, **options)
+    if method == 'latlon':
+        latlon = utils.load_latitude_longitude()
+        assert len(latlon) == len(vertices), f"the latitude/longitude map has {len(latlon)} vertices but {mesh_path} has {len(vertices)}"
+        WORKER['latlon_index'] = LatLonIndex(vertices, faces, latlon[..., 0], latlon[..., 1])
+
+def read_video_frame(video_path, n):
+    """Frame n of the video, read on from the frame the worker read last and seeked to with the video index otherwise"""
+    reader = WORKER.get('reader')
+    if reader is None or reader['video_path'] != video_path:
+        if reader is not None: reader['cap'].release()
+        cap = cv2.VideoCapture(video_path)
+        reader = WORKER['reader'] = {'video_path': video_path, 'cap': cap, 'index': VideoIndex.load_or_build(video_path), 'fps': cap.get(cv2.CAP_PROP_FPS), 'position': 0}
+    cap, index = reader['cap'], reader['index']
+    if n != reader['position']: cap.set(cv2.CAP_PROP_POS_FRAMES, index.seek_frame(n, reader['fps']))
+    retried = False
+    while True:
+        ret, frame = cap.read()
+        if not ret: raise IOError(f"Cannot read frame {n} of {video_path}")
+        # the timestamp gives the exact number of the frame wherever the seek landed
+        number = index.frame_at(cap.get(cv2.CAP_PROP_PTS))
+        reader['position'] = number + 1
+        if number == n: return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if number > n:
+            # a seek past n, go back one keyframe further once
+            if retried: raise IOError(f"Cannot seek to frame {n} of {video_path}")
+            cap.set(cv2.CAP_PROP_POS_FRAMES, index.seek_frame(max(0, index.keyframe_before[n] - 1), reader['fps']))
+            retried = True
+
+def read_image(source):
+    # a video frame is referenced as (video path, frame number) and decoded by the worker
+    if isinstance(source, tuple): return read_video_frame(*source)
+    return source if isinstance(source, np.ndarray) else np.array(PIL.Image.open(source).convert('RGB'), dtype='uint8')
+
+def evaluate_frame(frame, color, mask, gt_pose):
+    """Solve the pose of one frame from its NOCS/LATLON color map (masked by mask if given) and score it against gt_pose"""
+    start = time.perf_counter()
+    color_mask = read_image(color)
+    if mask is not None:
+        mask_data = np.array(PIL.Image.open(mask).convert('L')) if not isinstance(mask, np.ndarray) else mask
+        color_mask = (color_mask * (mask_data[..., None] > 0)).astype(np.uint8)
+    gt_pose = np.load(gt_pose) if not isinstance(gt_pose, np.ndarray) else gt_pose
+
+    if WORKER['method'] == 'nocs': pts3d, pts2d = utils.create_2d_3d_pairs(color_mask, WORKER['vertices'], sampler=WORKER['sampler'])
+    else: pts3d, pts2d = utils.create_latlon_pairs(color_mask, WORKER['latlon_index'], sampler=WORKER['sampler'])
+    sequence = WORKER.get('sequence')
+    if sequence is not None:
+        attempts, fallbacks = sequence.attempts, sequence.fallbacks
+        predicted_pose, inliers = sequence(pts2d, pts3d, WORKER['camera_intrinsics'], WORKER['camera_position'])
+    else: predicted_pose, inliers = pnp.solve_pnp(pts2d, pts3d, WORKER['camera_intrinsics'], WORKER['camera_position'], solver=WORKER['solver'], **WORKER['options'])
+
+    row = {'frame': frame, 'pairs': len(pts2d), 'inliers': int(np.sum(inliers)),
+           'angular_error': utils.angler_distance(predicted_pose[:3, :3], gt_pose[:3, :3]),
+           'translation_error': np.linalg.norm(predicted_pose[:3, 3] - gt_pose[:3, 3]),
+           'time': time.perf_counter() - start}
+    # whether the frame was seeded with the previous pose, and whether it still needed the full solver
+    if sequence is not None: row.update(seeded=sequence.attempts > attempts, fallback=sequence.fallbacks > fallbacks)
+    row.update({f"pred_{i}{j}": predicted_pose[i, j] for i in range(4) for j in range(4)})
+    row.update({f"gt_{i}{j}": gt_pose[i, j] for i in range(4) for j in range(4)})
+    return row
+
+def evaluate_run(frames):
+    """Evaluate consecutive frames in order, each one warm-started from the previous one with warm_start"""
+    if 'sequence' in WORKER: WORKER['sequence'].reset()
+    return [evaluate_frame(*frame) for frame in frames]
+
+def folder_frames(folder_path, colors='images'):
+    """(frame, color, mask, pose) per frame of a folder laid out like the ones FolderStore loads"""
+    color_files, color_dir = utils.list_files(folder_path, colors)
+    pose_files, pose_dir = utils.list_files(folder_path, 'poses')
+    mask_files, mask_dir = utils.list_files(folder_path, 'masks') if (pathlib.Path(folder_path) / 'masks').is_dir() else ([], None)
+    assert len(color_files) == len(pose_files), f"{len(color_files)} {colors} but {len(pose_files)} poses"
+    for i, (color_file, pose_file) in enumerate(zip(color_files, pose_files)):
+        yield pathlib.Path(color_file).stem, color_dir / color_file, mask_dir / mask_files[i] if mask_files else None, pose_dir / pose_file
+
+def video_frames(video_path, pose_dir):
+    """(frame, (video, frame), None, pose) per frame of a video of color maps, with one pose file per frame in pose_dir.
+
+    The frames are only referenced, the workers decode them, so the frames in flight never pile up in memory.
+    """
+    pose_files, pose_dir = utils.list_files(pathlib.Path(pose_dir).parent, pathlib.Path(pose_dir).name)
+    frame_count = VideoIndex.load_or_build(video_path).frame_count
+    for i, pose_file in enumerate(pose_files[:frame_count]):
+        yield i, (str(video_path), i), None, pose_dir / pose_file
+
+def evaluate(frames, mesh_path, method='nocs', camera_intrinsics=None, camera_position=(0, 0, 0), solver='epnp_ransac', options=None, sampler=None, workers=None, warm_start=False, run_size=32):
+    """Run the EPnP evaluation over frames, (frame, color, mask, pose) tuples, and return one row per frame in frame order.
+
+    The frames are handed to the workers in contiguous runs of run_size, at most two runs per worker in flight, so a
+    worker decodes the frames of a video run one after the other. With warm_start the frames are cut into one
+    contiguous run per worker instead and every run is solved in order, each frame seeded with the pose of the previous
+    one (see pnp.SequencePnP).
+    """
+    assert method in ('nocs', 'latlon'), "method should be nocs or latlon"
+    workers = workers or os.cpu_count()
+    initargs = (str(mesh_path), method, np.asarray(camera_intrinsics, dtype=np.float32), np.asarray(camera_position), solver, options or {}, sampler, warm_start)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=initargs) as executor:
+        if warm_start:
+            # the frames only reference their color maps, listing them is cheap
+            frames = list(frames)
+            runs = np.array_split(np.arange(len(frames)), min(len(frames), workers)) if frames else []
+            futures = [executor.submit(evaluate_run, [frames[i] for i in run]) for run in runs]
+            return [row for future in futures for row in future.result()]
+        frames = iter(frames)
+        rows, futures = [], []
+        while True:
+            while len(futures) < 2 * workers:
+                run = list(itertools.islice(frames, run_size))
+                if not run: break
+                futures.append(executor.submit(evaluate_run, run))
+            if not futures: return rows
+            rows.extend(futures.pop(0).result())
+
+def score(rows, mesh_path, camera_intrinsics, camera_position=(0, 0, 0), symmetric=False, max_points=None):
+    """Add the ADD(-S) and projection errors of all the frames to rows, in one batch, and return the summary"""
+    pred = np.array([[[row[f"pred_{i}{j}"] for j in range(4)] for i in range(4)] for row in rows])
+    gt = np.array([[[row[f"gt_{i}{j}"] for j in range(4)] for i in range(4)] for row in rows])
+    vertices, _ = load_mesh(mesh_path)
+    errors, summary = PoseMetrics(vertices, max_points=max_points).evaluate(pred, gt, camera_intrinsics, camera_position, symmetric)
+    for name in ('add', 'add_s', 'projection_error'):
+        if name not in errors: continue
+        for row, error in zip(rows, errors[name]): row[name] = error
+    return summary
+
+def write_results(rows, output_path):
+    output_path = pathlib.Path(output_path)
+    if output_path.suffix == '.parquet':
+        import pandas as pd # only needed for parquet output
+        pd.DataFrame(rows).to_parquet(output_path)
+    else:
+        with open(output_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+
+def main():
+    parser = argparse.ArgumentParser(prog="vision6d-evaluate", description="Evaluate NOCS/LATLON EPnP over a folder or a video of color maps")
+    parser.add_argument("source", help="folder with images/masks/poses/meshes subfolders, or a video of color maps")
+    parser.add_argument("output", help="results file, .csv or .parquet")
+    parser.add_argument("--method", choices=['nocs', 'latlon'], default='nocs', help="how the color maps encode the mesh (default: nocs)")
+    parser.add_argument("--colors", default="images", help="subfolder with the color maps (default: images)")
+    parser.add_argument("--mesh", help="mesh file (default: the first path in meshes/mesh_path.txt)")
+    parser.add_argument("--poses", help="folder with the gt poses, required for a video")
+    parser.add_argument("--camera", help="3x3 camera intrinsics .npy")
+    parser.add_argument("--fx", type=float, default=50000, help="focal length in pixels when --camera is not given (default: 50000)")
+    parser.add_argument("--size", default="1920x1080", help="image size as WIDTHxHEIGHT, the principal point is its center (default: 1920x1080)")
+    parser.add_argument("--camera-position", default="0,0,0", help="camera position added to the predicted translation (default: 0,0,0)")
+    parser.add_argument("--solver", choices=list(pnp.SOLVERS), default='epnp_ransac', help="PnP backend (default: epnp_ransac)")
+    parser.add_argument("--iterations", type=int, default=100, help="RANSAC iterations (default: 100)")
+    parser.add_argument("--reprojection-error", type=float, default=8.0, help="RANSAC inlier threshold in pixels (default: 8.0)")
+    parser.add_argument("--sampler", default="all", help="correspondence sampler as strategy[=budget or stride] (default: all)")
+    parser.add_argument("--warm-start", action="store_true", help="seed every frame with the pose of the previous one, falling back to the solver when it does not fit")
+    parser.add_argument("--symmetric", action="store_true", help="score with ADD-S instead of ADD, for symmetric objects")
+    parser.add_argument("--metric-points", type=int, default=None, help="score on at most this many mesh vertices (default: all)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: number of cpus)")
+    args = parser.parse_args()
+
+    source = pathlib.Path(args.source)
+    if source.is_dir():
+        frames = list(folder_frames(source, args.colors))
+        mesh_path = args.mesh
+        if mesh_path is None:
+            with open(source / "meshes" / "mesh_path.txt", "r") as f: mesh_path = f.read().splitlines()[0]
+    else:
+        if args.poses is None or args.mesh is None: parser.error("a video needs --poses and --mesh")
+        frames = video_frames(source, args.poses)
+        mesh_path = args.mesh
+
+    if args.camera: camera_intrinsics = np.load(args.camera)
+    else:
+        w, h = (int(v) for v in args.size.split('x'))
+        camera_intrinsics = np.array([[args.fx, 0, w // 2], [0, args.fx, h // 2], [0, 0, 1]])
+    camera_position = [float(v) for v in args.camera_position.split(',')]
+    sampler = None if args.sampler == 'all' else CorrespondenceSampler.parse(args.sampler)
+    options = {'iterations': args.iterations, 'reprojection_error': args.reprojection_error}
+
+    start = time.perf_counter()
+    rows = evaluate(frames, mesh_path, args.method, camera_intrinsics, camera_position, args.solver, options, sampler, args.workers, args.warm_start)
+    elapsed = time.perf_counter() - start
+    if len(rows) == 0:
+        print(f"No frames to evaluate in {source}")
+        return
+
+    summary = score(rows, mesh_path, camera_intrinsics, camera_position, args.symmetric, args.metric_points)
+    write_results(rows, args.output)
+    angular = np.array([row['angular_error'] for row in rows])
+    translation = np.array([row['translation_error'] for row in rows])
+    print(f"Evaluated {len(rows)} frames in {elapsed:.2f} s ({len(rows) / elapsed:.1f} frames/s), results in {args.output}")
+    print(f"Angular error (in degree): mean {angular.mean():.3f}, median {np.median(angular):.3f}")
+    print(f"Translation error: mean {translation.mean():.3f}, median {np.median(translation):.3f}")
+    print(f"{'ADD-S' if args.symmetric else 'ADD'}: accuracy {summary['add_accuracy'] * 100:.1f}% at 10% of the diameter ({summary['diameter']:.3f}), AUC {summary['add_auc']:.3f}")
+    print(f"Projection error: accuracy {summary['projection_accuracy'] * 100:.1f}% at 5 px, AUC {summary['projection_auc']:.3f} up to 40 px")
+    if args.warm_start:
+        seeded = sum(row['seeded'] for row in rows)
+        fallbacks = sum(row['fallback'] for row in rows)
+        print(f"Warm start fallbacks: {fallbacks}/{seeded} ({fallbacks / max(seeded, 1) * 100:.1f}%)")
+
+if __name__ == "__main__":
+    main()
@@ -34,6 +34,7 @@ from .components import MeshStore
 from .components import PointStore
 from .components import VideoStore
 from .components import FolderStore
+from .components import PoseStore
 
 from .containers import CameraContainer
 from .containers import ImageContainer
@@ -68,6 +69,7 @@ class MyMainWindow(MainWindow):
         self.point_store = PointStore()
         self.video_store = VideoStore()
         self.folder_store = FolderStore()
+        self.pose_store = PoseStore()
 
         # Create widgets
         self.color_button = QtWidgets.QPushButton("Color")
@@ -274,7 +276,9 @@ class MyMainWindow(MainWindow):
         VideoFolderMenu = mainMenu.addMenu('Video/Folder')
         VideoFolderMenu.addAction('Play', self.video_folder_container.play_video)
         VideoFolderMenu.addAction('Sample', self.video_folder_container.sample_video)
+        VideoFolderMenu.addAction('Export Sampled Frames', self.video_folder_container.export_sampled_frames)
         VideoFolderMenu.addAction('Save Frame', self.video_folder_container.save_frame)
+        VideoFolderMenu.addAction('Export Pose Files', self.video_folder_container.export_pose_files)
         VideoFolderMenu.addAction('Prev Frame', self.video_folder_container.prev_frame)
         VideoFolderMenu.addAction('Next Frame', self.video_folder_container.next_frame)
 
@@ -291,12 +295,17 @@ class MyMainWindow(MainWindow):
         RegisterMenu.addAction('Reset Mask (t)', self.mask_container.reset_mask)
         RegisterMenu.addAction('Update GT Pose (l)', self.mesh_container.update_gt_pose)
         RegisterMenu.addAction('Undo Pose (s)', self.mesh_container.undo_pose)
+        RegisterMenu.addAction('ICP to Points (point-to-point)', functools.partial(self.mesh_container.icp_register, 'point_to_point'))
+        RegisterMenu.addAction('ICP to Points (point-to-plane)', functools.partial(self.mesh_container.icp_register, 'point_to_plane'))
 
         # Add pnp algorithm related actions
         PnPMenu = mainMenu.addMenu('PnP')
         PnPMenu.addAction('EPnP with mesh', self.pnp_container.epnp_mesh)
         PnPMenu.addAction('EPnP with nocs mask', functools.partial(self.pnp_container.epnp_mask, True))
         PnPMenu.addAction('EPnP with latlon mask', functools.partial(self.pnp_container.epnp_mask, False))
+        render_free_action = PnPMenu.addAction('Render-free NOCS correspondences')
+        render_free_action.setCheckable(True)
+        render_free_action.toggled.connect(self.pnp_container.set_render_free)
 
     # ^Panel
     def set_panel_bar(self):
@@ -707,6 +716,7 @@ class MyMainWindow(MainWindow):
         self.point_store.reset()
         self.video_store.reset()
         self.folder_store.reset()
+        self.pose_store.reset()
         self.workspace_path = ''
         self.track_actors_names.clear()
         self.clear_output_text()
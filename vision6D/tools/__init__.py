@@ -1 +1,14 @@
-from . import utils
\ No newline at end of file
+from . import utils
+from . import synthesis
+from . import latlon
+from . import correspondences
+from . import pnp
+from . import projection
+from . import rasterizer
+from . import registration
+from . import metrics
+from . import frame_cache
+from . import video_index
+from . import proxy
+from . import frame_export
+from . import playback
@@ -0,0 +1,75 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: correspondences.py
+@time: 2026-10-18 13:45
+@desc: the samplers that pick which foreground pixels become 2D-3D correspondences for EPnP
+'''
+
+import math
+
+import cv2
+import numpy as np
+
+class CorrespondenceSampler:
+    """Pick the (x, y) foreground pixels of a binary mask handed to PnP.
+
+    strategy is one of
+        all:      every foreground pixel
+        budget:   a uniform random subset of budget pixels
+        stride:   every stride-th pixel along both image axes
+        grid:     one random pixel per cell of a grid sized so that about budget cells are occupied
+        boundary: budget pixels drawn with a probability that decays with the distance to the mask border
+    """
+    STRATEGIES = ('all', 'budget', 'stride', 'grid', 'boundary')
+
+    def __init__(self, strategy='all', budget=2000, stride=4, seed=0):
+        assert strategy in self.STRATEGIES, f"strategy should be one of {self.STRATEGIES}"
+        self.strategy = strategy
+        self.budget = budget
+        self.stride = stride
+        self.seed = seed
+
+    @classmethod
+    def parse(cls, text, seed=0):
+        """Build a sampler from 'strategy[=value]', the value being the stride for stride and the budget otherwise"""
+        strategy, _, value = text.partition('=')
+        if strategy == 'stride': return cls(strategy, stride=int(value or 4), seed=seed)
+        return cls(strategy, budget=int(value or 2000), seed=seed)
+
+    def __repr__(self):
+        if self.strategy == 'all': return "all"
+        if self.strategy == 'stride': return f"stride={self.stride}"
+        return f"{self.strategy}={self.budget}"
+
+    def __call__(self, binary_mask):
+        binary_mask = np.asarray(binary_mask)
+        if binary_mask.ndim == 3: binary_mask = binary_mask[..., 0]
+        # the same (x, y) order create_2d_3d_pairs uses for opencv
+        y, x = np.where(binary_mask == 1)
+        pts = np.stack((x, y), axis=1)
+        if self.strategy == 'all' or (self.strategy != 'stride' and len(pts) <= self.budget): return pts
+        # a fresh generator per call, so the same mask always gives the same sample
+        rng = np.random.default_rng(self.seed)
+
+        if self.strategy == 'budget':
+            keep = np.sort(rng.choice(len(pts), self.budget, replace=False))
+
+        elif self.strategy == 'stride':
+            keep = np.flatnonzero((x % self.stride == 0) & (y % self.stride == 0))
+
+        elif self.strategy == 'grid':
+            size = max(1, int(math.ceil(math.sqrt(len(pts) / self.budget))))
+            cells = (y // size) * (binary_mask.shape[1] // size + 1) + x // size
+            order = rng.permutation(len(pts))
+            _, first = np.unique(cells[order], return_index=True)
+            keep = np.sort(order[first])
+
+        elif self.strategy == 'boundary':
+            distance = cv2.distanceTransform(binary_mask.astype(np.uint8), cv2.DIST_L2, 3)[y, x]
+            weights = 1 / distance # distances start at 1 on the border
+            keep = np.sort(rng.choice(len(pts), self.budget, replace=False, p=weights / weights.sum()))
+
+        return pts[keep]
@@ -0,0 +1,166 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: frame_cache.py
+@time: 2026-10-18 17:45
+@desc: the decoded frame cache of a video, a bounded LRU filled by a read-ahead thread that only seeks on real jumps
+'''
+
+import time
+import threading
+import collections
+
+import cv2
+
+from .video_index import VideoIndex
+
+class FrameCache:
+    """RGB frames of one video by frame number.
+
+    Decoded frames are kept in an LRU bounded by max_bytes. A background thread keeps decoding sequentially from
+    where the capture stands while it is behind the playhead plus read_ahead frames, so playback and stepping are
+    served from memory. A frame that is not cached is decoded on the spot: a short jump forward (up to max_skip
+    frames) is decoded through, anything else is a real jump and seeks. Stepping back seeks read_ahead frames
+    further back and decodes up to the frame, so the following steps back are cached too.
+
+    With index, the VideoIndex of the video is loaded or built on another thread, or taken as is if index is one
+    already loaded. Once there, the frame count and fps are exact, every decoded frame is numbered from its
+    timestamp and a jump only seeks when that decodes fewer frames than decoding through.
+    """
+    def __init__(self, video_path, max_bytes=1024 ** 3, read_ahead=16, max_skip=32, index=True):
+        self.video_path = str(video_path)
+        self.cap = cv2.VideoCapture(self.video_path)
+        if not self.cap.isOpened(): raise IOError(f"Cannot open video {self.video_path}")
+        self.capture_fps = self.cap.get(cv2.CAP_PROP_FPS) # what OpenCV converts frame numbers to times with
+        self.fps = self.capture_fps
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.max_bytes = max_bytes
+        self.read_ahead = read_ahead
+        self.max_skip = max_skip
+
+        self.frames = collections.OrderedDict()
+        self.nbytes = 0
+        self.position = 0 # the frame the capture decodes next
+        self.playhead = 0
+        self.hits = 0
+        self.misses = 0
+        self.seeks = 0
+        self.decoded = 0
+
+        # the capture is only touched under the lock, the condition wakes the reader when the playhead moves
+        self.lock = threading.RLock()
+        self.moved = threading.Condition(self.lock)
+        self.closed = False
+        self.index = None
+        self.reader = threading.Thread(target=self.read_loop, name=f"FrameCache({self.video_path})", daemon=True)
+        self.reader.start()
+        if isinstance(index, VideoIndex): self.load_index(index)
+        elif index: threading.Thread(target=self.load_index, name=f"VideoIndex({self.video_path})", daemon=True).start()
+
+    def load_index(self, index=None):
+        if index is None:
+            try: index = VideoIndex.load_or_build(self.video_path)
+            except IOError: return
+        with self.lock:
+            self.index = index
+            self.frame_count = index.frame_count
+            if index.fps > 0: self.fps = index.fps
+
+    def put(self, n, frame):
+        if n in self.frames: return
+        self.frames[n] = frame
+        self.nbytes += frame.nbytes
+        # drop the least recently used frames, never the one just decoded
+        while self.nbytes > self.max_bytes and len(self.frames) > 1:
+            _, evicted = self.frames.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def should_seek(self, n):
+        if n < self.position: return True
+        if self.index is None: return n - self.position > self.max_skip
+        return n - self.position + 1 > self.index.seek_cost(n)
+
+    def seek(self, n):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, n if self.index is None else self.index.seek_frame(n, self.capture_fps))
+        self.position = n
+        self.seeks += 1
+
+    def decode(self, n, start=None):
+        """Move the capture to frame n and decode it, seeking (to start if given) only when decoding through costs more"""
+        if self.should_seek(n): self.seek(n if start is None else max(0, start))
+        retried = False
+        # the frames in between still have to be decoded, so keep them
+        while self.position <= n:
+            ret, frame = self.cap.read()
+            if not ret:
+                # the container over-reported its length
+                self.frame_count = min(self.frame_count, self.position)
+                return None
+            self.decoded += 1
+            # the timestamp gives the exact number of the frame wherever the seek landed
+            number = self.position if self.index is None else self.index.frame_at(self.cap.get(cv2.CAP_PROP_PTS))
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # the cached array is handed out as is, callers copy it before editing
+            frame.flags.writeable = False
+            self.put(number, frame)
+            self.position = number + 1
+            # a seek past n on a variable frame rate video, go back one keyframe further once
+            if number > n and n not in self.frames and not retried:
+                self.seek(max(0, self.index.keyframe_before[n] - 1))
+                retried = True
+        return self.frames.get(n)
+
+    def get(self, n):
+        """The (h, w, 3) uint8 RGB frame n, or None past the end of the video"""
+        with self.lock:
+            stepping_back = self.playhead - self.max_skip <= n < self.playhead
+            self.playhead = n
+            frame = self.frames.get(n)
+            if frame is not None:
+                self.hits += 1
+                self.frames.move_to_end(n)
+            else:
+                self.misses += 1
+                frame = self.decode(n, n - self.read_ahead if stepping_back else None)
+            self.moved.notify()
+        return frame
+
+    def read_loop(self):
+        while True:
+            with self.lock:
+                while not self.closed and not (self.playhead <= self.position <= min(self.playhead + self.read_ahead, self.frame_count - 1)):
+                    self.moved.wait()
+                if self.closed: return
+                # frames already cached from an earlier pass still cost a decode to step the capture over
+                self.decode(self.position)
+            # let the main thread take the lock between two frames
+            time.sleep(0)
+
+    def wait(self, timeout=None):
+        """Block until the read-ahead window of the playhead is decoded"""
+        start = time.perf_counter()
+        while timeout is None or time.perf_counter() - start < timeout:
+            with self.lock:
+                if self.closed or self.position > min(self.playhead + self.read_ahead, self.frame_count - 1): return True
+            time.sleep(0.001)
+        return False
+
+    def clear(self):
+        with self.lock:
+            self.frames.clear()
+            self.nbytes = 0
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.moved.notify()
+        self.reader.join()
+        self.cap.release()
+        self.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "seeks": self.seeks, "decoded": self.decoded, "frames": len(self.frames), "bytes": self.nbytes, "max_bytes": self.max_bytes}
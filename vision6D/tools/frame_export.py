@@ -0,0 +1,86 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: frame_export.py
+@time: 2026-10-18 19:30
+@desc: the export of the sampled frames of a video, a sequential decoder thread feeding a pool of image writers
+'''
+
+import os
+import time
+import pathlib
+import threading
+
+import cv2
+
+from .synthesis import ImageWriter
+
+def frames_dir(video_path):
+    """<stem>_vision6D/frames next to the video, where VideoFolderContainer saves and looks for frames"""
+    video_path = pathlib.Path(video_path)
+    return video_path.parent / f"{video_path.stem}_vision6D" / "frames"
+
+def frame_name(n, ext='png'):
+    return f"frame_{n}.{ext}"
+
+def sampled_frames(frame_count, step, start=0):
+    """The frames next_frame visits from start, every step frames"""
+    return list(range(start, frame_count, max(1, int(step))))
+
+def write_params(ext, compression=None):
+    # compression is the png level (0-9) or the jpeg quality (0-100)
+    if compression is None: return []
+    if ext == 'png': return [cv2.IMWRITE_PNG_COMPRESSION, int(compression)]
+    if ext in ('jpg', 'jpeg'): return [cv2.IMWRITE_JPEG_QUALITY, int(compression)]
+    return []
+
+def decode_frames(video_path, frames, writer, output_dir, ext, cancel):
+    # one sequential pass, the frames in between are grabbed but never converted
+    wanted = sorted(set(frames))
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        n = 0
+        for target in wanted:
+            while n < target and not cancel.is_set():
+                if not cap.grab(): return
+                n += 1
+            if cancel.is_set(): return
+            ret, frame = cap.read()
+            if not ret: return
+            writer.put(output_dir / frame_name(n, ext), frame)
+            n += 1
+    finally:
+        cap.release()
+
+def export_frames(video_path, frames, output_dir=None, ext='png', compression=None, workers=None, progress=None, interval=0.1):
+    """Write the given frame numbers of the video to output_dir/frame_N.ext (<stem>_vision6D/frames by default).
+
+    A decoder thread reads the video sequentially and a pool of workers writer threads encodes the images. Every
+    interval seconds progress(written, total, fps) is called on the calling thread, it cancels the export by
+    returning False. Returns the number of frames written, the elapsed time and whether it was cancelled.
+    """
+    output_dir = pathlib.Path(output_dir) if output_dir is not None else frames_dir(video_path)
+    os.makedirs(output_dir, exist_ok=True)
+    total = len(set(frames))
+    cancel = threading.Event()
+    start = time.perf_counter()
+    writer = ImageWriter(workers=workers or os.cpu_count(), params=write_params(ext, compression), rgb=False)
+    decoder = threading.Thread(target=decode_frames, args=(video_path, frames, writer, output_dir, ext, cancel), daemon=True)
+    decoder.start()
+    try:
+        while decoder.is_alive():
+            decoder.join(interval)
+            elapsed = time.perf_counter() - start
+            if progress is not None and progress(writer.written, total, writer.written / elapsed) is False: cancel.set()
+    except BaseException:
+        cancel.set()
+        raise
+    finally:
+        # the frames already decoded are still written
+        decoder.join()
+        writer.close()
+    elapsed = time.perf_counter() - start
+    if progress is not None: progress(writer.written, total, writer.written / elapsed)
+    return {'written': writer.written, 'total': total, 'elapsed': elapsed, 'fps': writer.written / elapsed, 'cancelled': cancel.is_set()}
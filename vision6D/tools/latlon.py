@@ -0,0 +1,129 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: latlon.py
+@time: 2026-10-18 13:10
+@desc: the batched latitude/longitude to xyz lookup, a vectorized version of utils.latLon2xyz
+'''
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+class LatLonIndex:
+    """Uniform grid over the mesh faces in (lat, lon) space, built once per mesh and queried for all pixels at once.
+
+    query(gx, gy) gives the same points as calling utils.latLon2xyz(m, lat, lon[m.faces], msk, gx[i], gy[i])
+    for every pixel i, with msk the faces whose latitudes and longitudes are all valid (>= 0).
+    """
+    def __init__(self, vertices, faces, lat, lon, resolution=64, chunk_size=100000):
+        self.vertices = np.asarray(vertices, dtype=np.float64)
+        self.faces = np.asarray(faces, dtype=np.int64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.resolution = resolution
+        self.chunk_size = chunk_size # pixels resolved per batch, bounds the (pixel, face) pair arrays
+
+        latf, lonf = self.lat[self.faces], self.lon[self.faces]
+        self.bbox = np.stack((latf.min(axis=1), latf.max(axis=1), lonf.min(axis=1), lonf.max(axis=1)), axis=1)
+        valid = np.flatnonzero((np.sum(lonf >= 0, axis=1) == 3) & (np.sum(latf >= 0, axis=1) == 3))
+
+        # register every valid face in all the grid cells its bounding box overlaps
+        if len(valid):
+            self.origin = np.array((self.bbox[valid, 0].min(), self.bbox[valid, 2].min()))
+            extent = np.array((self.bbox[valid, 1].max(), self.bbox[valid, 3].max())) - self.origin
+        else:
+            self.origin, extent = np.zeros(2), np.ones(2)
+        self.cell_size = np.where(extent > 0, extent, 1) / resolution
+        lo = self.cell(self.bbox[valid, 0], self.bbox[valid, 2])
+        hi = self.cell(self.bbox[valid, 1], self.bbox[valid, 3])
+        span = hi - lo + 1
+        counts = span[:, 0] * span[:, 1]
+        face_ids = np.repeat(valid, counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cx = np.repeat(lo[:, 0], counts) + offsets // np.repeat(span[:, 1], counts)
+        cy = np.repeat(lo[:, 1], counts) + offsets % np.repeat(span[:, 1], counts)
+        cell_ids = cx * resolution + cy
+        # stable sort keeps the faces of every cell in ascending order, the order latLon2xyz visits them in
+        order = np.argsort(cell_ids, kind='stable')
+        self.cell_faces = face_ids[order]
+        self.cell_start = np.searchsorted(cell_ids[order], np.arange(resolution * resolution + 1))
+
+        # pixels outside every face fall back to the first face around the nearest vertex
+        used = np.unique(self.faces)
+        self.tree = cKDTree(np.stack((self.lat[used], self.lon[used]), axis=1))
+        self.tree_vertices = used
+        first_face = np.full(len(self.lat), len(self.faces), dtype=np.int64)
+        np.minimum.at(first_face, self.faces.ravel(), np.repeat(np.arange(len(self.faces)), 3))
+        self.first_face = first_face
+
+    def cell(self, gx, gy):
+        ij = np.stack(((np.asarray(gx) - self.origin[0]) / self.cell_size[0], (np.asarray(gy) - self.origin[1]) / self.cell_size[1]), axis=-1)
+        return np.clip(np.floor(ij), 0, self.resolution - 1).astype(np.int64)
+
+    def candidates(self, gx, gy):
+        """(pixel, face) pairs whose face bounding box contains the pixel, sorted by pixel then face"""
+        ij = self.cell(gx, gy)
+        cells = ij[:, 0] * self.resolution + ij[:, 1]
+        starts = self.cell_start[cells]
+        counts = self.cell_start[cells + 1] - starts
+        pixels = np.repeat(np.arange(len(gx)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        faces = self.cell_faces[np.repeat(starts, counts) + offsets]
+        box = self.bbox[faces]
+        keep = (box[:, 0] <= gx[pixels]) & (gx[pixels] <= box[:, 1]) & (box[:, 2] <= gy[pixels]) & (gy[pixels] <= box[:, 3])
+        return pixels[keep], faces[keep]
+
+    def resolve(self, faces, gx, gy):
+        """The closest point on every face to its (gx, gy) in (lat, lon) space, mapped to xyz, and its squared distance"""
+        f = self.faces[faces]
+        v0, v1, v2 = self.vertices[f[:, 0]], self.vertices[f[:, 1]], self.vertices[f[:, 2]]
+        p0 = np.stack((self.lat[f[:, 0]], self.lon[f[:, 0]]), axis=1)
+        p1 = np.stack((self.lat[f[:, 1]], self.lon[f[:, 1]]), axis=1)
+        p2 = np.stack((self.lat[f[:, 2]], self.lon[f[:, 2]]), axis=1)
+        g = np.stack((gx, gy), axis=1)
+        V = np.stack((p1 - p0, p2 - p0), axis=2)
+        ab = (np.linalg.pinv(V) @ (g - p0)[..., None])[..., 0]
+        a, b = ab[:, 0], ab[:, 1]
+        inside = (a >= 0) & (b >= 0) & (a + b <= 1)
+        points = v0 + a[:, None] * (v1 - v0) + b[:, None] * (v2 - v0)
+        dists = np.sum((p0 + (V @ ab[..., None])[..., 0] - g) ** 2, axis=1)
+
+        # outside the triangle, snap to the closest of its three edges
+        with np.errstate(divide='ignore', invalid='ignore'):
+            e01, e02, e12 = p1 - p0, p2 - p0, p2 - p1
+            c = np.clip(np.sum(e01 * (g - p0), axis=1) / np.sum(e01 ** 2, axis=1), 0, 1)
+            d = np.clip(np.sum(e02 * (g - p0), axis=1) / np.sum(e02 ** 2, axis=1), 0, 1)
+            e = np.clip(np.sum(e12 * (g - p1), axis=1) / np.sum(e12 ** 2, axis=1), 0, 1)
+            d1 = np.sum((c[:, None] * e01 + p0 - g) ** 2, axis=1)
+            d2 = np.sum((d[:, None] * e02 + p0 - g) ** 2, axis=1)
+            d3 = np.sum((e[:, None] * e12 + p1 - g) ** 2, axis=1)
+            first = (d1 < d2) & (d1 < d3)
+            second = ~first & (d2 < d3)
+        edge_points = np.where(first[:, None], v0 + c[:, None] * (v1 - v0), np.where(second[:, None], v0 + d[:, None] * (v2 - v0), v1 + e[:, None] * (v2 - v1)))
+        edge_dists = np.where(first, d1, np.where(second, d2, d3))
+        points = np.where(inside[:, None], points, edge_points)
+        dists = np.where(inside, dists, edge_dists)
+        # degenerate faces give nan distances, they only win when nothing else is left
+        return points, np.where(np.isnan(dists), np.inf, dists)
+
+    def query(self, gx, gy):
+        gx = np.asarray(gx, dtype=np.float64).ravel()
+        gy = np.asarray(gy, dtype=np.float64).ravel()
+        xyz = np.zeros((len(gx), 3))
+        for start in range(0, len(gx), self.chunk_size):
+            cx, cy = gx[start:start + self.chunk_size], gy[start:start + self.chunk_size]
+            pixels, faces = self.candidates(cx, cy)
+            missing = np.setdiff1d(np.arange(len(cx)), pixels)
+            if len(missing):
+                _, nearest = self.tree.query(np.stack((cx[missing], cy[missing]), axis=1))
+                pixels = np.concatenate((pixels, missing))
+                faces = np.concatenate((faces, self.first_face[self.tree_vertices[nearest]]))
+            points, dists = self.resolve(faces, cx[pixels], cy[pixels])
+            # per pixel the smallest distance wins, ties go to the lowest face index
+            order = np.lexsort((faces, dists, pixels))
+            sorted_pixels = pixels[order]
+            first = np.concatenate(([True], sorted_pixels[1:] != sorted_pixels[:-1]))
+            xyz[start + sorted_pixels[first]] = points[order[first]]
+        return xyz
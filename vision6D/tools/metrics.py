@@ -0,0 +1,117 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: metrics.py
+@time: 2026-10-18 17:10
+@desc: the vectorized pose error metrics, ADD, ADD-S, 2D projection error and AUC over stacks of poses
+'''
+
+import pathlib
+
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.spatial import ConvexHull
+from scipy.spatial.distance import pdist
+
+from . import utils
+
+def load_poses(poses_dir):
+    """(N, 4, 4) stack of the .npy poses in poses_dir, in the frame order FolderStore uses"""
+    files, dir = utils.list_files(pathlib.Path(poses_dir).parent, pathlib.Path(poses_dir).name)
+    return np.stack([np.load(dir / f) for f in files if pathlib.Path(f).suffix == '.npy'])
+
+def rotation_error(pred, gt):
+    """utils.angler_distance over (N, 4, 4) or (N, 3, 3) stacks, in degrees"""
+    trace = np.einsum('nij,nij->n', pred[:, :3, :3], gt[:, :3, :3])
+    return np.degrees(np.arccos(np.clip((trace - 1) / 2, -1, 1)))
+
+def translation_error(pred, gt):
+    return np.linalg.norm(pred[:, :3, 3] - gt[:, :3, 3], axis=1)
+
+def accuracy_curve(errors, max_threshold, steps=100):
+    """The thresholds from 0 to max_threshold and the fraction of errors within each of them"""
+    thresholds = np.linspace(0, max_threshold, steps + 1)
+    accuracy = np.searchsorted(np.sort(errors), thresholds, side='right') / len(errors)
+    return thresholds, accuracy
+
+def auc(errors, max_threshold, steps=100):
+    """Area under the accuracy curve up to max_threshold, normalized to [0, 1]"""
+    thresholds, accuracy = accuracy_curve(errors, max_threshold, steps)
+    return np.sum((accuracy[1:] + accuracy[:-1]) / 2 * np.diff(thresholds)) / max_threshold
+
+class PoseMetrics:
+    """Pose errors of one mesh over stacks of predicted and GT poses.
+
+    The vertices are moved for many poses at once in chunks of about chunk_size points, and ADD-S matches them
+    against one KD-tree over the mesh vertices, built on first use and kept for every later call. max_points keeps an
+    evenly strided subset of the vertices of dense meshes, the cost of every metric grows with it.
+    """
+    def __init__(self, vertices, chunk_size=2000000, max_points=None):
+        self.vertices = np.asarray(vertices, dtype=np.float64)
+        if max_points is not None and len(self.vertices) > max_points: self.vertices = self.vertices[::int(np.ceil(len(self.vertices) / max_points))]
+        self.chunk_size = chunk_size
+        self.tree = None
+        self.diameter = None
+
+    def get_tree(self):
+        if self.tree is None: self.tree = cKDTree(self.vertices)
+        return self.tree
+
+    def get_diameter(self):
+        # the farthest vertices of a mesh are always on its convex hull
+        if self.diameter is None: self.diameter = pdist(self.vertices[ConvexHull(self.vertices).vertices]).max()
+        return self.diameter
+
+    def chunks(self, n):
+        step = max(1, self.chunk_size // len(self.vertices))
+        for start in range(0, n, step): yield slice(start, min(start + step, n))
+
+    def transform(self, poses):
+        """(N, V, 3) vertices moved by every pose in the (N, 4, 4) stack"""
+        return np.einsum('nij,vj->nvi', poses[:, :3, :3], self.vertices) + poses[:, None, :3, 3]
+
+    def add(self, pred, gt):
+        """Mean distance between the vertices moved by the predicted and by the GT pose"""
+        errors = np.empty(len(pred))
+        for chunk in self.chunks(len(pred)):
+            errors[chunk] = np.linalg.norm(self.transform(pred[chunk]) - self.transform(gt[chunk]), axis=2).mean(axis=1)
+        return errors
+
+    def add_s(self, pred, gt):
+        """Mean distance from every vertex moved by the predicted pose to the closest vertex moved by the GT pose"""
+        errors = np.empty(len(pred))
+        # taking the predicted vertices back to the mesh frame of the GT pose keeps a single tree for all poses
+        relative = np.linalg.inv(gt) @ pred
+        for chunk in self.chunks(len(pred)):
+            moved = self.transform(relative[chunk])
+            distances, _ = self.get_tree().query(moved.reshape((-1, 3)), workers=-1)
+            errors[chunk] = distances.reshape(moved.shape[:2]).mean(axis=1)
+        return errors
+
+    def projection_error(self, pred, gt, camera_intrinsics, camera_position=(0, 0, 0)):
+        """Mean pixel distance between the vertices projected with the predicted and with the GT pose"""
+        errors = np.empty(len(pred))
+        camera_position = np.asarray(camera_position, dtype=np.float64)
+        def project(poses):
+            points = self.transform(poses) - camera_position
+            return points[..., :2] / points[..., 2:] * np.diag(camera_intrinsics)[:2] + camera_intrinsics[:2, 2]
+        for chunk in self.chunks(len(pred)):
+            errors[chunk] = np.linalg.norm(project(pred[chunk]) - project(gt[chunk]), axis=2).mean(axis=1)
+        return errors
+
+    def evaluate(self, pred, gt, camera_intrinsics=None, camera_position=(0, 0, 0), symmetric=False):
+        """All the per pose errors, and ADD(-S) accuracy at 10% of the diameter and AUC summaries"""
+        pred = np.asarray(pred, dtype=np.float64).reshape((-1, 4, 4))
+        gt = np.asarray(gt, dtype=np.float64).reshape((-1, 4, 4))
+        assert len(pred) == len(gt), f"{len(pred)} predicted poses but {len(gt)} GT poses"
+        errors = {'rotation_error': rotation_error(pred, gt), 'translation_error': translation_error(pred, gt), 'add': self.add(pred, gt)}
+        if symmetric: errors['add_s'] = self.add_s(pred, gt)
+        if camera_intrinsics is not None: errors['projection_error'] = self.projection_error(pred, gt, camera_intrinsics, camera_position)
+
+        add = errors['add_s'] if symmetric else errors['add']
+        diameter = self.get_diameter()
+        summary = {'add_accuracy': np.mean(add <= 0.1 * diameter), 'add_auc': auc(add, 0.1 * diameter), 'diameter': diameter}
+        if camera_intrinsics is not None: summary.update(projection_accuracy=np.mean(errors['projection_error'] <= 5), projection_auc=auc(errors['projection_error'], 40))
+        return errors, summary
@@ -0,0 +1,125 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: playback.py
+@time: 2026-10-18 20:05
+@desc: the real-time playback engine, frames decoded on a worker thread and paced against a monotonic clock
+'''
+
+import time
+import queue
+import threading
+import collections
+
+import cv2
+
+from .frame_cache import FrameCache
+
+class PlaybackEngine:
+    """Play a video from start_frame at speed times its fps.
+
+    A worker thread decodes into a queue of at most max_queue frames, always the frame the clock is at or later,
+    so frames the decoder cannot keep up with are skipped instead of played late (decoded through on a short gap,
+    seeked over on a longer one). The frames are decoded by a FrameCache of their own without read-ahead, so they
+    are numbered and seeked to with the VideoIndex (index if given, else loaded) like everywhere else. Proxy frames
+    are used where written. poll() hands the GUI the latest frame due on the clock and drops the older ones, size
+    resizes the frames on the worker thread.
+    """
+    def __init__(self, video_path, fps, frame_count, start_frame=0, speed=1.0, proxy=None, size=None, max_queue=8, max_skip=32, index=None):
+        self.video_path = str(video_path)
+        self.fps = fps
+        self.frame_count = frame_count
+        self.proxy = proxy
+        self.size = size
+        self.max_skip = max_skip
+        self.index = index
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.pending = None # the frame taken off the queue by poll() that is not due yet
+        self.frame_cache = None
+
+        self.lock = threading.Lock()
+        self.speed = speed
+        self.start_time = time.perf_counter()
+        self.start_frame = start_frame
+        self.next_frame = start_frame
+        self.decoded = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.shown = collections.deque(maxlen=30) # display times of the last frames, for the achieved fps
+        self.finished = False
+
+        self.stop_event = threading.Event()
+        self.worker = threading.Thread(target=self.decode_loop, name=f"PlaybackEngine({self.video_path})", daemon=True)
+        self.worker.start()
+
+    def clock_frame(self):
+        """The frame the playback should show now"""
+        with self.lock: return self.start_frame + int((time.perf_counter() - self.start_time) * self.fps * self.speed)
+
+    def set_speed(self, speed):
+        # restart the clock from where it is, so changing speed never jumps
+        with self.lock:
+            now = time.perf_counter()
+            self.start_frame += int((now - self.start_time) * self.fps * self.speed)
+            self.start_time = now
+            self.speed = speed
+
+    def read(self, n):
+        if self.proxy is not None:
+            frame = self.proxy.get(n)
+            if frame is not None: return frame
+        # nothing is kept but the frame asked for, the queue is the read-ahead
+        if self.frame_cache is None: self.frame_cache = FrameCache(self.video_path, max_bytes=0, read_ahead=0, max_skip=self.max_skip, index=self.index if self.index is not None else True)
+        return self.frame_cache.get(n)
+
+    def decode_loop(self):
+        try:
+            while not self.stop_event.is_set():
+                n = max(self.next_frame, self.clock_frame())
+                if n >= self.frame_count: break
+                frame = self.read(n)
+                if frame is None: break
+                self.decoded += 1
+                self.skipped += n - self.next_frame
+                self.next_frame = n + 1
+                if self.size is not None and (frame.shape[1], frame.shape[0]) != tuple(self.size): frame = cv2.resize(frame, tuple(self.size), interpolation=cv2.INTER_AREA)
+                while not self.stop_event.is_set():
+                    try:
+                        self.queue.put((n, frame), timeout=0.05)
+                        break
+                    except queue.Full: continue
+        finally:
+            if self.frame_cache is not None: self.frame_cache.close()
+            self.finished = True
+
+    def poll(self):
+        """(frame number, RGB frame) of the latest decoded frame due on the clock, None if none is due yet"""
+        due = self.clock_frame()
+        latest = None
+        while True:
+            if self.pending is None:
+                try: self.pending = self.queue.get_nowait()
+                except queue.Empty: break
+            # a frame ahead of the clock is held until a later poll
+            if self.pending[0] > due: break
+            if latest is not None: self.dropped += 1
+            latest, self.pending = self.pending, None
+        if latest is not None: self.shown.append(time.perf_counter())
+        return latest
+
+    def done(self):
+        return self.finished and self.pending is None and self.queue.empty()
+
+    def achieved_fps(self):
+        if len(self.shown) < 2: return 0.0
+        return (len(self.shown) - 1) / (self.shown[-1] - self.shown[0])
+
+    def stats(self):
+        """Frames shown per second, and frames dropped (decoded too late) or skipped (never decoded) to hold the speed"""
+        return {"fps": self.achieved_fps(), "speed": self.speed, "decoded": self.decoded, "dropped": self.dropped, "skipped": self.skipped}
+
+    def stop(self):
+        self.stop_event.set()
+        self.worker.join()
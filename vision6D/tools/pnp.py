@@ -0,0 +1,150 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: pnp.py
+@time: 2026-10-18 14:20
+@desc: the registry of PnP solver backends used to recover a pose from 2D-3D correspondences
+'''
+
+import cv2
+import numpy as np
+
+SOLVERS = {}
+
+def register_solver(name):
+    """Register fn(pts2d, pts3d, camera_intrinsics, options) -> (success, rvec, tvec) under name"""
+    def decorator(fn):
+        SOLVERS[name] = fn
+        return fn
+    return decorator
+
+def ransac(pts2d, pts3d, camera_intrinsics, options):
+    return cv2.solvePnPRansac(pts3d, pts2d, camera_intrinsics, distCoeffs=np.zeros((4, 1)), iterationsCount=options.get('iterations', 100), reprojectionError=options.get('reprojection_error', 8.0), confidence=options.get('confidence', 0.999), flags=cv2.SOLVEPNP_EPNP)
+
+@register_solver('epnp_ransac')
+def solve_epnp_ransac(pts2d, pts3d, camera_intrinsics, options):
+    success, rvec, tvec, _ = ransac(pts2d, pts3d, camera_intrinsics, options)
+    return success, rvec, tvec
+
+@register_solver('epnp')
+def solve_epnp(pts2d, pts3d, camera_intrinsics, options):
+    return cv2.solvePnP(pts3d, pts2d, camera_intrinsics, distCoeffs=np.zeros((4, 1)), flags=cv2.SOLVEPNP_EPNP)
+
+@register_solver('iterative')
+def solve_iterative(pts2d, pts3d, camera_intrinsics, options):
+    return cv2.solvePnP(pts3d, pts2d, camera_intrinsics, distCoeffs=np.zeros((4, 1)), flags=cv2.SOLVEPNP_ITERATIVE)
+
+if hasattr(cv2, 'SOLVEPNP_SQPNP'): # opencv >= 4.5.3
+    @register_solver('sqpnp')
+    def solve_sqpnp(pts2d, pts3d, camera_intrinsics, options):
+        return cv2.solvePnP(pts3d, pts2d, camera_intrinsics, distCoeffs=np.zeros((4, 1)), flags=cv2.SOLVEPNP_SQPNP)
+
+def refine(refine_fn, pts2d, pts3d, camera_intrinsics, options):
+    # RANSAC with EPnP for the inliers, then a non-linear refinement on the inliers only
+    success, rvec, tvec, inliers = ransac(pts2d, pts3d, camera_intrinsics, options)
+    if success and inliers is not None and len(inliers) >= 4:
+        inliers = inliers.ravel()
+        rvec, tvec = refine_fn(pts3d[inliers], pts2d[inliers], camera_intrinsics, np.zeros((4, 1)), rvec, tvec)
+    return success, rvec, tvec
+
+@register_solver('ransac_lm')
+def solve_ransac_lm(pts2d, pts3d, camera_intrinsics, options):
+    return refine(cv2.solvePnPRefineLM, pts2d, pts3d, camera_intrinsics, options)
+
+@register_solver('ransac_vvs')
+def solve_ransac_vvs(pts2d, pts3d, camera_intrinsics, options):
+    return refine(cv2.solvePnPRefineVVS, pts2d, pts3d, camera_intrinsics, options)
+
+def reprojection_errors(pts2d, pts3d, rvec, tvec, camera_intrinsics):
+    # cv2.projectPoints without distortion, several times faster on large correspondence sets
+    points = pts3d @ cv2.Rodrigues(rvec)[0].T.astype(pts3d.dtype) + np.ravel(tvec).astype(pts3d.dtype)
+    projected = points[:, :2] / points[:, 2:] * np.diag(camera_intrinsics)[:2] + camera_intrinsics[:2, 2]
+    return np.linalg.norm(projected - pts2d, axis=1)
+
+def solve_pnp(pts2d, pts3d, camera_intrinsics, camera_position, solver='epnp_ransac', **options):
+    """Solve the pose with the registered solver and return it with the inlier mask.
+
+    options: iterations, reprojection_error and confidence of the RANSAC solvers. The inliers are the
+    correspondences reprojected within reprojection_error pixels, computed the same way for every solver.
+    """
+    assert solver in SOLVERS, f"solver should be one of {list(SOLVERS)}"
+    pts2d = np.ascontiguousarray(pts2d, dtype='float32')
+    pts3d = np.ascontiguousarray(pts3d, dtype='float32')
+    camera_intrinsics = camera_intrinsics.astype('float32')
+
+    predicted_pose = np.eye(4)
+    inliers = np.zeros(len(pts2d), dtype=bool)
+    if pts2d.shape[0] > 4:
+        success, rotation_vector, translation_vector = SOLVERS[solver](pts2d, pts3d, camera_intrinsics, options)
+        if success:
+            predicted_pose[:3, :3] = cv2.Rodrigues(rotation_vector)[0]
+            predicted_pose[:3, 3] = np.squeeze(translation_vector) + np.array(camera_position)
+            inliers = reprojection_errors(pts2d, pts3d, rotation_vector, translation_vector, camera_intrinsics) <= options.get('reprojection_error', 8.0)
+
+    return predicted_pose, inliers
+
+class SequencePnP:
+    """PnP over consecutive frames, every solve seeded with the pose of the previous frame.
+
+    The previous pose is the initial guess of a Levenberg-Marquardt refinement (the iterative solvePnP with
+    useExtrinsicGuess) on at most max_points correspondences, refined once more on its inliers. The frame falls back to
+    the full solver when that leaves a median reprojection error above max_error pixels, and the next frame is seeded
+    with whatever pose was kept.
+    """
+    def __init__(self, solver='epnp_ransac', max_error=2.0, max_points=1000, **options):
+        self.solver = solver
+        self.max_error = max_error
+        self.max_points = max_points
+        self.criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_COUNT, 10, 1e-6)
+        self.options = options
+        self.reset()
+
+    def reset(self):
+        self.previous = None # (rvec, tvec) of the last solved frame
+        self.frames = 0
+        self.attempts = 0 # frames seeded with a previous pose
+        self.fallbacks = 0 # seeded frames that still needed the full solver
+
+    @property
+    def fallback_rate(self):
+        return self.fallbacks / self.attempts if self.attempts else 0.0
+
+    def warm_start(self, pts2d, pts3d, camera_intrinsics):
+        # a local Levenberg-Marquardt refinement from the previous pose, on an evenly strided subset of the pairs
+        stride = max(1, len(pts2d) // self.max_points)
+        rvec, tvec = (v.copy() for v in self.previous)
+        rvec, tvec = cv2.solvePnPRefineLM(pts3d[::stride], pts2d[::stride], camera_intrinsics, np.zeros((4, 1)), rvec, tvec, self.criteria)
+        errors = reprojection_errors(pts2d, pts3d, rvec, tvec, camera_intrinsics)
+        # once more on the inliers only, so that outliers do not drag the pose
+        inliers = np.flatnonzero(errors <= self.options.get('reprojection_error', 8.0))[::stride]
+        if len(inliers) < 4: return None
+        rvec, tvec = cv2.solvePnPRefineLM(pts3d[inliers], pts2d[inliers], camera_intrinsics, np.zeros((4, 1)), rvec, tvec, self.criteria)
+        errors = reprojection_errors(pts2d, pts3d, rvec, tvec, camera_intrinsics)
+        if not np.median(errors) <= self.max_error: return None
+        return rvec, tvec, errors
+
+    def __call__(self, pts2d, pts3d, camera_intrinsics, camera_position):
+        """Solve the pose of the next frame, the same (pose, inliers) as solve_pnp"""
+        pts2d = np.ascontiguousarray(pts2d, dtype='float32')
+        pts3d = np.ascontiguousarray(pts3d, dtype='float32')
+        camera_intrinsics = camera_intrinsics.astype('float32')
+        self.frames += 1
+
+        solved = None
+        if self.previous is not None and pts2d.shape[0] > 4:
+            self.attempts += 1
+            solved = self.warm_start(pts2d, pts3d, camera_intrinsics)
+            if solved is None: self.fallbacks += 1
+        if solved is None:
+            predicted_pose, inliers = solve_pnp(pts2d, pts3d, camera_intrinsics, camera_position, solver=self.solver, **self.options)
+            if np.any(inliers): self.previous = (cv2.Rodrigues(predicted_pose[:3, :3])[0], (predicted_pose[:3, 3] - np.array(camera_position)).reshape((3, 1)))
+            return predicted_pose, inliers
+
+        rvec, tvec, errors = solved
+        self.previous = (rvec, tvec)
+        predicted_pose = np.eye(4)
+        predicted_pose[:3, :3] = cv2.Rodrigues(rvec)[0]
+        predicted_pose[:3, 3] = np.squeeze(tvec) + np.array(camera_position)
+        return predicted_pose, errors <= self.options.get('reprojection_error', 8.0)
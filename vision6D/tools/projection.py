@@ -0,0 +1,99 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: projection.py
+@time: 2026-10-18 15:20
+@desc: render-free 2D-3D correspondences, mesh vertices projected with the pinhole camera and a NumPy z-buffer for visibility
+'''
+
+import numpy as np
+
+def project(vertices, pose, camera_intrinsics, camera_position=(0, 0, 0)):
+    """Pixel coordinates (u, v) and camera depth of the vertices moved by pose, the same camera model solve_pnp inverts"""
+    points = np.asarray(vertices, dtype=np.float64) @ pose[:3, :3].T + pose[:3, 3] - np.asarray(camera_position, dtype=np.float64)
+    depth = points[:, 2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        uv = points[:, :2] / depth[:, None] * np.diag(camera_intrinsics)[:2] + camera_intrinsics[:2, 2]
+    return uv, depth
+
+def fragments(uv, depth, faces, window_size, chunk_size=1000000, bounds=None):
+    """Yield (faces, pixels, weights, depths) chunks, one entry per pixel center covered by a face in front of the camera.
+
+    pixels are flat indices y * w + x, weights are the perspective-correct barycentric weights of the three face vertices
+    and chunk_size bounds the (face, pixel) pairs held at once. bounds (x0, y0, x1, y1) limits the pixels to a tile.
+    """
+    w, h = window_size
+    faces = np.asarray(faces, dtype=np.int64)
+    tri, z = uv[faces], depth[faces]
+    # pixel x covers [x, x + 1), so its center x + 0.5 falls in the face bounding box for these x
+    lo = np.ceil(tri.min(axis=1) - 0.5).astype(np.int64)
+    hi = np.floor(tri.max(axis=1) - 0.5).astype(np.int64)
+    x0, y0, x1, y1 = (0, 0, w, h) if bounds is None else bounds
+    lo, hi = np.maximum(lo, (x0, y0)), np.minimum(hi, (x1 - 1, y1 - 1))
+    e1, e2 = tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]
+    area = e1[:, 0] * e2[:, 1] - e1[:, 1] * e2[:, 0]
+    valid = np.all(z > 0, axis=1) & np.all(hi >= lo, axis=1) & (area != 0)
+    valid = np.flatnonzero(valid & np.all(np.isfinite(tri), axis=(1, 2)))
+    span = hi[valid] - lo[valid] + 1
+    counts = span[:, 0] * span[:, 1]
+
+    # faces are cut into chunks of about chunk_size pairs, a chunk always holds at least one face
+    cumulative = np.cumsum(counts)
+    start = 0
+    while start < len(valid):
+        done = cumulative[start - 1] if start else 0
+        end = max(start + 1, int(np.searchsorted(cumulative, done + chunk_size, side='right')))
+        ids, n = valid[start:end], counts[start:end]
+        face = np.repeat(ids, n)
+        offsets = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        x = np.repeat(lo[ids, 0], n) + offsets % np.repeat(span[start:end, 0], n)
+        y = np.repeat(lo[ids, 1], n) + offsets // np.repeat(span[start:end, 0], n)
+        start = end
+
+        # screen-space barycentric weights of the pixel centers
+        p = np.stack((x + 0.5, y + 0.5), axis=1) - tri[face, 0]
+        b1 = (p[:, 0] * e2[face, 1] - p[:, 1] * e2[face, 0]) / area[face]
+        b2 = (e1[face, 0] * p[:, 1] - e1[face, 1] * p[:, 0]) / area[face]
+        b = np.stack((1 - b1 - b2, b1, b2), axis=1)
+        inside = np.all(b >= 0, axis=1)
+        face, x, y, b = face[inside], x[inside], y[inside], b[inside]
+
+        # depth is linear in 1/z across the screen, and so are the perspective-correct weights
+        b = b / z[face]
+        inverse_depth = b.sum(axis=1)
+        yield face, y * w + x, b / inverse_depth[:, None], 1 / inverse_depth
+
+def depth_buffer(uv, depth, faces, window_size, chunk_size=1000000):
+    """The (h, w) z-buffer of the projected faces, inf where no face is drawn"""
+    w, h = window_size
+    zbuffer = np.full(w * h, np.inf)
+    for _, pixels, _, depths in fragments(uv, depth, faces, window_size, chunk_size):
+        np.minimum.at(zbuffer, pixels, depths)
+    return zbuffer.reshape((h, w))
+
+def visible_vertices(uv, depth, zbuffer, tolerance):
+    """Indices of the vertices inside the image and no more than tolerance behind the z-buffer at their pixel"""
+    h, w = zbuffer.shape
+    inside = np.flatnonzero((depth > 0) & (uv[:, 0] >= 0) & (uv[:, 0] < w) & (uv[:, 1] >= 0) & (uv[:, 1] < h))
+    x, y = uv[inside, 0].astype(np.int64), uv[inside, 1].astype(np.int64)
+    return inside[depth[inside] <= zbuffer[y, x] + tolerance]
+
+def create_projection_pairs(vertices, faces, pose, camera_intrinsics, camera_position, window_size, binary_mask=None, tolerance=None):
+    """Exact 2D-3D pairs (vtx, pts) of the vertices visible under pose, the render-free counterpart of utils.create_2d_3d_pairs.
+
+    Only the vertices whose pixel is set in binary_mask are kept if it is given. tolerance is the depth slack of the
+    visibility test, half the mean edge length of the mesh by default.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    uv, depth = project(vertices, pose, camera_intrinsics, camera_position)
+    zbuffer = depth_buffer(uv, depth, faces, window_size)
+    if tolerance is None: tolerance = 0.5 * np.mean(np.linalg.norm(vertices[faces[:, 1]] - vertices[faces[:, 0]], axis=1))
+    visible = visible_vertices(uv, depth, zbuffer, tolerance)
+    if binary_mask is not None:
+        binary_mask = np.asarray(binary_mask)
+        if binary_mask.ndim == 3: binary_mask = binary_mask[..., 0]
+        visible = visible[binary_mask[uv[visible, 1].astype(np.int64), uv[visible, 0].astype(np.int64)] > 0]
+    return vertices[visible], uv[visible]
@@ -0,0 +1,145 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: proxy.py
+@time: 2026-10-18 18:55
+@desc: the low resolution proxy frames of a video, written once in the background for scrubbing and thumbnails
+'''
+
+import os
+import json
+import pathlib
+import threading
+
+import cv2
+import numpy as np
+
+class ProxyFrames:
+    """Frames of a video downscaled by scale, packed as jpegs into one file, <stem>_vision6D/proxy.bin.
+
+    start() decodes the video once on a background thread and appends the frames not written yet. The byte offsets
+    of the frames are kept in memory and saved every save_every frames to proxy.npy, and a marker file records the
+    source video and whether the proxy is finished, so later sessions skip the pass or resume it. Any frame written
+    so far is read in O(1) with one seek while the rest is still being generated; get returns None for the others.
+    """
+    def __init__(self, video_path, scale=4, quality=90, save_every=64):
+        self.video_path = pathlib.Path(video_path)
+        self.scale = scale
+        self.quality = quality
+        self.save_every = save_every
+        self.output_dir = self.video_path.parent / f"{self.video_path.stem}_vision6D"
+        self.data_path = self.output_dir / "proxy.bin"
+        self.offsets_path = self.output_dir / "proxy.npy"
+        self.marker_path = self.output_dir / "proxy.json"
+        self.offsets = [0] # where every frame starts in proxy.bin, and where the last one ends
+        self.lock = threading.Lock()
+        self.data = None
+        self.written = 0
+        self.frame_count = None
+        self.stop = threading.Event()
+        self.thread = None
+
+    def get(self, n):
+        """The (h / scale, w / scale, 3) uint8 RGB proxy of frame n, None if it is not written yet"""
+        with self.lock:
+            if n < 0 or n + 1 >= len(self.offsets): return None
+            start, end = self.offsets[n], self.offsets[n + 1]
+            if self.data is None: self.data = open(self.data_path, "rb")
+            self.data.seek(start)
+            buffer = self.data.read(end - start)
+        frame = cv2.imdecode(np.frombuffer(buffer, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) if frame is not None else None
+
+    def source_key(self):
+        stat = os.stat(self.video_path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime_ns, "scale": self.scale}
+
+    def read_marker(self):
+        """The marker of the proxy on disk if it was made from the current video, else None"""
+        try:
+            with open(self.marker_path, "r") as f: marker = json.load(f)
+        except (OSError, ValueError): return None
+        if any(marker.get(key) != value for key, value in self.source_key().items()): return None
+        return marker
+
+    def write_marker(self, frame_count):
+        with open(self.marker_path, "w") as f: json.dump({**self.source_key(), "frame_count": frame_count}, f)
+
+    def read_offsets(self):
+        """The saved offsets, cut to the frames proxy.bin holds in full"""
+        try: offsets = np.load(self.offsets_path).tolist()
+        except (OSError, ValueError): return [0]
+        size = os.path.getsize(self.data_path) if os.path.isfile(self.data_path) else 0
+        while len(offsets) > 1 and offsets[-1] > size: offsets.pop()
+        return offsets if offsets and offsets[0] == 0 else [0]
+
+    def save_offsets(self):
+        # write to a temporary name so a reader never sees a partial index
+        tmp_path = self.offsets_path.with_suffix(".tmp.npy")
+        with self.lock: np.save(tmp_path, np.array(self.offsets, dtype=np.int64))
+        os.replace(tmp_path, self.offsets_path)
+
+    def complete(self):
+        marker = self.read_marker()
+        if marker is None or marker["frame_count"] is None: return False
+        offsets = self.read_offsets()
+        if len(offsets) != marker["frame_count"] + 1: return False
+        with self.lock: self.offsets = offsets
+        self.frame_count = self.written = marker["frame_count"]
+        return True
+
+    def generate(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        # frames left by an interrupted pass over the same video are kept, those of another video are dropped
+        offsets = self.read_offsets() if self.read_marker() is not None else [0]
+        with self.lock: self.offsets = offsets
+        self.write_marker(None)
+        cap = cv2.VideoCapture(str(self.video_path))
+        n = 0
+        try:
+            with open(self.data_path, "r+b" if os.path.isfile(self.data_path) else "wb") as data:
+                # bytes after the last saved frame belong to a frame that was never indexed
+                data.truncate(offsets[-1])
+                data.seek(offsets[-1])
+                while not self.stop.is_set():
+                    if n + 1 < len(self.offsets):
+                        if not cap.grab(): break
+                        n += 1
+                        self.written = n
+                        continue
+                    ret, frame = cap.read()
+                    if not ret: break
+                    h, w = frame.shape[:2]
+                    proxy = cv2.resize(frame, (max(1, w // self.scale), max(1, h // self.scale)), interpolation=cv2.INTER_AREA)
+                    _, buffer = cv2.imencode(".jpg", proxy, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+                    data.write(buffer.tobytes())
+                    # the bytes are in the file before a reader can ask for the frame
+                    data.flush()
+                    with self.lock: self.offsets.append(self.offsets[-1] + len(buffer))
+                    n += 1
+                    self.written = n
+                    if n % self.save_every == 0: self.save_offsets()
+        finally:
+            cap.release()
+            self.save_offsets()
+        if self.stop.is_set(): return
+        self.frame_count = n
+        self.write_marker(n)
+
+    def start(self):
+        """Generate the proxy in the background unless a finished one is already on disk"""
+        if self.complete() or self.thread is not None: return
+        self.thread = threading.Thread(target=self.generate, name=f"ProxyFrames({self.video_path})", daemon=True)
+        self.thread.start()
+
+    def wait(self, timeout=None):
+        if self.thread is not None: self.thread.join(timeout)
+
+    def close(self):
+        self.stop.set()
+        self.wait()
+        with self.lock:
+            if self.data is not None: self.data.close()
+            self.data = None
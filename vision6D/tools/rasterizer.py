@@ -0,0 +1,108 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: rasterizer.py
+@time: 2026-10-18 15:50
+@desc: the pure NumPy triangle rasterizer, a CPU backend for the mesh, mask and segmesh exports without an offscreen VTK window
+'''
+
+import os
+import concurrent.futures
+
+import numpy as np
+import pyvista as pv
+
+from . import projection
+
+def camera_matrices(camera, w, h):
+    """Intrinsics and world to camera transform (opencv axes) of a pyvista camera drawing a w x h window.
+
+    The inverse of CameraStore.set_camera_intrinsics: the focal length follows the vertical view angle and the
+    principal point the window center.
+    """
+    view = pv.array_from_vtkmatrix(camera.GetViewTransformMatrix())
+    # vtk cameras look down -z with y up, opencv ones down +z with y down
+    extrinsics = np.diag((1, -1, -1, 1)) @ view
+    focal_length = (h / 2) / np.tan(np.radians(camera.view_angle / 2))
+    wcx, wcy = camera.GetWindowCenter()
+    camera_intrinsics = np.array([[focal_length, 0, w / 2 - wcx * w / 2], [0, focal_length, h / 2 + wcy * h / 2], [0, 0, 1]])
+    return camera_intrinsics, extrinsics
+
+def rasterize_tile(image, zbuffer, uv, depth, faces, colors, bounds, window_size):
+    # the nearest fragment of every pixel wins, tiles never share pixels so they can be filled concurrently
+    w = window_size[0]
+    for face, pixels, weights, depths in projection.fragments(uv, depth, faces, window_size, bounds=bounds):
+        order = np.lexsort((depths, pixels))
+        first = np.concatenate(([True], pixels[order][1:] != pixels[order][:-1]))
+        keep = order[first]
+        face, pixels, weights, depths = face[keep], pixels[keep], weights[keep], depths[keep]
+        y, x = pixels // w, pixels % w
+        closer = depths < zbuffer[y, x]
+        face, y, x, weights = face[closer], y[closer], x[closer], weights[closer]
+        zbuffer[y, x] = depths[closer]
+        if colors is None: continue
+        if colors.ndim == 1: image[y, x] = colors
+        elif len(colors) == len(depth): image[y, x] = np.rint(np.einsum('ij,ijk->ik', weights, colors[faces[face]]))
+        else: image[y, x] = colors[face]
+
+def rasterize(vertices, faces, pose, camera_intrinsics, window_size, colors=(255, 255, 255), camera_position=(0, 0, 0), tile_size=256, workers=None):
+    """Rasterize the mesh moved by pose into a (h, w, 3) uint8 image and its (h, w) z-buffer, inf on the background.
+
+    colors is a single RGB color, an (n_vertices, 3) array interpolated across the faces (NOCS/latlon) or an
+    (n_faces, 3) array, all in 0-255, or None for the z-buffer alone. The image is cut in tile_size tiles
+    rasterized on workers threads, all cores by default.
+    """
+    w, h = window_size
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    if colors is not None: colors = np.asarray(colors, dtype=np.float64)
+    image = np.zeros((h, w, 3), dtype=np.uint8)
+    zbuffer = np.full((h, w), np.inf)
+    uv, depth = projection.project(vertices, pose, camera_intrinsics, camera_position)
+
+    # drop the faces behind the camera or covering no pixel center once, before handing the rest to the tiles
+    tri = uv[faces]
+    with np.errstate(invalid='ignore'):
+        lo = np.ceil(tri.min(axis=1) - 0.5)
+        hi = np.floor(tri.max(axis=1) - 0.5)
+        drawn = np.flatnonzero(np.all(depth[faces] > 0, axis=1) & np.all(hi >= lo, axis=1) & np.all(hi >= 0, axis=1) & (lo[:, 0] < w) & (lo[:, 1] < h))
+    lo, hi = lo[drawn], hi[drawn]
+
+    def run(bounds):
+        x0, y0, x1, y1 = bounds
+        ids = drawn[(lo[:, 0] < x1) & (hi[:, 0] >= x0) & (lo[:, 1] < y1) & (hi[:, 1] >= y0)]
+        if len(ids) == 0: return
+        tile_colors = colors if colors is None or colors.ndim == 1 or len(colors) == len(vertices) else colors[ids]
+        rasterize_tile(image, zbuffer, uv, depth, faces[ids], tile_colors, bounds, window_size)
+
+    tiles = [(x, y, min(x + tile_size, w), min(y + tile_size, h)) for y in range(0, h, tile_size) for x in range(0, w, tile_size)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        for _ in executor.map(run, tiles): pass
+    return image, zbuffer
+
+def silhouette(vertices, faces, pose, camera_intrinsics, window_size, camera_position=(0, 0, 0), tile_size=256, workers=None):
+    """(h, w) uint8 binary mask of the mesh, 255 where it is drawn"""
+    _, zbuffer = rasterize(vertices, faces, pose, camera_intrinsics, window_size, None, camera_position, tile_size, workers)
+    return np.where(np.isfinite(zbuffer), 255, 0).astype(np.uint8)
+
+def actor_colors(actor, mesh):
+    """The colors the actor's mapper draws mesh with, per vertex, per face or a single one, in 0-255"""
+    mapper = actor.GetMapper()
+    scalars = mapper.MapScalars(1.0) if mapper.GetScalarVisibility() else None
+    if scalars is not None and scalars.GetNumberOfTuples() in (mesh.n_points, mesh.n_cells):
+        return pv.convert_array(scalars)[:, :3]
+    return np.array(actor.GetProperty().GetColor()) * 255
+
+def render_actor(actor, camera, w, h, tile_size=256, workers=None):
+    """The NumPy counterpart of RenderPool.render, the unlit actor drawn opaque on a black background"""
+    mesh = pv.wrap(actor.GetMapper().GetInput())
+    colors = actor_colors(actor, mesh)
+    if not mesh.is_all_triangles:
+        mesh = mesh.triangulate()
+        if colors.ndim == 2 and len(colors) != mesh.n_points: colors = colors.mean(axis=0)
+    camera_intrinsics, extrinsics = camera_matrices(camera, w, h)
+    pose = extrinsics @ pv.array_from_vtkmatrix(actor.GetMatrix())
+    image, _ = rasterize(mesh.points, mesh.faces.reshape((-1, 4))[:, 1:], pose, camera_intrinsics, (w, h), colors, tile_size=tile_size, workers=workers)
+    return image
@@ -0,0 +1,113 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: registration.py
+@time: 2026-10-18 16:40
+@desc: rigid registration, a batched Kabsch solver and KD-tree accelerated point-to-point/point-to-plane ICP
+'''
+
+import time
+
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.spatial.transform import Rotation
+
+def kabsch(A, B, weights=None):
+    """The 4x4 rigid transforms that best map A onto B in the least squares sense.
+
+    A and B are (..., N, 3) stacks of corresponding points, so many correspondence sets are solved at once, and
+    weights an optional (..., N) stack of per pair weights. Reflections are never returned.
+    """
+    A = np.asarray(A, dtype=np.float64)
+    B = np.asarray(B, dtype=np.float64)
+    assert A.shape == B.shape and A.shape[-1] == 3, "A and B should be (..., N, 3) stacks of the same shape"
+    weights = np.ones(A.shape[:-1]) if weights is None else np.broadcast_to(np.asarray(weights, dtype=np.float64), A.shape[:-1])
+    weights = weights / weights.sum(axis=-1, keepdims=True)
+
+    centroid_A = np.einsum('...n,...ni->...i', weights, A)
+    centroid_B = np.einsum('...n,...ni->...i', weights, B)
+    H = np.einsum('...n,...ni,...nj->...ij', weights, A - centroid_A[..., None, :], B - centroid_B[..., None, :])
+    U, _, Vt = np.linalg.svd(H)
+    V, Ut = np.swapaxes(Vt, -1, -2), np.swapaxes(U, -1, -2)
+    # flip the last singular vector where V @ U.T would be a reflection
+    D = np.ones(A.shape[:-2] + (3,))
+    D[..., 2] = np.where(np.linalg.det(V @ Ut) < 0, -1, 1)
+    R = (V * D[..., None, :]) @ Ut
+
+    rt = np.zeros(A.shape[:-2] + (4, 4))
+    rt[..., :3, :3] = R
+    rt[..., :3, 3] = centroid_B - np.einsum('...ij,...j->...i', R, centroid_A)
+    rt[..., 3, 3] = 1
+    return rt
+
+def estimate_normals(points, k=20, tree=None):
+    """Unit normals of a point cloud, the direction of least variance over the k nearest neighbours of every point"""
+    points = np.asarray(points, dtype=np.float64)
+    if tree is None: tree = cKDTree(points)
+    _, neighbours = tree.query(points, k=min(k, len(points)), workers=-1)
+    neighbourhood = points[neighbours]
+    centered = neighbourhood - neighbourhood.mean(axis=1, keepdims=True)
+    _, vectors = np.linalg.eigh(np.einsum('nki,nkj->nij', centered, centered))
+    return vectors[:, :, 0]
+
+def point_to_plane_step(source, target, normals):
+    # linearized about the current pose: minimize sum(((R p + t - q) . n) ** 2) for a small rotation R
+    A = np.hstack((np.cross(source, normals), normals))
+    b = -np.einsum('ij,ij->i', source - target, normals)
+    x, *_ = np.linalg.lstsq(A, b, rcond=None)
+    step = np.eye(4)
+    step[:3, :3] = Rotation.from_rotvec(x[:3]).as_matrix()
+    step[:3, 3] = x[3:]
+    return step
+
+def icp(source, target, init_pose=None, method='point_to_point', max_iterations=50, tolerance=1e-6, max_distance=np.inf, tree=None, normals=None):
+    """Refine the pose that moves the source points (the mesh vertices) onto the target cloud.
+
+    Every iteration matches the moved source points to their nearest target points through a KD-tree built once
+    (pass tree to reuse one), drops the pairs further apart than max_distance and solves the step with Kabsch
+    (point_to_point) or the linearized point_to_plane objective, on the target normals estimated if not given.
+    The RMSE is that of the objective solved, the point distances or their components along the normals. Stops when
+    it improves by less than tolerance relative to the previous one, or keeps the previous pose if a step made it
+    worse. Converged only says the RMSE settled: point_to_point settles wherever every point keeps matching the same
+    neighbour, which can be degrees off once the start is more than about half the sample spacing away, while
+    point_to_plane slides along the surface and has a much wider basin.
+    Returns the pose and the convergence stats.
+    """
+    assert method in ('point_to_point', 'point_to_plane'), "method should be point_to_point or point_to_plane"
+    assert max_iterations >= 1, "max_iterations should be at least 1"
+    start = time.perf_counter()
+    source = np.asarray(source, dtype=np.float64)
+    target = np.asarray(target, dtype=np.float64)
+    pose = np.eye(4) if init_pose is None else np.array(init_pose, dtype=np.float64)
+    if tree is None: tree = cKDTree(target)
+    if method == 'point_to_plane' and normals is None: normals = estimate_normals(target, tree=tree)
+
+    resolution = 16 * np.finfo(np.float64).eps * np.abs(target).max()
+    history = []
+    converged = False
+    for _ in range(max_iterations):
+        moved = source @ pose[:3, :3].T + pose[:3, 3]
+        distances, indices = tree.query(moved, distance_upper_bound=max_distance, workers=-1)
+        matched = np.isfinite(distances)
+        if np.sum(matched) < 3: break
+        if method == 'point_to_point': residuals = distances[matched]
+        else: residuals = np.einsum('ij,ij->i', moved[matched] - target[indices[matched]], normals[indices[matched]])
+        history.append(np.sqrt(np.mean(residuals ** 2)))
+        # settled, down to the rounding of the coordinates, which can make an exact fit look a hair worse
+        if len(history) > 1 and abs(history[-2] - history[-1]) <= max(tolerance * history[-2], resolution):
+            converged = True
+            break
+        if len(history) > 1 and history[-1] > history[-2]:
+            pose = previous
+            history.pop()
+            break
+        previous = pose
+        if method == 'point_to_point': step = kabsch(moved[matched], target[indices[matched]])
+        else: step = point_to_plane_step(moved[matched], target[indices[matched]], normals[indices[matched]])
+        pose = step @ pose
+
+    stats = {"method": method, "iterations": len(history), "converged": converged, "rmse": history[-1] if history else np.inf,
+             "initial_rmse": history[0] if history else np.inf, "fitness": np.mean(matched), "history": history, "time": time.perf_counter() - start}
+    return pose, stats
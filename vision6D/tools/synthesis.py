@@ -0,0 +1,126 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: synthesis.py
+@time: 2026-10-18 12:40
+@desc: the headless multi-pose renderer to generate synthetic datasets
+'''
+
+import os
+import time
+import queue
+import logging
+import pathlib
+import threading
+
+import cv2
+import numpy as np
+import pyvista as pv
+
+from . import utils
+
+logger = logging.getLogger("vision6D")
+
+class ImageWriter:
+    """Write images to disk on background threads, so the renderer never waits on png encoding.
+
+    params are the cv2.imwrite flags, e.g. the png compression level or the jpeg quality, and rgb tells whether
+    the color images put are RGB (converted before writing) or already BGR.
+    """
+    def __init__(self, workers=2, max_pending=64, params=None, rgb=True):
+        self.queue = queue.Queue(maxsize=max_pending) # bounds the memory held by frames not written yet
+        self.params = list(params or [])
+        self.rgb = rgb
+        self.written = 0
+        self.lock = threading.Lock()
+        self.errors = []
+        self.threads = [threading.Thread(target=self.run, daemon=True) for _ in range(workers)]
+        for thread in self.threads: thread.start()
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None: break
+            path, image = item
+            try:
+                if image.ndim == 3 and self.rgb: image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+                if not cv2.imwrite(str(path), image, self.params): raise OSError(f"cannot write {path}")
+                with self.lock: self.written += 1
+            except Exception as e: self.errors.append(e)
+
+    def put(self, path, image):
+        self.queue.put((path, image))
+
+    def close(self):
+        for _ in self.threads: self.queue.put(None)
+        for thread in self.threads: thread.join()
+        if self.errors: raise self.errors[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def render_poses(mesh, poses, camera, window_size=(1920, 1080), output_dir=None, color="white", workers=2):
+    """Render the color, NOCS and mask images of mesh under every pose in poses.
+
+    The actors and the camera are set up once and only the user_matrix changes between frames, two renders per pose.
+    Yields (index, color, nocs, mask) per pose and, if output_dir is given, streams the images to
+    output_dir/{color,nocs,mask}/{index:06d}.png through a background writer.
+    """
+    mesh = pv.wrap(mesh)
+    w, h = window_size
+    render = utils.create_render(w, h)
+    # no multisampling, edge pixels would otherwise blend the NOCS colors with the background
+    render.render_window.SetMultiSamples(0)
+
+    # one actor per pass, all drawing the same PolyData
+    color_actor = render.add_mesh(mesh, color=color, style='surface', opacity=1, name='color')
+    if 'colors' in mesh.point_data.keys():
+        mapper = color_actor.GetMapper()
+        mapper.SetScalarModeToUsePointFieldData()
+        mapper.SelectColorArray('colors')
+        mapper.SetColorModeToDirectScalars()
+        mapper.ScalarVisibilityOn()
+
+    # the NOCS pass is unlit, so the pixels hold the exact colors, and its depth buffer gives the mask
+    nocs = pv.PolyData(mesh.points, mesh.faces)
+    nocs.point_data['nocs'] = (utils.color_mesh(np.asarray(mesh.points)) * 255).astype(np.uint8)
+    nocs_actor = render.add_mesh(nocs, scalars='nocs', rgb=True, style='surface', opacity=1, ambient=1, diffuse=0, specular=0, name='nocs')
+    actors = {'color': color_actor, 'nocs': nocs_actor}
+
+    render.camera = camera
+    render.disable()
+    render.show(auto_close=False)
+
+    writer = None
+    if output_dir is not None:
+        output_dir = pathlib.Path(output_dir)
+        for name in ('color', 'nocs', 'mask'): os.makedirs(output_dir / name, exist_ok=True)
+        writer = ImageWriter(workers=workers)
+
+    count = 0
+    start = time.perf_counter()
+    try:
+        for index, pose in enumerate(poses):
+            images = {}
+            for actor in actors.values(): actor.user_matrix = pose
+            # the near/far planes have to follow the mesh, they were fitted to wherever it was at show()
+            render.renderer.ResetCameraClippingRange()
+            for name, actor in actors.items():
+                for other in actors.values(): other.SetVisibility(other is actor)
+                render.render()
+                images[name] = render.image
+            images['mask'] = np.where(np.isnan(render.get_image_depth(reset_camera_clipping_range=False)), 0, 255).astype(np.uint8)
+            if writer is not None:
+                for name, image in images.items(): writer.put(output_dir / name / f"{index:06d}.png", image)
+            count += 1
+            yield index, images['color'], images['nocs'], images['mask']
+    finally:
+        if writer is not None: writer.close()
+        render.close()
+        elapsed = time.perf_counter() - start
+        if count: logger.info(f"rendered {count} poses in {elapsed:.2f} s ({count / elapsed:.1f} fps)")
@@ -9,8 +9,11 @@
 '''
 
 import __future__
+import os
+import re
 import copy
 import logging
+import functools
 
 import numpy as np
 import pathlib
@@ -22,10 +25,18 @@ import trimesh
 from PIL import Image
 import cv2
 # import pygeodesic.geodesic as geodesic
+import vtk
 import vtk.util.numpy_support as vtknp
 import json
+from scipy.spatial import cKDTree
+from . import pnp
+from . import registration
 logger = logging.getLogger("vision6D")
 
+DATA_DIR = pathlib.Path(__file__).resolve().parent.parent / "data"
+LATLON_JSON = DATA_DIR / "ossiclesCoordinateMapping.json"
+LATLON_NPY = DATA_DIR / "ossiclesCoordinateMapping.npy"
+
 def fread(fid, _len, _type):
     if _len == 0:
         return np.empty(0)
@@ -104,6 +115,95 @@ def load_meshobj(meshpath):
         meshobj = meshread(fid)
     return meshobj
 
+def _memmap(meshpath, dtype, offset, shape):
+    if np.prod(shape) == 0: return np.empty(shape, dtype=dtype)
+    return np.memmap(meshpath, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+def load_meshobj_mmap(meshpath):
+    """Parse the fixed .mesh header once and memory-map the vertex and triangle blocks
+
+    The returned meshobj has the same layout as `load_meshobj` (3 x N vertices/triangles),
+    but the arrays are read-only views onto the file instead of in-memory copies.
+    """
+    mesh = EasyDict()
+    header = np.fromfile(meshpath, dtype=np.int32, count=4)
+    mesh.id = header[:1]
+    mesh.numverts = header[1]
+    mesh.numtris = header[2]
+    offset = header.nbytes
+
+    if header[3] == -1:
+        params = np.fromfile(meshpath, dtype=np.int32, count=12, offset=offset)
+        mesh.orient = params[0:3]
+        mesh.dim = params[3:6]
+        mesh.sz = params[6:9].view(np.float32)
+        mesh.color = params[9:12]
+        offset += params.nbytes
+    else:
+        mesh.color = np.zeros(3)
+        mesh.color[0] = header[3]
+        mesh.color[1:3] = np.fromfile(meshpath, dtype=np.int32, count=2, offset=offset)
+        offset += 2 * 4
+
+    # on disk the vertices are stored column by column (Fortran order), i.e. as N x 3 rows
+    vertices = _memmap(meshpath, np.float32, offset, (mesh.numverts, 3))
+    offset += vertices.nbytes
+    triangles = _memmap(meshpath, np.int32, offset, (mesh.numtris, 3))
+    mesh.vertices = vertices.T
+    mesh.triangles = triangles.T
+    return mesh
+
+def load_polydata(meshpath):
+    """Load a .mesh file into a pv.PolyData with as few copies as possible
+
+    The triangles go into the vtk cell array as a view on the memory mapped file, and the
+    vertices are transformed (orient/dim/sz, same as `load_trimesh`) in a single pass into
+    the buffer that backs the vtk points.
+    """
+    return meshobj2polydata(load_meshobj_mmap(meshpath))
+
+def meshobj2polydata(meshobj):
+    points = np.empty((meshobj.numverts, 3), dtype=np.float32)
+    points[:] = meshobj.vertices.T
+    for i in np.where(meshobj.orient != np.array((1, 2, 3)))[0]: np.subtract(meshobj.dim[i] - 1, points[:, i], out=points[:, i])
+    points *= meshobj.sz
+
+    vtk_points = vtk.vtkPoints()
+    vtk_points.SetData(vtknp.numpy_to_vtk(points, deep=False))
+
+    # vtk keeps a reference to the numpy buffers, so the memmap stays open as long as the mesh lives
+    connectivity = meshobj.triangles.T.reshape(-1)
+    offsets = np.arange(0, connectivity.shape[0] + 1, 3, dtype=connectivity.dtype)
+    cells = vtk.vtkCellArray()
+    cells.SetData(vtknp.numpy_to_vtk(offsets, deep=False), vtknp.numpy_to_vtk(connectivity, deep=False))
+
+    mesh = pv.PolyData()
+    mesh.SetPoints(vtk_points)
+    mesh.SetPolys(cells)
+    return mesh
+
+def decimate_lods(mesh, divisions=(128, 64, 32)):
+    """Build a level-of-detail pyramid by vertex clustering on a divisions^3 grid per level
+
+    The clustering keeps a subset of the input points, so every level carries the index of
+    its points in the full resolution mesh as 'vtkOriginalPointIds' (e.g. to transfer colors).
+    """
+    lods = []
+    tree = None
+    for division in divisions:
+        clustering = vtk.vtkQuadricClustering()
+        clustering.SetInputData(mesh)
+        clustering.SetNumberOfDivisions(division, division, division)
+        clustering.AutoAdjustNumberOfDivisionsOff()
+        clustering.UseInputPointsOn()
+        clustering.Update()
+        lod = pv.wrap(clustering.GetOutput())
+        if lod.n_points == 0 or lod.n_cells >= mesh.n_cells: continue
+        if tree is None: tree = cKDTree(mesh.points)
+        lod.point_data['vtkOriginalPointIds'] = tree.query(lod.points)[1]
+        lods.append(lod)
+    return lods
+
 def load_trimesh(meshpath):
     meshobj = load_meshobj(meshpath)
     # load the original ossicles
@@ -142,10 +242,13 @@ def writemesh(meshpath, output_path, mesh, mirror=False, suffix=''):
         elif "right" in name: side = "left"
         name = name.split("_")[0] + "_" + side + "_" + '_'.join(name.split("_")[2:-1])
 
-    with open(output_path.parent / (name + ".mesh"), "wb") as f:
+    save_meshobj(meshobj, output_path.parent / (name + ".mesh"))
+
+def save_meshobj(meshobj, output_path):
+    with open(output_path, "wb") as f:
         f.write(meshobj.id.astype('int32'))
-        f.write(meshobj.numverts.astype('int32'))
-        f.write(meshobj.numtris.astype('int32'))
+        f.write(np.int32(meshobj.vertices.shape[1]))
+        f.write(np.int32(meshobj.triangles.shape[1]))
         f.write(np.int32(-1))
         f.write(meshobj.orient.astype('int32'))
         f.write(meshobj.dim.astype('int32'))
@@ -165,23 +268,26 @@ def writemesh(meshpath, output_path, mesh, mirror=False, suffix=''):
         """
         
 def color2binary_mask(color_mask):
-    binary_mask = np.zeros(color_mask[...,:1].shape, dtype=np.uint8)
-    x, y, _ = np.where(color_mask != [0., 0., 0.])
-    binary_mask[x, y] = 1 
-    return binary_mask
+    # per channel comparisons are much faster than reducing over the last axis of size 3
+    binary_mask = (color_mask[..., 0] != 0) | (color_mask[..., 1] != 0) | (color_mask[..., 2] != 0)
+    return binary_mask[..., None].astype(np.uint8)
 
-def create_2d_3d_pairs(color_mask:np.ndarray, vertices:pv.pyvista_ndarray, binary_mask:np.ndarray=None):
+def create_2d_3d_pairs(color_mask:np.ndarray, vertices:pv.pyvista_ndarray, binary_mask:np.ndarray=None, sampler=None):
 
     if binary_mask is None: 
         binary_mask = color2binary_mask(color_mask)
         assert (binary_mask == (0.3*color_mask[..., :1] + 0.59*color_mask[..., 1:2] + 0.11*color_mask[..., 2:]).astype("bool").astype('uint8')).all()
 
-    idx = np.where(binary_mask == 1)
+    # a CorrespondenceSampler keeps only a subset of the foreground pixels
+    if sampler is not None:
+        pts = sampler(binary_mask)
+    else:
+        idx = np.where(binary_mask == 1)
 
-    # swap the points for opencv, maybe because they handle RGB image differently (RGB -> BGR in opencv)
-    idx = idx[:2][::-1]
+        # swap the points for opencv, maybe because they handle RGB image differently (RGB -> BGR in opencv)
+        idx = idx[:2][::-1]
 
-    pts = np.stack((idx[0], idx[1]), axis=1)
+        pts = np.stack((idx[0], idx[1]), axis=1)
     
     # Obtain the 3D verticies (normaize rgb values)
     rgb = color_mask[pts[:,1], pts[:,0]]
@@ -195,19 +301,26 @@ def create_2d_3d_pairs(color_mask:np.ndarray, vertices:pv.pyvista_ndarray, binar
     
     return vtx, pts
 
-def solve_epnp_cv2(pts2d, pts3d, camera_intrinsics, camera_position):
-    pts2d = pts2d.astype('float32')
-    pts3d = pts3d.astype('float32')
-    camera_intrinsics = camera_intrinsics.astype('float32')
-
-    predicted_pose = np.eye(4)
-    if pts2d.shape[0] > 4:
-        # Use EPNP, inliers are the indices of the inliers
-        success, rotation_vector, translation_vector, inliers = cv2.solvePnPRansac(pts3d, pts2d, camera_intrinsics, distCoeffs=np.zeros((4, 1)), confidence=0.999, flags=cv2.SOLVEPNP_EPNP)
-        if success:
-            predicted_pose[:3, :3] = cv2.Rodrigues(rotation_vector)[0]
-            predicted_pose[:3, 3] = np.squeeze(translation_vector) + np.array(camera_position)
+def create_latlon_pairs(color_mask:np.ndarray, latlon_index, sampler=None):
+    binary_mask = color2binary_mask(color_mask)
+    if sampler is not None:
+        pts = sampler(binary_mask)
+    else:
+        idx = np.where(binary_mask == 1)
+        # swap the points for opencv, maybe because they handle RGB image differently (RGB -> BGR in opencv)
+        idx = idx[:2][::-1]
+        pts = np.stack((idx[0], idx[1]), axis=1)
+
+    # Obtain the rg color
+    color = color_mask[pts[:,1], pts[:,0]][..., :2]
+    if np.max(color) > 1: color = color / 255
 
+    # resolve all the pixels at once against the (lat, lon) face grid of the mesh
+    vtx = latlon_index.query(color[:, 0], color[:, 1])
+    return vtx, pts
+
+def solve_epnp_cv2(pts2d, pts3d, camera_intrinsics, camera_position):
+    predicted_pose, _ = pnp.solve_pnp(pts2d, pts3d, camera_intrinsics, camera_position, solver='epnp_ransac')
     return predicted_pose
 
 def transform_vertices(vertices, transformation_matrix=np.eye(4)):
@@ -219,7 +332,7 @@ def transform_vertices(vertices, transformation_matrix=np.eye(4)):
     return transformed_vertices
 
 def normalize(x):
-    return (x - min(x)) / (max(x) - min(x))
+    return (x - np.min(x)) / (np.max(x) - np.min(x))
 
 def de_normalize(rgb, vertices):
     return rgb * (np.max(vertices) - np.min(vertices)) + np.min(vertices)
@@ -233,9 +346,21 @@ def color_mesh(vertices, nocs=True):
         colors[..., 1] = normalize(vertices[..., 1])
         colors[..., 2] = normalize(vertices[..., 2])
     else:
-        colors = load_latitude_longitude()
+        # a copy, the colors end up in the point data of a mesh, which vtk hands out writeable
+        colors = np.array(load_latitude_longitude())
     return colors
     
+def list_files(folder_path, category):
+    """The files of folder_path/category (or of its only subfolder) sorted by the number in their names, and that folder"""
+    dir = pathlib.Path(folder_path) / category
+    folders = [d for d in os.listdir(dir) if os.path.isdir(os.path.join(dir, d))]
+    if len(folders) == 1: dir = pathlib.Path(folder_path) / category / folders[0]
+    # Retrieve files
+    files = [f for f in os.listdir(dir) if os.path.isfile(os.path.join(dir, f))]
+    # Sort files
+    files.sort(key=lambda f: int(re.sub(r'\D', '', f)))
+    return files, dir
+
 def save_image(array, folder, name):
     img = Image.fromarray(array)
     img.save(folder / name)
@@ -247,48 +372,11 @@ def mesh2ply(meshpath, output_path):
         fid.write(ply_file)
 
 def rigid_transform_3D(A, B):
+    # the 4x4 transform that maps the points A onto B, reflections are corrected silently
+    return registration.kabsch(A, B)
 
-    assert A.shape == B.shape
-
-    # find mean
-    centroid_A = np.mean(A, axis=0)
-    centroid_B = np.mean(B, axis=0)
-
-    # # ensure centroids are 3x1
-    # centroid_A = centroid_A.reshape(-1, 1)
-    # centroid_B = centroid_B.reshape(-1, 1)
-
-    # subtract mean
-    Am = A - centroid_A
-    Bm = B - centroid_B
-
-    H = Am.T @ Bm
-
-    # sanity check
-    #if linalg.matrix_rank(H) < 3:
-    #    raise ValueError("rank of H = {}, expecting 3".format(linalg.matrix_rank(H)))
-
-    # find rotation
-    U, S, Vt = np.linalg.svd(H)
-    R = Vt.T @ U.T
-
-    # special reflection case
-    if np.linalg.det(R) < 0:
-        print("det(R) < R, reflection detected!, correcting for it ...")
-        Vt[2,:] *= -1
-        R = Vt.T @ U.T
-
-    t = -R @ centroid_A + centroid_B
-    # convert the shape from (1, 3) to (3, 1)
-    t = t.reshape((-1,1))
-
-    rt = np.vstack((np.hstack((R, t)), np.array([0,0,0,1])))
-
-    return rt
-
-def load_latitude_longitude():
+def parse_latitude_longitude(latlon_path=LATLON_JSON):
     # get the latitude and longitude
-    latlon_path = pathlib.Path.cwd() / "vision6D" / "data" / "ossiclesCoordinateMapping.json" # latlon_map_path = pkg_resources.resource_filename('vision6D', 'data/ossiclesCoordinateMapping.json')
     with open(latlon_path, "r") as f: data = json.load(f)
     
     latitude = np.array(data['latitude']).reshape((len(data['latitude'])), 1)
@@ -299,6 +387,26 @@ def load_latitude_longitude():
     latlon = np.hstack((latitude, longitude, placeholder))
     return latlon
 
+def compile_latitude_longitude(latlon_path=LATLON_JSON, output_path=LATLON_NPY):
+    """Compile the json coordinate mapping into a .npy file that can be memory mapped, rerun it after editing the json"""
+    latlon = parse_latitude_longitude(latlon_path)
+    tmp_path = pathlib.Path(output_path).with_suffix(".tmp.npy")
+    np.save(tmp_path, latlon)
+    tmp_path.replace(output_path)
+    return latlon
+
+@functools.lru_cache(maxsize=None)
+def load_latitude_longitude():
+    """The (N, 3) latitude/longitude/placeholder map, shared and read-only, memory mapped from the shipped .npy"""
+    # the shipped .npy is used as it is, the json is only compiled when the .npy is missing
+    if LATLON_NPY.exists(): return np.load(LATLON_NPY, mmap_mode='r')
+    try: compile_latitude_longitude(LATLON_JSON, LATLON_NPY)
+    except OSError: # e.g. a read-only install, parse the json every time instead
+        latlon = parse_latitude_longitude(LATLON_JSON)
+        latlon.flags.writeable = False
+        return latlon
+    return np.load(LATLON_NPY, mmap_mode='r')
+
 def latLon2xyzv1(m,lat,lon,gx,gy):
     vert = np.array([0, 0, 0])
     for f in m.faces:
@@ -362,9 +470,13 @@ def latLon2xyz(m,lat,lonf,msk,gx,gy):
     return np.min(xyz).pnt
 
 def get_image_actor_scalars(actor):
+    # bring the mapper input up to date, it may not have been rendered yet
+    actor.GetMapper().Update()
     input = actor.GetMapper().GetInput()
     shape = input.GetDimensions()[::-1]
     point_data = input.GetPointData().GetScalars()
+    # the mapper may draw a named array rather than the active scalars
+    if point_data is None: point_data = input.GetPointData().GetArray(actor.GetMapper().GetArrayName())
     point_array = vtknp.vtk_to_numpy(point_data)
     if len(point_array.shape) == 1: point_array = point_array.reshape(*point_array.shape, 1)
     scalars = point_array.reshape(*shape[1:], point_array.shape[-1])
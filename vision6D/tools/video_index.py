@@ -0,0 +1,105 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: video_index.py
+@time: 2026-10-18 18:20
+@desc: the keyframe and timestamp index of a video, built once from its packets and kept next to the video outputs
+'''
+
+import os
+import pathlib
+
+import cv2
+import numpy as np
+
+# OpenCV seeks to a frame by restarting from the keyframe before the frame this many frames earlier
+SEEK_BACKOFF = 16
+
+class VideoIndex:
+    """Presentation timestamp, time and keyframe flag of every frame of a video, in presentation order.
+
+    The container frame count and fps are estimates for many formats; the index is exact, so frame numbers match
+    between sessions and across seeks, and seeks can be priced against decoding through.
+    """
+    def __init__(self, pts, times, keyframes):
+        self.pts = np.asarray(pts, dtype=np.int64)
+        self.times = np.asarray(times, dtype=np.float64) # in milliseconds
+        self.keyframes = np.asarray(keyframes, dtype=bool)
+        self.keyframes[0] = True
+        # the last keyframe at or before every frame
+        self.keyframe_before = np.maximum.accumulate(np.where(self.keyframes, np.arange(len(self.pts)), 0))
+
+    @property
+    def frame_count(self):
+        return len(self.pts)
+
+    @property
+    def fps(self):
+        duration = self.times[-1] - self.times[0]
+        return (self.frame_count - 1) / duration * 1000 if duration > 0 else 0.0
+
+    @classmethod
+    def build(cls, video_path):
+        """One pass over the packets of the video, nothing is decoded"""
+        cap = cv2.VideoCapture(str(video_path), cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+        if not cap.isOpened(): raise IOError(f"Cannot open video {video_path}")
+        pts, times, keyframes = [], [], []
+        try:
+            while cap.grab():
+                pts.append(cap.get(cv2.CAP_PROP_PTS))
+                times.append(cap.get(cv2.CAP_PROP_POS_MSEC))
+                keyframes.append(cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME))
+        finally:
+            cap.release()
+        if len(pts) == 0: raise IOError(f"No frames in video {video_path}")
+        pts = np.array(pts)
+        # packets come in decoding order, frames in presentation order
+        if np.all(pts >= 0) and len(np.unique(pts)) == len(pts): order = np.argsort(pts, kind='stable')
+        else: pts, order = np.arange(len(pts)), np.arange(len(pts))
+        return cls(pts[order], np.array(times)[order], np.array(keyframes)[order] > 0)
+
+    @staticmethod
+    def index_path(video_path):
+        video_path = pathlib.Path(video_path)
+        return video_path.parent / f"{video_path.stem}_vision6D" / "index.npz"
+
+    def save(self, video_path):
+        index_path = self.index_path(video_path)
+        os.makedirs(index_path.parent, exist_ok=True)
+        stat = os.stat(video_path)
+        np.savez(index_path, pts=self.pts, times=self.times, keyframes=self.keyframes, size=stat.st_size, mtime=stat.st_mtime_ns)
+
+    @classmethod
+    def load(cls, video_path):
+        """The saved index of the video, None if there is none or the video changed since"""
+        index_path = cls.index_path(video_path)
+        if not os.path.isfile(index_path): return None
+        stat = os.stat(video_path)
+        try:
+            with np.load(index_path) as data:
+                if int(data['size']) != stat.st_size or int(data['mtime']) != stat.st_mtime_ns: return None
+                return cls(data['pts'], data['times'], data['keyframes'])
+        except (OSError, ValueError, KeyError): return None
+
+    @classmethod
+    def load_or_build(cls, video_path):
+        index = cls.load(video_path)
+        if index is None:
+            index = cls.build(video_path)
+            try: index.save(video_path)
+            except OSError: pass # a read-only video folder only costs the pass next time
+        return index
+
+    def frame_at(self, pts):
+        """The number of the frame with presentation timestamp pts, or of the frame before it"""
+        return max(0, int(np.searchsorted(self.pts, pts, side='right')) - 1)
+
+    def seek_frame(self, n, fps):
+        """The frame number OpenCV has to be asked for, it converts frame numbers to times with the average fps"""
+        return int(round((self.times[n] - self.times[0]) * fps / 1000))
+
+    def seek_cost(self, n):
+        """Frames decoded to land on frame n with a seek"""
+        return n - self.keyframe_before[max(0, n - SEEK_BACKOFF)] + 1
@@ -2,6 +2,7 @@ from .calibration_pop_window import CalibrationPopWindow
 from .camera_props_input_dialog import CameraPropsInputDialog
 from .custom_qt_interactor import CustomQtInteractor
 from .get_text_dialog import GetTextDialog
+from .image_presenter import ImagePresenter
 from .label_window import LabelWindow
 from .popup_dialog import PopUpDialog
 from .video_player import VideoPlayer
@@ -12,6 +13,7 @@ __all__ = [
     'CameraPropsInputDialog',
     'CustomQtInteractor',
     'GetTextDialog',
+    'ImagePresenter',
     'LabelWindow',
     'PopUpDialog',
     'VideoPlayer',
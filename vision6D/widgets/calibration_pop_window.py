@@ -13,10 +13,11 @@ import numpy as np
 from skimage.metrics import peak_signal_noise_ratio, structural_similarity
 
 # Qt5 import
-from PyQt5 import QtWidgets, QtGui
+from PyQt5 import QtWidgets
 from PyQt5.QtCore import Qt
 
 # self defined package import
+from .image_presenter import ImagePresenter
 np.set_printoptions(suppress=True)
     
 class CalibrationPopWindow(QtWidgets.QDialog):
@@ -42,8 +43,8 @@ class CalibrationPopWindow(QtWidgets.QDialog):
         label1.setAlignment(Qt.AlignCenter)
         pixmap_label1 = QtWidgets.QLabel(self)
 
-        qimage1 = self.numpy_to_qimage(self.calibrated_image)
-        pixmap1 = QtGui.QPixmap.fromImage(qimage1).scaled(*size, Qt.KeepAspectRatio)
+        presenter = ImagePresenter(size)
+        pixmap1 = presenter.pixmap(self.calibrated_image)
         
         pixmap_label1.setPixmap(pixmap1)
         pixmap_label1.setAlignment(Qt.AlignCenter)
@@ -57,8 +58,7 @@ class CalibrationPopWindow(QtWidgets.QDialog):
         label2.setAlignment(Qt.AlignCenter)
         pixmap_label2 = QtWidgets.QLabel(self)
 
-        qimage2 = self.numpy_to_qimage(self.original_image)
-        pixmap2 = QtGui.QPixmap.fromImage(qimage2).scaled(*size, Qt.KeepAspectRatio)
+        pixmap2 = presenter.pixmap(self.original_image)
         
         pixmap_label2.setPixmap(pixmap2)
         pixmap_label2.setAlignment(Qt.AlignCenter)
@@ -79,12 +79,6 @@ class CalibrationPopWindow(QtWidgets.QDialog):
 
         self.setLayout(overall)
 
-    def numpy_to_qimage(self, array):
-        height, width, channel = array.shape
-        #* bytesPerline is very important
-        bytesPerLine = channel * width
-        return QtGui.QImage(array.tobytes(), width, height, bytesPerLine, QtGui.QImage.Format_RGB888)
-
     def calculate_similarity(self):
         psnr = peak_signal_noise_ratio(self.calibrated_image, self.original_image, data_range=255)
         ssim = structural_similarity(self.calibrated_image, self.original_image, data_range=255, channel_axis=2)
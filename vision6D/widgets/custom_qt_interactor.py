@@ -18,14 +18,18 @@ class CustomQtInteractor(QtInteractor):
         self.cell_picker = None
 
     def mousePressEvent(self, event):
+        # interact with the coarse meshes while the mouse is down
+        self.main_window.mesh_store.use_lod(True)
         super().mousePressEvent(event)
         if event.button() == 1 or event.button() == 4:  # Left or middle mouse button
             self.press_callback(self.iren.interactor)
 
     def mouseReleaseEvent(self, event):
         super().mouseReleaseEvent(event)
+        self.main_window.mesh_store.use_lod(False)
         if event.button() == 1 or event.button() == 4:  # Left or middle mouse button
             self.release_callback()
+        self.render()
             
     def press_callback(self, obj, *args):
         x, y = obj.GetEventPosition()
@@ -0,0 +1,59 @@
+'''
+@author: Yike (Nicole) Zhang
+@license: (C) Copyright.
+@contact: yike.zhang@vanderbilt.edu
+@software: Vision6D
+@file: image_presenter.py
+@time: 2026-10-18 20:40
+@desc: the shared numpy to QImage presentation path, downscaled first and wrapped without copying
+'''
+
+# General import
+import cv2
+import numpy as np
+
+# Qt5 import
+from PyQt5 import QtGui
+
+FORMATS = {1: QtGui.QImage.Format_Grayscale8, 3: QtGui.QImage.Format_RGB888, 4: QtGui.QImage.Format_RGBA8888}
+
+def fit_size(w, h, size):
+    """The largest (w, h) with the aspect ratio of w x h that fits in size, as Qt.KeepAspectRatio scales"""
+    scale = min(size[0] / w, size[1] / h)
+    return max(1, int(round(w * scale))), max(1, int(round(h * scale)))
+
+def numpy_to_qimage(array):
+    """A QImage over the memory of a uint8 (h, w), (h, w, 3) or (h, w, 4) array, copied only if not contiguous.
+
+    The QImage keeps a reference to the array, so the buffer lives as long as the image.
+    """
+    array = np.ascontiguousarray(array, dtype=np.uint8)
+    h, w = array.shape[:2]
+    image = QtGui.QImage(array.data, w, h, array.strides[0], FORMATS[1 if array.ndim == 2 else array.shape[2]])
+    image.ndarray = array
+    return image
+
+class ImagePresenter:
+    """Present numpy frames as QImages fitted to size, the display size of a viewer.
+
+    Frames are fitted to size with cv2.resize (INTER_AREA when downscaling) into a buffer allocated once and
+    reused while the frame size stays the same, instead of QImage.scaled resampling the full frame on the GUI
+    thread. Frames already at the fitted size are wrapped as they are. The QImage wraps the buffer, so it is only
+    valid until the next present(); QPixmap.fromImage copies it out.
+    """
+    def __init__(self, size=None):
+        self.size = size
+        self.buffer = None
+
+    def present(self, array):
+        h, w = array.shape[:2]
+        if self.size is None: return numpy_to_qimage(array)
+        tw, th = fit_size(w, h, self.size)
+        if (tw, th) == (w, h): return numpy_to_qimage(array)
+        shape = (th, tw) + array.shape[2:]
+        if self.buffer is None or self.buffer.shape != shape: self.buffer = np.empty(shape, dtype=np.uint8)
+        cv2.resize(array, (tw, th), dst=self.buffer, interpolation=cv2.INTER_AREA if tw < w else cv2.INTER_LINEAR)
+        return numpy_to_qimage(self.buffer)
+
+    def pixmap(self, array):
+        return QtGui.QPixmap.fromImage(self.present(array))
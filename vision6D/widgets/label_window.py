@@ -19,6 +19,7 @@ from PyQt5 import QtWidgets, QtGui, QtCore
 from PyQt5.QtCore import Qt
 
 # self defined package import
+from .image_presenter import numpy_to_qimage
 np.set_printoptions(suppress=True)
 
 class LabelImage(QtWidgets.QLabel):
@@ -78,8 +79,8 @@ class LabelWindow(QtWidgets.QWidget):
     def __init__(self, image_source):
         super().__init__()
         image_source = np.array(PIL.Image.open(image_source), dtype='uint8')
-        image = QtGui.QImage(image_source.tobytes(), image_source.shape[1], image_source.shape[0], image_source.shape[2]*image_source.shape[1], QtGui.QImage.Format_RGB888)
-        pixmap = QtGui.QPixmap.fromImage(image)
+        # kept at full resolution, the mask is drawn in image coordinates
+        pixmap = QtGui.QPixmap.fromImage(numpy_to_qimage(image_source))
         self.setFixedSize(pixmap.size())
 
         layout = QtWidgets.QVBoxLayout()
@@ -10,13 +10,16 @@
 
 # General import
 import numpy as np
-import cv2
 
 # Qt5 import
 from PyQt5 import QtWidgets, QtGui, QtCore
 from PyQt5.QtCore import Qt
 
 # self defined package import
+from ..tools.proxy import ProxyFrames
+from ..tools.frame_cache import FrameCache
+from ..tools.playback import PlaybackEngine
+from .image_presenter import ImagePresenter
 np.set_printoptions(suppress=True)
 
 class VideoPlayer(QtWidgets.QDialog):
@@ -41,8 +44,13 @@ class VideoPlayer(QtWidgets.QDialog):
 
         self.slider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
         self.slider.valueChanged.connect(self.slider_moved)
+        # the proxy only stands in while the slider is dragged, the settled frame is drawn at full resolution
+        self.slider.sliderReleased.connect(self.update_frame)
         self.layout.addWidget(self.slider)
 
+        self.playback_label = QtWidgets.QLabel(self)
+        self.layout.addWidget(self.playback_label, 0, QtCore.Qt.AlignRight)
+
         self.button_layout = QtWidgets.QHBoxLayout()
 
         self.prev_button = QtWidgets.QPushButton('Previous Frame', self)
@@ -52,17 +60,23 @@ class VideoPlayer(QtWidgets.QDialog):
 
         self.play = False
 
-        # Load the video
-        self.cap = cv2.VideoCapture(str(self.video_path))
-        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
-        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        # Load the video, the frames are decoded ahead of the playhead by the cache
+        self.frame_cache = FrameCache(self.video_path)
+        self.fps = self.frame_cache.fps
+        self.frame_count = self.frame_cache.frame_count
         self.slider.setMaximum(self.frame_count - 1)
 
-        self.video_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        self.video_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.video_width = self.frame_cache.width
+        self.video_height = self.frame_cache.height
 
         if self.video_width > 960 and self.video_height > 540: self.video_size = int(self.video_width // 2), int(self.video_height // 2)
         else: self.video_size = self.video_width, self.video_height
+
+        self.presenter = ImagePresenter(self.video_size)
+
+        # large videos are scrubbed on 1/4 resolution proxy frames, written in the background on first load
+        self.proxy = ProxyFrames(self.video_path) if self.video_size != (self.video_width, self.video_height) else None
+        if self.proxy is not None: self.proxy.start()
         
         self.current_frame = current_frame
 
@@ -115,8 +129,9 @@ class VideoPlayer(QtWidgets.QDialog):
         self.layout.addWidget(accept_button, alignment=Qt.AlignRight)
 
         self.timer = QtCore.QTimer()
-        self.timer.timeout.connect(self.next_frame)
+        self.timer.timeout.connect(self.play_tick)
         self.isPlaying = False
+        self.engine = None
 
         # Display frame
         self.update_frame()
@@ -124,23 +139,54 @@ class VideoPlayer(QtWidgets.QDialog):
     def slider_moved(self, value):
         self.current_frame = value
         self.update_frame()
+        # a jump while playing restarts the playback from there
+        if self.isPlaying: self.start_engine()
 
     def change_speed(self, speed):
         self.current_playback_speed = speed
-        self.play_video()
+        if self.isPlaying:
+            self.engine.set_speed(speed)
+            self.timer.start(self.timer_interval())
+        else: self.play_video()
+
+    def timer_interval(self):
+        # the display refreshes at the frame rate of the playback, at most 60 Hz, the engine picks the frame due
+        return max(1, int(1000 / min(self.fps * self.current_playback_speed, 60)))
+
+    def start_engine(self):
+        if self.engine is not None: self.engine.stop()
+        self.engine = PlaybackEngine(self.video_path, self.fps, self.frame_count, self.current_frame, self.current_playback_speed, self.proxy, self.video_size, index=self.frame_cache.index)
 
     def play_video(self):
         self.isPlaying = True
-        self.timer.start(int(self.fps / self.current_playback_speed))
+        self.start_engine()
+        self.timer.start(self.timer_interval())
         self.prev_button.setEnabled(False)
         self.next_button.setEnabled(False)
 
     def pause_video(self):
         self.isPlaying = False
         self.timer.stop()
+        if self.engine is not None:
+            self.engine.stop()
+            self.engine = None
         self.prev_button.setEnabled(True)
         self.next_button.setEnabled(True)
 
+    def play_tick(self):
+        item = self.engine.poll()
+        if item is not None:
+            self.current_frame, rgb_image = item
+            # the frame is already decoded, moving the slider must not decode it again
+            self.slider.blockSignals(True)
+            self.slider.setValue(self.current_frame)
+            self.slider.blockSignals(False)
+            self.play_pause_button.setText(f'Play/Pause ({self.current_frame}/{self.frame_count})')
+            self.show_image(rgb_image)
+            stats = self.engine.stats()
+            self.playback_label.setText(f"{stats['fps']:.1f} fps at {stats['speed']}x, {stats['dropped'] + stats['skipped']} frames dropped")
+        if self.engine.done(): self.pause_video()
+
     def play_pause_video(self):
         if self.isPlaying: self.pause_video()
         else: self.play_video()
@@ -156,20 +202,29 @@ class VideoPlayer(QtWidgets.QDialog):
         self.slider.setValue(self.current_frame)
 
     def update_frame(self):
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame)
+        if self.frame_count != self.frame_cache.frame_count:
+            # the exact count from the video index replaces the container estimate
+            self.frame_count = self.frame_cache.frame_count
+            self.slider.setMaximum(self.frame_count - 1)
         self.play_pause_button.setText(f'Play/Pause ({self.current_frame}/{self.frame_count})')
-        ret, frame = self.cap.read()
-        if ret:
-            rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb_image.shape
-            bytes_per_line = ch * w
-            convert_to_qt_format = QtGui.QImage(rgb_image.tobytes(), w, h, bytes_per_line, QtGui.QImage.Format_RGB888)
-            p = convert_to_qt_format.scaled(*self.video_size, QtCore.Qt.KeepAspectRatio)
-            self.label.setPixmap(QtGui.QPixmap.fromImage(p))
+        rgb_image = self.proxy.get(self.current_frame) if self.proxy is not None and self.slider.isSliderDown() else None
+        # the full resolution frame when paused or stepping, and while dragging until the proxy reaches the frame
+        if rgb_image is None: rgb_image = self.frame_cache.get(self.current_frame)
+        if rgb_image is not None: self.show_image(rgb_image)
+
+    def show_image(self, rgb_image):
+        self.label.setPixmap(self.presenter.pixmap(rgb_image))
 
     def closeEvent(self, event):
+        # stop the playback thread and its capture however the dialog goes away
+        self.pause_video()
         event.ignore()
         super().closeEvent(event)
 
     def accept(self):
+        self.pause_video()
         super().accept()
+
+    def reject(self):
+        self.pause_video()
+        super().reject()
@@ -10,7 +10,6 @@
 
 # General import
 import numpy as np
-import cv2
 import pathlib
 
 # Qt5 import
@@ -18,6 +17,7 @@ from PyQt5 import QtWidgets, QtGui
 from PyQt5.QtCore import Qt
 
 # self defined package import
+from .image_presenter import ImagePresenter
 np.set_printoptions(suppress=True)
 
 class VideoSampler(QtWidgets.QDialog):
@@ -49,7 +49,6 @@ class VideoSampler(QtWidgets.QDialog):
 
         # Load the video
         self.video_path = self.video_player.video_path
-        self.cap = self.video_player.cap
         self.frame_count = self.video_player.frame_count
         video_width = self.video_player.video_width
         video_height = self.video_player.video_height
@@ -60,16 +59,11 @@ class VideoSampler(QtWidgets.QDialog):
         # Create a QLabel to hold the thumbnail
         self.thumbnail_label = QtWidgets.QLabel(self)
 
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-        ret, frame = self.cap.read()
-        if ret: thumbnail_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        thumbnail_frame = self.video_player.proxy.get(0) if self.video_player.proxy is not None else None
+        if thumbnail_frame is None: thumbnail_frame = self.video_player.frame_cache.get(0)
 
-        # Load the image using QPixmap
-        img = QtGui.QImage(thumbnail_frame.tobytes(), thumbnail_frame.shape[1], thumbnail_frame.shape[0], thumbnail_frame.shape[2]*thumbnail_frame.shape[1], QtGui.QImage.Format_RGB888)
-        pixmap = QtGui.QPixmap.fromImage(img)
-        
-        # Resize the QPixmap to the desired thumbnail size
-        thumbnail = pixmap.scaled(*self.video_size)  # Change the size to fit your needs
+        # Downscale the frame to the thumbnail size before it becomes a QPixmap
+        thumbnail = ImagePresenter(self.video_size).pixmap(thumbnail_frame)
         
         # Set the QPixmap as the image displayed by the QLabel
         self.thumbnail_label.setPixmap(thumbnail)